@@ -0,0 +1,179 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# contour fingerprint
+import hashlib
+
+# least recently used order
+from collections import OrderedDict
+
+# guard cache against worker thread
+import threading
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from instrumentation import profiler
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# rough memory used by one cache entry besides approximated point array ( in byte )
+EntryOverheadByteInt = 200
+
+class ApproximatedPolygonCache:
+	''' - least recently used cache of approxPolyDP result shared by every contour across frame
+
+		- key is fingerprint of contour point buffer and epsilon percent, so the same static
+		  field marking found again in the next frame is not approximated again
+
+		- off by default, least recently used entry is evicted when memory budget is exceeded
+
+		- lookup, store and eviction hold a lock so it can be shared by worker thread,
+		  approxPolyDP itself runs outside the lock
+	'''
+
+	def __init__( self, memoryBudgetByteInt=16 * 1024 * 1024 ):
+
+		# cache is on
+		self.isEnabled = False
+
+		# largest memory used by cache ( in byte )
+		self.memoryBudgetByteInt = memoryBudgetByteInt
+
+		# key to approximated point list, oldest first
+		self.keyToApproximatedPointListDict = OrderedDict()
+
+		# memory used by cache ( in byte )
+		self.usedByteInt = 0
+
+		# statistic
+		self.numberOfHit = 0
+		self.numberOfMiss = 0
+		self.numberOfEviction = 0
+
+		# lock to read and update entry
+		self.lock = threading.Lock()
+
+	def enable( self, memoryBudgetByteInt=None ):
+		''' - turn cache on, optionally with new memory budget
+		'''
+		self.isEnabled = True
+		if memoryBudgetByteInt is not None:
+			with self.lock:
+				self.memoryBudgetByteInt = memoryBudgetByteInt
+				self._evict()
+
+	def disable( self ):
+		''' - turn cache off and drop every entry
+		'''
+		self.isEnabled = False
+		self.clear()
+
+	def clear( self ):
+		''' - drop every entry, statistic is kept
+		'''
+		with self.lock:
+			self.keyToApproximatedPointListDict.clear()
+			self.usedByteInt = 0
+
+	@staticmethod
+	def calculateKey( contour, epsilonPercent ):
+		''' - fingerprint of contour point buffer with epsilon percent
+
+			RETURN:
+				- key ( tuple )
+		'''
+		return ( hashlib.blake2b( contour.tobytes(), digest_size=16 ).digest(), contour.shape, epsilonPercent )
+
+	def _evict( self ):
+		''' - evict least recently used entry until memory budget is met, caller holds lock
+		'''
+		while self.usedByteInt > self.memoryBudgetByteInt and self.keyToApproximatedPointListDict:
+			_, approximatedPointList = self.keyToApproximatedPointListDict.popitem( last=False )
+			self.usedByteInt -= approximatedPointList.nbytes + EntryOverheadByteInt
+			self.numberOfEviction += 1
+
+	def approximatePolygon( self, contour, epsilonPercent, contourPerimeter=None ):
+		''' - approximate polygon of contour, look up shared cache first if cache is on
+
+			ARGS:
+				- contour ( numpy array )
+				- epsilonPercent ( int )
+				- contourPerimeter ( float ) --> calculated on cache miss if not given
+
+			RETURN:
+				- approximatedPointList ( numpy array )
+		'''
+
+		# read switch once, enable() or disable() from another thread must not change it in the middle of this call
+		isEnabled = self.isEnabled
+
+		# look up cache
+		if isEnabled:
+			key = self.calculateKey( contour, epsilonPercent )
+			with self.lock:
+				approximatedPointList = self.keyToApproximatedPointListDict.get( key )
+
+				# cache hit, mark entry as recently used
+				if approximatedPointList is not None:
+					self.keyToApproximatedPointListDict.move_to_end( key )
+					self.numberOfHit += 1
+				else:
+					self.numberOfMiss += 1
+
+			# cache hit
+			if approximatedPointList is not None:
+				profiler.addCount( 'sharedApproximationCache_hit' )
+				return approximatedPointList
+			profiler.addCount( 'sharedApproximationCache_miss' )
+
+		# calculate contour perimeter
+		if contourPerimeter is None:
+			contourPerimeter = cv2.arcLength( contour, True )
+
+		# approximate curve of contour
+		approximatedPointList = cv2.approxPolyDP( contour, epsilonPercent / 100 * contourPerimeter, True )
+
+		# store it, another thread may have stored the same key meanwhile
+		if isEnabled:
+			with self.lock:
+				if key in self.keyToApproximatedPointListDict:
+					self.keyToApproximatedPointListDict.move_to_end( key )
+				else:
+					self.keyToApproximatedPointListDict[ key ] = approximatedPointList
+					self.usedByteInt += approximatedPointList.nbytes + EntryOverheadByteInt
+					self._evict()
+
+		return approximatedPointList
+
+	def getStatistic( self ):
+		''' - hit / miss statistic and memory used
+
+			RETURN:
+				- statisticDict ( dict )
+		'''
+		with self.lock:
+			numberOfLookup = self.numberOfHit + self.numberOfMiss
+			return { 'numberOfHit' : self.numberOfHit,
+					 'numberOfMiss' : self.numberOfMiss,
+					 'hitRateFloat' : self.numberOfHit / numberOfLookup if numberOfLookup else None,
+					 'numberOfEviction' : self.numberOfEviction,
+					 'numberOfEntry' : len( self.keyToApproximatedPointListDict ),
+					 'usedByteInt' : self.usedByteInt,
+					 'memoryBudgetByteInt' : self.memoryBudgetByteInt }
+
+# cache shared by every contour
+approximatedPolygonCache = ApproximatedPolygonCache()
@@ -0,0 +1,95 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# argument parser
+import argparse
+
+# write detection result
+import json
+
+import os
+
+# run worker in parallel
+from concurrent.futures import ProcessPoolExecutor
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame, FrameRateCounter
+
+from frame_source import listImagePathInDir
+
+def detectPoseInImageFile( imagePathStr ):
+	''' - worker function, read image from path and detect pose
+
+		- only compact detection result is sent back to parent process, not the image
+
+		RETURN:
+			- ( imagePathStr, poseList ) ( tuple ) --> poseList is None if image can not be read
+	'''
+
+	# reading image
+	image = cv2.imread( imagePathStr )
+
+	# this file can not be decoded
+	if image is None:
+		return imagePathStr, None
+
+	return imagePathStr, processFrame( image )
+
+def runBatch( imagePathList, outputPathStr, numberOfWorker=None, chunkSizeInt=8 ):
+	''' - detect pose on every image using one worker process per core and stream result into one JSON lines file
+
+		ARGS:
+			- imagePathList ( list )
+			- outputPathStr ( str ) --> one line per image
+			- numberOfWorker ( int ) --> None means number of cpu core
+			- chunkSizeInt ( int ) --> number of image path sent to worker at once
+
+		RETURN:
+			- numberOfImage ( int ) --> number of written result
+	'''
+
+	# one worker per core
+	numberOfWorker = numberOfWorker or os.cpu_count()
+
+	# frame rate counter
+	frameRateCounter = FrameRateCounter()
+
+	with ProcessPoolExecutor( max_workers=numberOfWorker ) as executor, open( outputPathStr, 'w' ) as outputFile:
+
+		# loop through result of each image in input order
+		for imagePathStr, poseList in executor.map( detectPoseInImageFile, imagePathList, chunksize=chunkSizeInt ):
+
+			# write one result per line
+			outputFile.write( json.dumps( { 'imagePathStr' : imagePathStr, 'poseList' : poseList } ) + '\n' )
+
+			# count processed image
+			frameRateCounter.tick()
+
+	print( '[runBatch] processed {} image with {} worker in {:.2f} s, image per second: {:.2f}'.format( frameRateCounter.numberOfFrame, numberOfWorker, frameRateCounter.elapsedTimeFloat, frameRateCounter.framePerSecondFloat ) )
+
+	return frameRateCounter.numberOfFrame
+
+if __name__ == '__main__':
+
+	# argument parser
+	parser = argparse.ArgumentParser()
+	parser.add_argument( 'imageDirStr', type=str,
+						help='directory of field image to process' )
+	parser.add_argument( 'outputPathStr', type=str,
+						help='path of JSON lines file to write detection result' )
+	parser.add_argument( '--worker', dest='numberOfWorker', type=int, default=None,
+						help='number of worker process, default is number of cpu core' )
+	args = parser.parse_args()
+
+	runBatch( listImagePathInDir( args.imageDirStr ), args.outputPathStr, args.numberOfWorker )
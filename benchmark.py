@@ -0,0 +1,287 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# argument parser
+import argparse
+
+# read and write baseline result
+import json
+
+# measure time
+import time
+
+# measure peak memory
+import tracemalloc
+
+# array operation
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from helper import calculateVectorMagnitude, \
+					findParallelPointWithMagnitude, \
+					findPerpendicularPoint, \
+					calculateVectorMagnitudeArray, \
+					findParallelPointWithMagnitudeArray, \
+					findPerpendicularPointArray
+
+from detection_pipeline import convertToBinaryImage, findContourTree, buildContourStorage, extractPoseList
+
+from synthetic_field import generateSyntheticField
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# scene to benchmark, ( name, width, height, number of circle, number of triangle, number of square )
+SceneTupleList = [ ( 'vga-small', 640, 480, 4, 4, 4 ),
+				   ( 'hd-field', 1538, 1226, 8, 8, 8 ),
+				   ( 'hd-busy', 1920, 1080, 60, 60, 60 ),
+				   ( '4k-field', 3840, 2160, 20, 20, 20 ),
+				   ( '4k-busy', 3840, 2160, 300, 300, 300 ) ]
+
+# number of point for helper geometry micro benchmark
+NumberOfHelperPointInt = 10000
+
+def measureStage( stageFunction, numberOfRepeat ):
+	''' - run stage function several times and measure its best time and peak memory
+
+		- stage function is called with no argument and its result of the last run is returned
+
+		RETURN:
+			- ( result, bestTimeMsFloat, peakMemoryKiBFloat ) ( tuple )
+	'''
+
+	# best time of all run
+	bestTimeFloat = float( 'inf' )
+
+	# loop through each run
+	for _ in range( numberOfRepeat ):
+		startTimeFloat = time.perf_counter()
+		result = stageFunction()
+		bestTimeFloat = min( bestTimeFloat, time.perf_counter() - startTimeFloat )
+
+	# measure peak memory in separate run so tracing does not slow down timed run
+	tracemalloc.start()
+	stageFunction()
+	_, peakMemoryByteInt = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	return result, bestTimeFloat * 1000, peakMemoryByteInt / 1024
+
+def benchmarkScene( sceneNameStr, widthInt, heightInt, numberOfCircle, numberOfTriangle, numberOfSquare, numberOfRepeat=5, seedInt=0 ):
+	''' - measure time and peak memory of each detection stage on one synthetic scene
+
+		RETURN:
+			- sceneResultDict ( dict )
+	'''
+
+	# generate scene
+	image, _ = generateSyntheticField( widthInt, heightInt, numberOfCircle, numberOfTriangle, numberOfSquare, seedInt=seedInt )
+
+	# stage name to result
+	stageNameToResultDict = dict()
+
+	# threshold
+	binaryImage, timeMsFloat, peakMemoryKiBFloat = measureStage( lambda: convertToBinaryImage( image ), numberOfRepeat )
+	stageNameToResultDict[ 'threshold' ] = { 'timeMsFloat' : timeMsFloat, 'peakMemoryKiBFloat' : peakMemoryKiBFloat }
+
+	# find contour
+	( contourList, hierarchy ), timeMsFloat, peakMemoryKiBFloat = measureStage( lambda: findContourTree( binaryImage ), numberOfRepeat )
+	stageNameToResultDict[ 'findContours' ] = { 'timeMsFloat' : timeMsFloat, 'peakMemoryKiBFloat' : peakMemoryKiBFloat }
+
+	# contour construction
+	_, timeMsFloat, peakMemoryKiBFloat = measureStage( lambda: buildContourStorage( contourList, hierarchy ), numberOfRepeat )
+	stageNameToResultDict[ 'contourConstruction' ] = { 'timeMsFloat' : timeMsFloat, 'peakMemoryKiBFloat' : peakMemoryKiBFloat }
+
+	# each following stage needs a fresh contour storage which went through the previous stage
+	def runUntilStage( stageNameStr ):
+		contourStorageObj = buildContourStorage( contourList, hierarchy )
+		contourStorageObj.filterContoursOnlyInAreaRange( 1000, 300000 )
+		if stageNameStr == 'filterContoursOnlyInAreaRange':
+			return contourStorageObj
+		contourStorageObj.classifyContourObjByShape()
+		if stageNameStr == 'classifyContourObjByShape':
+			return contourStorageObj
+		contourStorageObj.outerMostCircleContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.circleContourObjList, 4 )
+		contourStorageObj.outerMostTriangleContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.triangleContourObjList, 5 )
+		contourStorageObj.outerMostSquareContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.squareContourObjList, 4 )
+		return contourStorageObj
+
+	# python side stage, time of previous stage is subtracted to get time of this stage only
+	previousTimeMsFloat = stageNameToResultDict[ 'contourConstruction' ][ 'timeMsFloat' ]
+	for stageNameStr in ( 'filterContoursOnlyInAreaRange', 'classifyContourObjByShape', 'filterOnlyOuterMostContourObj' ):
+		contourStorageObj, timeMsFloat, peakMemoryKiBFloat = measureStage( lambda: runUntilStage( stageNameStr ), numberOfRepeat )
+		stageNameToResultDict[ stageNameStr ] = { 'timeMsFloat' : max( timeMsFloat - previousTimeMsFloat, 0.0 ), 'peakMemoryKiBFloat' : peakMemoryKiBFloat }
+		previousTimeMsFloat = timeMsFloat
+
+	return { 'sceneNameStr' : sceneNameStr,
+			 'widthInt' : widthInt,
+			 'heightInt' : heightInt,
+			 'numberOfContour' : len( contourList ),
+			 'numberOfContourInAreaRange' : len( contourStorageObj.contourObjInAreaRangeList ),
+			 'numberOfPose' : len( extractPoseList( contourStorageObj ) ),
+			 'stageNameToResultDict' : stageNameToResultDict,
+			 'totalTimeMsFloat' : sum( stageResultDict[ 'timeMsFloat' ] for stageResultDict in stageNameToResultDict.values() ) }
+
+def benchmarkHelper( numberOfPoint=NumberOfHelperPointInt, numberOfRepeat=5, seedInt=0 ):
+	''' - measure throughput of helper geometry function
+
+		RETURN:
+			- functionNameToPointPerSecondDict ( dict )
+	'''
+
+	# random point
+	pointList = [ tuple( int( value ) for value in point ) for point in np.random.default_rng( seedInt ).integers( 1, 2000, ( numberOfPoint, 2 ) ) ]
+
+	# the same point as array for batch version, shape is ( N, 2 )
+	pointArray = np.array( pointList )
+	originPointArray = np.zeros_like( pointArray )
+	centerPointArray = np.full_like( pointArray, 10 )
+
+	# function to benchmark, each one runs on every point
+	functionNameToStageFunctionDict = { 'calculateVectorMagnitude' : lambda: [ calculateVectorMagnitude( ( 0, 0 ), point ) for point in pointList ],
+										'findParallelPointWithMagnitude' : lambda: [ findParallelPointWithMagnitude( ( 0, 0 ), point, ( 10, 10 ), 50 ) for point in pointList ],
+										'findPerpendicularPoint' : lambda: [ findPerpendicularPoint( ( 0, 0 ), point, ( 10, 10 ), point, 50 ) for point in pointList ],
+										'calculateVectorMagnitudeArray' : lambda: calculateVectorMagnitudeArray( originPointArray, pointArray ),
+										'findParallelPointWithMagnitudeArray' : lambda: findParallelPointWithMagnitudeArray( originPointArray, pointArray, centerPointArray, 50 ),
+										'findPerpendicularPointArray' : lambda: findPerpendicularPointArray( centerPointArray, pointArray, 50 ) }
+
+	# function name to throughput
+	functionNameToPointPerSecondDict = dict()
+	for functionNameStr, stageFunction in functionNameToStageFunctionDict.items():
+		_, timeMsFloat, _ = measureStage( stageFunction, numberOfRepeat )
+		functionNameToPointPerSecondDict[ functionNameStr ] = numberOfPoint / ( timeMsFloat / 1000 )
+
+	return functionNameToPointPerSecondDict
+
+def runBenchmark( sceneTupleList=SceneTupleList, numberOfRepeat=5 ):
+	''' - benchmark every scene and helper function
+
+		RETURN:
+			- benchmarkResultDict ( dict )
+	'''
+	return { 'sceneResultList' : [ benchmarkScene( *sceneTuple, numberOfRepeat=numberOfRepeat ) for sceneTuple in sceneTupleList ],
+			 'helperPointPerSecondDict' : benchmarkHelper( numberOfRepeat=numberOfRepeat ) }
+
+def compareWithBaseline( benchmarkResultDict, baselineResultDict, tolerancePercentFloat ):
+	''' - find stage which is slower than baseline by more than tolerance
+
+		RETURN:
+			- regressionList ( list ) --> list of message
+	'''
+
+	# regression message storage
+	regressionList = list()
+
+	# scene name to baseline result
+	sceneNameToBaselineDict = { sceneResultDict[ 'sceneNameStr' ] : sceneResultDict for sceneResultDict in baselineResultDict[ 'sceneResultList' ] }
+
+	# loop through each scene result
+	for sceneResultDict in benchmarkResultDict[ 'sceneResultList' ]:
+
+		# scene is not in baseline
+		if sceneResultDict[ 'sceneNameStr' ] not in sceneNameToBaselineDict:
+			continue
+		baselineStageNameToResultDict = sceneNameToBaselineDict[ sceneResultDict[ 'sceneNameStr' ] ][ 'stageNameToResultDict' ]
+
+		# loop through each stage
+		for stageNameStr, stageResultDict in sceneResultDict[ 'stageNameToResultDict' ].items():
+
+			# stage is not in baseline
+			if stageNameStr not in baselineStageNameToResultDict:
+				continue
+			baselineTimeMsFloat = baselineStageNameToResultDict[ stageNameStr ][ 'timeMsFloat' ]
+
+			# stage is slower than tolerance, sub millisecond stage is too noisy to compare
+			if stageResultDict[ 'timeMsFloat' ] > max( baselineTimeMsFloat, 1.0 ) * ( 1 + tolerancePercentFloat / 100 ):
+				regressionList.append( '{} {}: {:.2f} ms, baseline {:.2f} ms'.format( sceneResultDict[ 'sceneNameStr' ], stageNameStr, stageResultDict[ 'timeMsFloat' ], baselineTimeMsFloat ) )
+
+	return regressionList
+
+def printBenchmarkResult( benchmarkResultDict ):
+	''' - print time of each stage of each scene as table, one row per scene
+	'''
+
+	# stage name in order
+	stageNameList = list( benchmarkResultDict[ 'sceneResultList' ][ 0 ][ 'stageNameToResultDict' ] )
+
+	# header
+	print( '{:<12} {:>9} {:>9} '.format( 'scene', 'contour', 'total ms' ) + ' '.join( '{:>14}'.format( stageNameStr[ :14 ] ) for stageNameStr in stageNameList ) )
+
+	# loop through each scene
+	for sceneResultDict in benchmarkResultDict[ 'sceneResultList' ]:
+		print( '{:<12} {:>9} {:>9.2f} '.format( sceneResultDict[ 'sceneNameStr' ], sceneResultDict[ 'numberOfContour' ], sceneResultDict[ 'totalTimeMsFloat' ] ) +
+			   ' '.join( '{:>14.2f}'.format( sceneResultDict[ 'stageNameToResultDict' ][ stageNameStr ][ 'timeMsFloat' ] ) for stageNameStr in stageNameList ) )
+
+	# helper throughput
+	for functionNameStr, pointPerSecondFloat in benchmarkResultDict[ 'helperPointPerSecondDict' ].items():
+		print( '{:<32} {:>14.0f} point/s'.format( functionNameStr, pointPerSecondFloat ) )
+
+def plotScalingCurve( benchmarkResultDict, plotPathStr ):
+	''' - plot number of contour vs time of each stage and save it
+	'''
+
+	# import matplotlib only when plot is requested
+	from matplotlib import pyplot as plt
+
+	# scene sorted by number of contour
+	sceneResultList = sorted( benchmarkResultDict[ 'sceneResultList' ], key=lambda sceneResultDict: sceneResultDict[ 'numberOfContour' ] )
+	numberOfContourList = [ sceneResultDict[ 'numberOfContour' ] for sceneResultDict in sceneResultList ]
+
+	# one line per stage
+	figure = plt.figure( figsize=( 8, 6 ) )
+	for stageNameStr in sceneResultList[ 0 ][ 'stageNameToResultDict' ]:
+		plt.plot( numberOfContourList, [ sceneResultDict[ 'stageNameToResultDict' ][ stageNameStr ][ 'timeMsFloat' ] for sceneResultDict in sceneResultList ], marker='o', label=stageNameStr )
+
+	plt.xlabel( 'number of contour' )
+	plt.ylabel( 'time ( ms )' )
+	plt.legend()
+	figure.savefig( plotPathStr )
+
+if __name__ == '__main__':
+
+	# argument parser
+	parser = argparse.ArgumentParser()
+	parser.add_argument( '--repeat', dest='numberOfRepeat', type=int, default=5,
+						help='number of run of each stage, best time is kept' )
+	parser.add_argument( '--save-baseline', dest='saveBaselinePathStr', type=str, default=None,
+						help='save result as baseline JSON file' )
+	parser.add_argument( '--baseline', dest='baselinePathStr', type=str, default=None,
+						help='compare result with this baseline JSON file and exit with error on regression' )
+	parser.add_argument( '--tolerance', dest='tolerancePercentFloat', type=float, default=25.0,
+						help='allowed slowdown compared to baseline ( in percent )' )
+	parser.add_argument( '--plot', dest='plotPathStr', type=str, default=None,
+						help='save scaling curve, number of contour vs time, to this image file' )
+	args = parser.parse_args()
+
+	# run benchmark
+	benchmarkResultDict = runBenchmark( numberOfRepeat=args.numberOfRepeat )
+	printBenchmarkResult( benchmarkResultDict )
+
+	# save baseline
+	if args.saveBaselinePathStr is not None:
+		with open( args.saveBaselinePathStr, 'w' ) as baselineFile:
+			json.dump( benchmarkResultDict, baselineFile, indent=1 )
+
+	# plot scaling curve
+	if args.plotPathStr is not None:
+		plotScalingCurve( benchmarkResultDict, args.plotPathStr )
+
+	# compare with baseline
+	if args.baselinePathStr is not None:
+		with open( args.baselinePathStr ) as baselineFile:
+			regressionList = compareWithBaseline( benchmarkResultDict, json.load( baselineFile ), args.tolerancePercentFloat )
+		for regressionStr in regressionList:
+			print( '[benchmark] regression: {}'.format( regressionStr ) )
+		if regressionList:
+			raise SystemExit( 1 )
@@ -0,0 +1,408 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# array operation
+import numpy as np
+
+# find contour of each level in parallel
+from concurrent.futures import ThreadPoolExecutor
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from contour_manipulation import ContourStorage
+
+from detection_pipeline import detectOuterMostContour, extractPoseList, BinaryThresholdInt
+
+from instrumentation import profiler
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# binarization method
+# - global --> one fixed threshold, same as convertToBinaryImage
+# - otsu --> one threshold from histogram of each frame
+# - adaptiveMean, adaptiveGaussian --> threshold of each pixel is local mean of its block minus offset
+# - multiLevel --> several threshold, fixed or from histogram of each frame, each one gives its own binary image
+BinarizationMethodStrTuple = ( 'global', 'otsu', 'adaptiveMean', 'adaptiveGaussian', 'multiLevel' )
+
+# block size and offset of adaptive method
+DefaultAdaptiveBlockSizeInt = 51
+DefaultAdaptiveOffsetInt = 5
+
+# number of threshold found from histogram in multi level method
+DefaultNumberOfThresholdInt = 2
+
+# number of gray level in histogram
+NumberOfGrayLevelInt = 256
+
+def calculateMultiLevelThresholdList( grayScaleImage, numberOfThresholdInt=DefaultNumberOfThresholdInt ):
+	''' - find threshold which maximize between class variance ( multi level Otsu ) in one pass over the image
+
+		- image is read once to build its histogram, best split of histogram into numberOfThresholdInt + 1 class
+		  is then found by dynamic programming over gray level, so cost does not grow with image size
+
+		- with one threshold the result is the same as cv2.THRESH_OTSU
+
+		ARGS:
+			- grayScaleImage ( numpy array )
+			- numberOfThresholdInt ( int )
+
+		RETURN:
+			- thresholdList ( list ) --> ascending, pixel brighter than threshold is white
+	'''
+
+	# histogram of gray level
+	histogramArray = cv2.calcHist( [ grayScaleImage ], [ 0 ], None, [ NumberOfGrayLevelInt ], [ 0, NumberOfGrayLevelInt ] ).ravel().astype( np.float64 )
+
+	# cumulative weight and cumulative sum of gray level, position i is sum of all gray level below i
+	cumulativeWeightArray = np.concatenate( [ [ 0.0 ], np.cumsum( histogramArray ) ] )
+	cumulativeSumArray = np.concatenate( [ [ 0.0 ], np.cumsum( histogramArray * np.arange( NumberOfGrayLevelInt ) ) ] )
+
+	# score of class with gray level in [ start, end ), weight * mean ** 2, empty or reversed class is not allowed
+	classWeightMatrix = cumulativeWeightArray[ None, : ] - cumulativeWeightArray[ :, None ]
+	classSumMatrix = cumulativeSumArray[ None, : ] - cumulativeSumArray[ :, None ]
+	with np.errstate( divide='ignore', invalid='ignore' ):
+		classScoreMatrix = np.where( classWeightMatrix > 0, classSumMatrix ** 2 / classWeightMatrix, 0.0 )
+	classScoreMatrix[ np.tril_indices( NumberOfGrayLevelInt + 1 ) ] = -np.inf
+
+	# best score of first class ending at each gray level
+	bestScoreArray = classScoreMatrix[ 0 ]
+
+	# start of last class of best split ending at each gray level, one row per added class
+	classStartArrayList = list()
+
+	# add one class per threshold
+	for _ in range( numberOfThresholdInt ):
+		scoreMatrix = bestScoreArray[ :, None ] + classScoreMatrix
+		classStartArrayList.append( np.argmax( scoreMatrix, axis=0 ) )
+		bestScoreArray = scoreMatrix[ classStartArrayList[ -1 ], np.arange( NumberOfGrayLevelInt + 1 ) ]
+
+	# walk back from the last gray level, class starting at gray level i means threshold i - 1
+	thresholdList = list()
+	classEndInt = NumberOfGrayLevelInt
+	for classStartArray in reversed( classStartArrayList ):
+		classEndInt = int( classStartArray[ classEndInt ] )
+		thresholdList.append( classEndInt - 1 )
+
+	return sorted( thresholdList )
+
+class Binarizer:
+	''' - pluggable binarization stage, turns one frame into one binary image per level
+
+		- contour of each level is found in parallel by a thread pool, cv2 releases GIL while it works,
+		  and contour tree of all level is joined into one contour storage
+
+		- adaptive method computes local mean of each frame once and shares it across all offset,
+		  so several offset cost one extra comparison each instead of one more filter each
+	'''
+
+	def __init__( self, methodStr='global', thresholdList=None, numberOfThresholdInt=DefaultNumberOfThresholdInt,
+				  blockSizeInt=DefaultAdaptiveBlockSizeInt, offsetList=None, numberOfWorker=None ):
+		''' ARGS:
+				- methodStr ( str ) --> one of BinarizationMethodStrTuple
+				- thresholdList ( list ) --> threshold of global method ( first one ) or fixed threshold of multi level method,
+											 None means BinaryThresholdInt for global and histogram threshold for multi level
+				- numberOfThresholdInt ( int ) --> number of histogram threshold of multi level method
+				- blockSizeInt ( int ) --> odd block size of adaptive method
+				- offsetList ( list ) --> offset of adaptive method, one level per offset
+				- numberOfWorker ( int ) --> number of thread to find contour, None means one per level
+		'''
+
+		assert methodStr in BinarizationMethodStrTuple, 'unknown binarization method {}'.format( methodStr )
+		assert blockSizeInt % 2 == 1 and blockSizeInt > 1, 'block size must be odd and greater than 1 but got {}'.format( blockSizeInt )
+
+		# binarization method and its parameter
+		self.methodStr = methodStr
+		self.thresholdList = list( thresholdList ) if thresholdList else None
+		self.numberOfThresholdInt = numberOfThresholdInt
+		self.blockSizeInt = blockSizeInt
+		self.offsetList = list( offsetList ) if offsetList else [ DefaultAdaptiveOffsetInt ]
+
+		# thread pool to find contour of each level, created on first multi level frame
+		self.numberOfWorker = numberOfWorker
+		self.executor = None
+
+		# threshold or offset used for latest frame
+		self.latestLevelList = list()
+
+	@property
+	def isAdaptive( self ):
+		''' - check if threshold of each pixel depends on its neighbour
+		'''
+		return self.methodStr in ( 'adaptiveMean', 'adaptiveGaussian' )
+
+	def calculateThresholdList( self, grayScaleImage ):
+		''' - threshold of each level for global, otsu and multi level method
+
+			RETURN:
+				- thresholdList ( list )
+		'''
+
+		# fixed threshold
+		if self.methodStr == 'global':
+			return [ self.thresholdList[ 0 ] if self.thresholdList else BinaryThresholdInt ]
+		if self.methodStr == 'multiLevel' and self.thresholdList:
+			return self.thresholdList
+
+		# threshold from histogram of this frame
+		return calculateMultiLevelThresholdList( grayScaleImage, 1 if self.methodStr == 'otsu' else self.numberOfThresholdInt )
+
+	def _calculateLocalMeanImage( self, grayScaleImage ):
+		''' - local mean of each pixel over its block, with the same filter and border as cv2.adaptiveThreshold
+
+			RETURN:
+				- localMeanImage ( numpy array ) --> int16 so that offset can be subtracted without saturation
+		'''
+
+		# box mean, computed with running sum so its cost does not depend on block size
+		if self.methodStr == 'adaptiveMean':
+			localMeanImage = cv2.boxFilter( grayScaleImage, -1, ( self.blockSizeInt, self.blockSizeInt ), normalize=True,
+											borderType=cv2.BORDER_REPLICATE | cv2.BORDER_ISOLATED )
+
+		# gaussian weighted mean, blurred in float and rounded like cv2.adaptiveThreshold does
+		else:
+			localMeanImage = np.rint( cv2.GaussianBlur( grayScaleImage.astype( np.float32 ), ( self.blockSizeInt, self.blockSizeInt ), 0,
+														borderType=cv2.BORDER_REPLICATE | cv2.BORDER_ISOLATED ) )
+
+		return localMeanImage.astype( np.int16 )
+
+	def binarize( self, image ):
+		''' - convert BGR or gray scale image to binary image of each level
+
+			RETURN:
+				- binaryImageList ( list ) --> one binary image per level, pixel is 0 or 255
+		'''
+
+		# converting image into grayscale image if it is not
+		grayScaleImage = image if image.ndim == 2 else cv2.cvtColor( image, cv2.COLOR_BGR2GRAY )
+
+		# each level with its binarize function
+		return [ binarizeFunction() for binarizeFunction in self._prepareLevelFunctionList( grayScaleImage ) ]
+
+	def _prepareLevelFunctionList( self, grayScaleImage ):
+		''' - run work shared by every level once, and get function which binarizes each level
+
+			RETURN:
+				- binarizeFunctionList ( list ) --> each function returns binary image of one level
+		'''
+
+		# threshold is local mean minus offset, pixel brighter than its threshold is white like cv2.adaptiveThreshold
+		if self.isAdaptive:
+			localMeanImage = self._calculateLocalMeanImage( grayScaleImage )
+			grayScaleInt16Image = grayScaleImage.astype( np.int16 )
+			self.latestLevelList = self.offsetList
+			return [ lambda offsetInt=offsetInt: cv2.compare( grayScaleInt16Image, localMeanImage - offsetInt, cv2.CMP_GT ) for offsetInt in self.offsetList ]
+
+		# one global threshold per level
+		self.latestLevelList = self.calculateThresholdList( grayScaleImage )
+		return [ lambda thresholdInt=thresholdInt: cv2.threshold( grayScaleImage, thresholdInt, 255, cv2.THRESH_BINARY )[ 1 ] for thresholdInt in self.latestLevelList ]
+
+	def _findContourTreeOfAllLevel( self, binarizeFunctionList ):
+		''' - binarize each level and find its contour tree, one task per level in thread pool
+
+			RETURN:
+				- contourTreeList ( list ) --> ( contourList, hierarchy ) of each level
+		'''
+
+		# binarize one level and find its contour, run by worker thread
+		def findContourTreeOfLevel( binarizeFunction ):
+			return cv2.findContours( binarizeFunction(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE )
+
+		# only one level, no thread needed
+		if len( binarizeFunctionList ) == 1:
+			return [ findContourTreeOfLevel( binarizeFunctionList[ 0 ] ) ]
+
+		# thread pool is created on first multi level frame
+		if self.executor is None:
+			self.executor = ThreadPoolExecutor( max_workers=self.numberOfWorker or len( binarizeFunctionList ), thread_name_prefix='binarizer' )
+
+		return list( self.executor.map( findContourTreeOfLevel, binarizeFunctionList ) )
+
+	def createContourStorage( self, image ):
+		''' - binarize image and find contour tree of each level in parallel, then join them into one contour storage
+
+			RETURN:
+				- contourStorageObj ( ContourStorage )
+		'''
+
+		# converting image into grayscale image if it is not
+		grayScaleImage = image if image.ndim == 2 else cv2.cvtColor( image, cv2.COLOR_BGR2GRAY )
+
+		# work shared by every level, e.g. histogram or local mean
+		with profiler.measureStage( 'threshold' ):
+			binarizeFunctionList = self._prepareLevelFunctionList( grayScaleImage )
+
+		# binarize and find contour of each level
+		with profiler.measureStage( 'findContours' ):
+			contourTreeList = self._findContourTreeOfAllLevel( binarizeFunctionList )
+
+		return joinContourTreeList( contourTreeList )
+
+	def createContourStorageFromBinaryImageList( self, binaryImageList ):
+		''' - find contour tree of binary image of each level in parallel, then join them into one contour storage
+
+			RETURN:
+				- contourStorageObj ( ContourStorage )
+		'''
+
+		# find contour of each level
+		with profiler.measureStage( 'findContours' ):
+			contourTreeList = self._findContourTreeOfAllLevel( [ lambda binaryImage=binaryImage: binaryImage for binaryImage in binaryImageList ] )
+
+		return joinContourTreeList( contourTreeList )
+
+	def close( self ):
+		''' - stop thread pool
+		'''
+		if self.executor is not None:
+			self.executor.shutdown()
+			self.executor = None
+
+	def getStatistic( self ):
+		''' - method and threshold or offset of each level of latest frame
+
+			RETURN:
+				- statisticDict ( dict )
+		'''
+		return { 'methodStr' : self.methodStr,
+				 'levelList' : self.latestLevelList }
+
+def joinContourTreeList( contourTreeList ):
+	''' - join contour tree of each level into one contour storage
+
+		- index in hierarchy of each level is shifted by number of contour of level before it,
+		  so every level stays its own contour tree
+
+		ARGS:
+			- contourTreeList ( list ) --> ( contourList, hierarchy ) of each level
+
+		RETURN:
+			- contourStorageObj ( ContourStorage )
+	'''
+
+	# contour and hierarchy of all level
+	allContourList = list()
+	hierarchyList = list()
+
+	# loop through contour tree of each level
+	for contourList, hierarchy in contourTreeList:
+
+		# no contour in this level
+		if not contourList:
+			continue
+
+		# shift index in hierarchy by number of contour already stored, -1 stays -1
+		indexOffsetInt = len( allContourList )
+		hierarchyList.append( np.where( hierarchy >= 0, hierarchy + indexOffsetInt, hierarchy ) )
+		allContourList.extend( contourList )
+
+	# count raw contour
+	profiler.addCount( 'contour', len( allContourList ) )
+
+	with profiler.measureStage( 'contourConstruction' ):
+		return ContourStorage( allContourList, np.concatenate( hierarchyList, axis=1 ) if hierarchyList else None )
+
+def removeNestedDuplicateContourObj( contourObjList ):
+	''' - keep only contour object whose center is not inside a larger contour object of the same shape
+
+		- the same marker found in several level is kept once with its largest contour, like outer most filter does
+		  inside one contour tree
+
+		ARGS:
+			- contourObjList ( list ) --> contour object with center point
+
+		RETURN:
+			- keptContourObjList ( list ) --> in the same order as input
+	'''
+
+	# kept contour object
+	keptContourObjList = list()
+
+	# larger contour object first
+	for contourObj in sorted( contourObjList, key=lambda contourObj: contourObj.area, reverse=True ):
+
+		# center is inside a kept contour object of the same shape
+		if any( keptContourObj.shapeTypeStr == contourObj.shapeTypeStr and
+				cv2.pointPolygonTest( keptContourObj.contour, contourObj.centerPointTuple, False ) >= 0
+				for keptContourObj in keptContourObjList ):
+			continue
+
+		# store it
+		keptContourObjList.append( contourObj )
+
+	# keep input order
+	keptContourObjIdSet = { id( contourObj ) for contourObj in keptContourObjList }
+	return [ contourObj for contourObj in contourObjList if id( contourObj ) in keptContourObjIdSet ]
+
+def detectOuterMostContourOfAllLevel( contourStorageObj, numberOfLevelInt ):
+	''' - detect outer most contour of each shape in contour storage joined from several level
+
+		- marker found in several level is kept once
+
+		RETURN:
+			- contourStorageObj ( ContourStorage ) --> with outerMost*ContourObjList
+	'''
+
+	# detect outer most contour of each shape in every level
+	detectOuterMostContour( contourStorageObj )
+
+	# only one level, no duplicate
+	if numberOfLevelInt <= 1:
+		return contourStorageObj
+
+	with profiler.measureStage( 'removeNestedDuplicate' ):
+		contourStorageObj.outerMostCircleContourObjList = removeNestedDuplicateContourObj( contourStorageObj.outerMostCircleContourObjList )
+		contourStorageObj.outerMostTriangleContourObjList = removeNestedDuplicateContourObj( contourStorageObj.outerMostTriangleContourObjList )
+		contourStorageObj.outerMostSquareContourObjList = removeNestedDuplicateContourObj( contourStorageObj.outerMostSquareContourObjList )
+
+	return contourStorageObj
+
+def detectOuterMostContourWithBinarizer( image, binarizerObj ):
+	''' - find contour of every binarization level and detect outer most contour of each shape
+
+		RETURN:
+			- contourStorageObj ( ContourStorage ) --> with outerMost*ContourObjList
+	'''
+	return detectOuterMostContourOfAllLevel( binarizerObj.createContourStorage( image ), len( binarizerObj.latestLevelList ) )
+
+def processFrameWithBinarizer( image, binarizerObj ):
+	''' - run the whole detection on one frame like processFrame, with pluggable binarization
+
+		RETURN:
+			- poseList ( list )
+	'''
+	return extractPoseList( detectOuterMostContourWithBinarizer( image, binarizerObj ) )
+
+def streamPoseFromFrameWithBinarizer( frameIterator, binarizerObj ):
+	''' - generator pipeline like streamPoseFromFrame, with pluggable binarization
+
+		ARGS:
+			- frameIterator ( iterator ) --> yield ( frameIndex, frame )
+			- binarizerObj ( Binarizer )
+
+		YIELD:
+			- ( frameIndex, poseList ) ( tuple )
+	'''
+
+	# loop through each frame
+	for frameIndex, frame in frameIterator:
+
+		# detect pose in this frame
+		profiler.beginFrame( frameIndex )
+		poseList = processFrameWithBinarizer( frame, binarizerObj )
+		profiler.endFrame()
+
+		yield frameIndex, poseList
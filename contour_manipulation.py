@@ -7,21 +7,26 @@
 # image processing
 import cv2
 
-# display image
-from matplotlib import pyplot as plt
-
 # mathematical operation
 import math
 
+# array operation
+import numpy as np
+
 #####################################################################################################
 #
 # Local Import
 #
 #####################################################################################################
 
-from helper import calculateVectorMagnitude, \
-					findParallelPointWithMagnitude, \
-					findPerpendicularPoint
+from helper import findParallelPointWithMagnitudeArray, \
+					findPerpendicularPointArray
+
+from spatial_index import BoundingBoxGridIndex
+
+from instrumentation import profiler
+
+from approximation_cache import approximatedPolygonCache
 
 #####################################################################################################
 #
@@ -30,6 +35,31 @@ from helper import calculateVectorMagnitude, \
 #####################################################################################################
 OpenCVWorldCoordinateTuple = ( 0, 0 )
 
+# pre filter threshold, loose enough to keep every convex marker, only concave or ragged blob is rejected
+# circularity is 4 * pi * area / perimeter ^ 2, equilateral triangle is about 0.6, circle is 1
+PreFilterMinCircularityFloat = 0.05
+
+# solidity is area / convex hull area, triangle, square and circle are convex so close to 1
+PreFilterMinSolidityFloat = 0.5
+
+# first Hu moment, circle is about 0.159, square is about 0.167, 3 : 1 rectangle is about 0.278
+PreFilterMaxFirstHuMomentFloat = 0.35
+
+# pre filter stage used by default, only aspect ratio which is bounded by the rule itself and never changes shape label
+# - circularity, solidity and Hu moment threshold are heuristic and can reject contour which the rule would accept,
+#   so they change shape label and must be asked for explicitly by caller which accepts that trade off
+# - convex hull ( solidity ) and moment ( Hu moment ) also cost more than approxPolyDP on CHAIN_APPROX_SIMPLE contour
+DefaultPreFilterStageNameTuple = ( 'aspectRatio', )
+
+# shape classification rule parameter
+# - epsilon percent of approxPolyDP for each shape rule
+# - error percent of bounding box aspect ratio for circle and square rule
+DefaultShapeRuleParameterDict = { 'circleEpsilonPercent' : 4,
+								  'triangleEpsilonPercent' : 5,
+								  'squareEpsilonPercent' : 4,
+								  'circleErrorPercent' : 6,
+								  'squareErrorPercent' : 5 }
+
 
 class ContourStorage:
 	''' - store and manage contour object by its type
@@ -38,19 +68,36 @@ class ContourStorage:
 			- square contour
 			- triangle contour
 			- circle contour
+
+		- hierarchy from cv2.findContours with RETR_TREE can be given to find outer most contour
+		  by walking the contour tree instead of pairwise polygon test
+
+		- area of all contour is calculated once into an array, contour object is only created
+		  for contour which is actually used, e.g. contour which passes the area filter
+
+		- shape classification can reject contour with cheap descriptor before running approxPolyDP
 	'''
 	
-	def __init__( self, contourList ):
+	def __init__( self, contourList, hierarchy=None, preFilterStageNameTuple=DefaultPreFilterStageNameTuple ):
 
 		# all contour storage
 		self.allContourList = contourList
 
-		# all contour object storage
-		self.allContourObjList = list()
+		# parent contour index of each contour, -1 means no parent
+		# None if hierarchy is not given
+		self.parentIndexList = None
 
-		# convert contour to contour object
-		# this is going to use for further processing
-		self._createContourObj()
+		# hierarchy is given
+		if hierarchy is not None and len( contourList ) > 0:
+
+			# hierarchy shape is ( 1, N, 4 ) --> [ next, previous, first child, parent ]
+			self.parentIndexList = [ int( hierarchyRow[ 3 ] ) for hierarchyRow in hierarchy[ 0 ] ]
+
+		# area of each contour, same position as contour list
+		self.contourAreaArray = np.array( [ cv2.contourArea( contour ) for contour in contourList ], dtype=np.float64 )
+
+		# contour index to contour object which is already created
+		self.contourIndexToContourObjDict = dict()
 
 		# contour contour in area range storage
 		self.contourObjInAreaRangeList = list()
@@ -73,18 +120,71 @@ class ContourStorage:
 		# outer most circle contour object storage
 		self.outerMostCircleContourObjList = list()
 
-	def _createContourObj( self ):
-		''' - construct contour object from list of contour
+		# bounding box spatial index of all contour object
+		# built once on first use by outer most filter
+		self.boundingBoxGridIndex = None
+
+		# pre filter stage to run before approxPolyDP in shape classification, empty means no pre filter
+		# stage is one of 'circularity', 'solidity', 'aspectRatio', 'huMoment'
+		self.preFilterStageNameTuple = preFilterStageNameTuple
+
+		# pre filter stage name to number of contour rejected by it
+		self.preFilterRejectCountDict = { 'circularity' : 0, 'solidity' : 0, 'aspectRatio' : 0, 'huMoment' : 0 }
+
+	def _getContourObj( self, contourIndex ):
+		''' - get contour object of contour at index, create it on first use
+
+			RETURN:
+				- contourObj ( Contour )
+		'''
+
+		# contour object is not created yet
+		if contourIndex not in self.contourIndexToContourObjDict:
+
+			# create contour object with precalculated area
+			self.contourIndexToContourObjDict[ contourIndex ] = Contour( self.allContourList[ contourIndex ], contourIndex, float( self.contourAreaArray[ contourIndex ] ) )
+
+		return self.contourIndexToContourObjDict[ contourIndex ]
+
+	def excludeContourFromAreaFilter( self, contourIndexList ):
+		''' - make contour never pass area filter, e.g. contour which is cut by the border of region of interest
+		'''
+
+		# NaN area fails every area range comparison
+		self.contourAreaArray[ list( contourIndexList ) ] = np.nan
+
+	def resetClassification( self ):
+		''' - clear result of area filter, shape classification and outer most filter so detection can run again
+			  with other parameter
+
+			- contour, its area and contour object with its approximated polygon are kept, so approxPolyDP
+			  already run for an epsilon is not run again
 		'''
 
-		# loop through each contour
-		for contour in self.allContourList:
+		# clear shape type of every created contour object
+		for contourObj in self.contourIndexToContourObjDict.values():
+			contourObj.shapeTypeStr = None
+
+		# clear result storage
+		self.contourObjInAreaRangeList = list()
+		self.squareContourObjList = list()
+		self.triangleContourObjList = list()
+		self.circleContourObjList = list()
+		self.outerMostSquareContourObjList = list()
+		self.outerMostTriangleContourObjList = list()
+		self.outerMostCircleContourObjList = list()
+
+		# spatial index only covers contour object created so far
+		self.boundingBoxGridIndex = None
 
-			# create contour object
-			contourObj = Contour( contour )
+		# clear pre filter counter
+		self.preFilterRejectCountDict = dict.fromkeys( self.preFilterRejectCountDict, 0 )
 
-			# store contour object
-			self.allContourObjList.append( contourObj )
+	@property
+	def allContourObjList( self ):
+		''' - contour object of every contour, create all of them if not created yet
+		'''
+		return [ self._getContourObj( contourIndex ) for contourIndex in range( len( self.allContourList ) ) ]
 
 	def filterContoursOnlyInAreaRange( self, minArea=0, maxArea=0 ):
 		''' - get only contour in area range
@@ -98,14 +198,15 @@ class ContourStorage:
 				- contourObjInAreaRangeList ( list )
 		'''
 
-		# loop through each contour object
-		for contourObj in self.allContourObjList:
+		# index of contour in area range
+		contourIndexInAreaRangeArray = np.flatnonzero( ( minArea <= self.contourAreaArray ) & ( self.contourAreaArray <= maxArea ) )
+
+		# loop through each contour in area range
+		for contourIndex in contourIndexInAreaRangeArray:
+
+			# create contour object and store it
+			self.contourObjInAreaRangeList.append( self._getContourObj( int( contourIndex ) ) )
 
-			# this contour is in range
-			if minArea <= contourObj.area <= maxArea:
-				
-				# store it
-				self.contourObjInAreaRangeList.append( contourObj )
 		return self.contourObjInAreaRangeList
 
 	def isOuterMostContour( self, contourObj, otherContourObjList, epsilonPercent ):
@@ -132,6 +233,131 @@ class ContourStorage:
 		# this is the outer most contour
 		return True
 
+	def _isOwnContourObj( self, contourObj ):
+		''' - check if this contour object was created by this storage
+		'''
+		return self.contourIndexToContourObjDict.get( contourObj.contourIndex ) is contourObj
+
+	def _filterOuterMostContourIndexByHierarchy( self, contourObjList ):
+		''' - find contour object which has no ancestor in the same contour object list by walking contour tree
+
+			ARGS:
+				- contourObjList ( list )
+
+			RETURN:
+				- outerMostContourIndexSet ( set )
+		'''
+
+		# index of all contour in list
+		contourIndexSet = { contourObj.contourIndex for contourObj in contourObjList }
+
+		# contour index to whether it has an ancestor in contour index set
+		contourIndexToHasAncestorDict = dict()
+
+		# loop through each contour object
+		for contourObj in contourObjList:
+
+			# walk up contour tree until we know the answer
+			walkedContourIndexList = list()
+			contourIndex = contourObj.contourIndex
+			hasAncestor = False
+			while True:
+
+				# get parent of current contour
+				parentIndex = self.parentIndexList[ contourIndex ]
+
+				# reach root of contour tree
+				if parentIndex < 0:
+					break
+
+				# parent is in the same list
+				if parentIndex in contourIndexSet:
+					hasAncestor = True
+					break
+
+				# answer for parent is already known
+				if parentIndex in contourIndexToHasAncestorDict:
+					hasAncestor = contourIndexToHasAncestorDict[ parentIndex ]
+					break
+
+				# go up one level
+				walkedContourIndexList.append( parentIndex )
+				contourIndex = parentIndex
+
+			# store answer for this contour and every walked contour
+			contourIndexToHasAncestorDict[ contourObj.contourIndex ] = hasAncestor
+			for walkedContourIndex in walkedContourIndexList:
+				contourIndexToHasAncestorDict[ walkedContourIndex ] = hasAncestor
+
+		return { contourIndex for contourIndex in contourIndexSet if not contourIndexToHasAncestorDict[ contourIndex ] }
+
+	def filterOnlyOuterMostContourObjByHierarchy( self, contourObjList ):
+		''' - contour object which has no ancestor in the same list by walking contour tree only,
+			  no polygon is approximated, e.g. when only region of every outer most contour is needed
+
+			ARGS:
+				- contourObjList ( list ) --> contour object of this storage, storage must have hierarchy
+
+			RETURN:
+				- outerMostContourObjList ( list )
+		'''
+
+		assert self.parentIndexList is not None, 'contour storage has no hierarchy'
+
+		# find outer most contour index
+		outerMostContourIndexSet = self._filterOuterMostContourIndexByHierarchy( contourObjList )
+
+		return [ contourObj for contourObj in contourObjList if contourObj.contourIndex in outerMostContourIndexSet ]
+
+	def _getBoundingBoxGridIndex( self ):
+		''' - get bounding box spatial index of all created contour object, build it if not exist yet
+		'''
+
+		# index is not built yet
+		if self.boundingBoxGridIndex is None:
+
+			# build index over all created contour object
+			self.boundingBoxGridIndex = BoundingBoxGridIndex( list( self.contourIndexToContourObjDict.values() ) )
+
+		return self.boundingBoxGridIndex
+
+	def _isOuterMostContourWithIndex( self, contourObj, otherContourObjIdSet, epsilonPercent ):
+		''' - same check as isOuterMostContour but only run polygon test against contour object 
+			  whose bounding box contains the point
+
+			ARGS:
+				- contourObj ( Contour )
+				- otherContourObjIdSet ( set ) --> id of other contour object
+				- epsilonPercent ( int )
+		'''
+
+		# get spatial index
+		boundingBoxGridIndex = self._getBoundingBoxGridIndex()
+
+		# approximate polygon of contour object
+		approximatedPointList = contourObj.approximatePolygonOfContour( epsilonPercent )
+
+		# loop each point in approximated polygon
+		for point in approximatedPointList:
+
+			pointTuple = ( int( point[ 0 ][ 0 ] ), int( point[ 0 ][ 1 ] ) )
+
+			# loop through candidate contour object which bounding box contains this point
+			for otherContourObj in boundingBoxGridIndex.queryContourObjContainingPoint( pointTuple ):
+
+				# candidate is not in the other contour object list
+				if id( otherContourObj ) not in otherContourObjIdSet:
+					continue
+
+				# point is inside other approximated polygon
+				if cv2.pointPolygonTest( otherContourObj.contour, pointTuple, False ) > 0:
+					
+					# this is NOT the outer most contour
+					return False
+
+		# this is the outer most contour
+		return True
+
 	def isSquareContour( self, contourObj, epsilonPercent, errorPercent ):
 		''' - check if this contour object is square shape
 
@@ -213,51 +439,271 @@ class ContourStorage:
 		# this contour is not circle
 		return False
 	
-	def classifyContourObjByShape( self ):
+	def _approximatePolygonOfAllContourObj( self, contourObjList, contourPerimeterArray, epsilonPercent ):
+		''' - approximate polygon of every contour object with one epsilon percent
+
+			- approximated point list is stored in each contour object so it can be reused later
+
+			RETURN:
+				- approximatedPointListList ( list )
+		'''
+
+		# approximated point list of each contour object
+		approximatedPointListList = list()
+
+		# loop through each contour object with its perimeter
+		for contourObj, contourPerimeter in zip( contourObjList, contourPerimeterArray ):
+
+			# approximated point list already exist for this epsilon
+			if epsilonPercent in contourObj.epsilonPercentToApproximatedPointListDict:
+				approximatedPointList = contourObj.epsilonPercentToApproximatedPointListDict[ epsilonPercent ]
+				profiler.addCount( 'approximatePolygonCache_hit' )
+
+			# calculate and store it
+			else:
+				profiler.addCount( 'approximatePolygonCache_miss' )
+				approximatedPointList = approximatedPolygonCache.approximatePolygon( contourObj.contour, epsilonPercent, contourPerimeter )
+				contourObj.epsilonPercentToApproximatedPointListDict[ epsilonPercent ] = approximatedPointList
+
+			approximatedPointListList.append( approximatedPointList )
+
+		return approximatedPointListList
+
+	def _rejectByPreFilter( self, stageNameStr, candidateMask, calculatePassMaskFunction ):
+		''' - remove candidate which fails pre filter stage and count it, do nothing if stage is not enabled
+
+			ARGS:
+				- stageNameStr ( str )
+				- candidateMask ( numpy array )
+				- calculatePassMaskFunction ( function ) --> called with candidate position array, return pass mask of them
+
+			RETURN:
+				- candidateMask ( numpy array ) --> candidate which passes this stage
+		'''
+
+		# stage is not enabled
+		if stageNameStr not in self.preFilterStageNameTuple:
+			return candidateMask
+
+		# calculate descriptor only for candidate
+		candidatePositionArray = np.flatnonzero( candidateMask )
+		passMask = np.asarray( calculatePassMaskFunction( candidatePositionArray ), dtype=bool )
+
+		# count rejected candidate
+		numberOfRejected = int( np.count_nonzero( ~passMask ) )
+		self.preFilterRejectCountDict[ stageNameStr ] += numberOfRejected
+		profiler.addCount( 'preFilterReject_' + stageNameStr, numberOfRejected )
+
+		# remove rejected candidate
+		candidateMask = candidateMask.copy()
+		candidateMask[ candidatePositionArray[ ~passMask ] ] = False
+
+		return candidateMask
+
+	def _preFilterContourObj( self, contourObjList, contourPerimeterArray, candidateMask=None, squareLikeEpsilonPercent=4, squareLikeErrorPercent=6 ):
+		''' - staged pre filter with descriptor cheaper than approxPolyDP, each stage only looks at 
+			  contour which passes the previous stage
+
+			- every shape rule:
+				- circularity from area and perimeter, heuristic and can change shape label
+				- solidity from convex hull, heuristic and can change shape label
+			- circle and square rule:
+				- bounding box aspect ratio of contour, approximated polygon lies within epsilon of
+				  contour so its bounding box can shrink by at most 2 * epsilon per axis
+				- first Hu moment, heuristic and can change shape label
+
+			- only aspect ratio is lossless, it is the only stage in DefaultPreFilterStageNameTuple
+
+			ARGS:
+				- contourObjList ( list )
+				- contourPerimeterArray ( numpy array )
+				- candidateMask ( numpy array ) --> contour to look at, all contour if not given
+				- squareLikeEpsilonPercent, squareLikeErrorPercent ( int ) --> the largest epsilon and error percent of circle and square rule
+
+			RETURN:
+				- ( anyShapeCandidateMask, squareLikeCandidateMask ) ( tuple )
+		'''
+
+		# area of all contour
+		contourAreaArray = np.array( [ contourObj.area for contourObj in contourObjList ] )
+
+		# circularity, every shape rule
+		def isCircularityPlausible( positionArray ):
+			return 4 * math.pi * contourAreaArray[ positionArray ] / np.maximum( contourPerimeterArray[ positionArray ], 1e-9 ) ** 2 >= PreFilterMinCircularityFloat
+
+		# solidity, every shape rule
+		def isSolidityPlausible( positionArray ):
+			hullAreaArray = np.array( [ cv2.contourArea( cv2.convexHull( contourObjList[ position ].contour ) ) for position in positionArray ] )
+			return contourAreaArray[ positionArray ] >= PreFilterMinSolidityFloat * hullAreaArray
+
+		# bounding box aspect ratio, circle and square rule
+		def isAspectRatioPlausible( positionArray ):
+
+			# bounding box of contour, shape is ( N, 4 ) --> x, y, width, height
+			boundingBoxArray = np.array( [ cv2.boundingRect( contourObjList[ position ].contour ) for position in positionArray ], dtype=np.float64 ).reshape( -1, 4 )
+
+			# largest shrink of approximated polygon bounding box per axis
+			maxShrinkArray = 2 * squareLikeEpsilonPercent / 100 * contourPerimeterArray[ positionArray ]
+
+			# aspect ratio range approximated polygon bounding box can reach with the widest error
+			minAspectRatioArray = np.maximum( boundingBoxArray[ :, 2 ] - maxShrinkArray, 1 ) / boundingBoxArray[ :, 3 ]
+			maxAspectRatioArray = boundingBoxArray[ :, 2 ] / np.maximum( boundingBoxArray[ :, 3 ] - maxShrinkArray, 1 )
+			return ( minAspectRatioArray <= 1 + squareLikeErrorPercent / 100 ) & ( maxAspectRatioArray >= 1 - squareLikeErrorPercent / 100 )
+
+		# first Hu moment, circle and square rule
+		def isHuMomentPlausible( positionArray ):
+			return np.array( [ cv2.HuMoments( cv2.moments( contourObjList[ position ].contour ) )[ 0, 0 ] for position in positionArray ] ) <= PreFilterMaxFirstHuMomentFloat
+
+		# every shape rule
+		anyShapeCandidateMask = np.ones( len( contourObjList ), dtype=bool ) if candidateMask is None else candidateMask
+		anyShapeCandidateMask = self._rejectByPreFilter( 'circularity', anyShapeCandidateMask, isCircularityPlausible )
+		anyShapeCandidateMask = self._rejectByPreFilter( 'solidity', anyShapeCandidateMask, isSolidityPlausible )
+
+		# circle and square rule
+		squareLikeCandidateMask = self._rejectByPreFilter( 'aspectRatio', anyShapeCandidateMask, isAspectRatioPlausible )
+		squareLikeCandidateMask = self._rejectByPreFilter( 'huMoment', squareLikeCandidateMask, isHuMomentPlausible )
+
+		return anyShapeCandidateMask, squareLikeCandidateMask
+
+	def _calculateVertexCountAndAspectRatio( self, candidateContourObjList, candidatePositionArray, contourPerimeterArray, epsilonPercent, isAspectRatioNeeded=True ):
+		''' - approximate polygon of candidate with one epsilon, get its vertex count and bounding box aspect ratio
+
+			- vertex count and aspect ratio of contour which is not candidate stay at 0, which fails every rule
+
+			RETURN:
+				- ( vertexCountArray, boundingBoxAspectRatioArray ) ( tuple ) --> one value per contour in area range
+		'''
+
+		# value of every contour in area range
+		vertexCountArray = np.zeros( len( self.contourObjInAreaRangeList ), dtype=np.int64 )
+		boundingBoxAspectRatioArray = np.zeros( len( self.contourObjInAreaRangeList ) )
+
+		# approximate polygon of candidate
+		approximatedPointListList = self._approximatePolygonOfAllContourObj( candidateContourObjList, contourPerimeterArray[ candidatePositionArray ], epsilonPercent )
+
+		# number of approximated point of each contour
+		vertexCountArray[ candidatePositionArray ] = [ len( approximatedPointList ) for approximatedPointList in approximatedPointListList ]
+
+		# aspect ratio of bounding box of approximated polygon, shape is ( N, 4 ) --> x, y, width, height
+		if isAspectRatioNeeded:
+			boundingBoxArray = np.array( [ cv2.boundingRect( approximatedPointList ) for approximatedPointList in approximatedPointListList ] ).reshape( -1, 4 )
+			boundingBoxAspectRatioArray[ candidatePositionArray ] = boundingBoxArray[ :, 2 ] / boundingBoxArray[ :, 3 ]
+
+		return vertexCountArray, boundingBoxAspectRatioArray
+
+	def classifyContourObjByShape( self, contourIndexToKnownShapeTypeDict=None, shapeRuleParameterDict=None ):
 		''' - classify contour object by its shape
 
 			- we are focusing only for 3 type of contour here:
 				- square
 				- circle
 				- triangle
+
+			- all contour object in area range are classified at once:
+				- perimeter, vertex count and bounding box aspect ratio are stored in numpy array
+				- cheap pre filter rejects implausible contour first, see _preFilterContourObj
+				- approxPolyDP runs once per distinct epsilon, only for candidate
+				- shape rules are applied as array mask with the same priority as
+				  isCircleContour --> isTriangleContour --> isSquareContour
+
+			- contour whose shape is already known, e.g. matched to a confirmed track, skips the rules
+
+			ARGS:
+				- contourIndexToKnownShapeTypeDict ( dict ) --> contour index to shape type, optional
+				- shapeRuleParameterDict ( dict ) --> override of DefaultShapeRuleParameterDict, optional
 		'''
 
+		# epsilon and error percent of each shape rule
+		shapeRuleParameterDict = dict( DefaultShapeRuleParameterDict, **( shapeRuleParameterDict or dict() ) )
+		circleEpsilonPercent = shapeRuleParameterDict[ 'circleEpsilonPercent' ]
+		triangleEpsilonPercent = shapeRuleParameterDict[ 'triangleEpsilonPercent' ]
+		squareEpsilonPercent = shapeRuleParameterDict[ 'squareEpsilonPercent' ]
+		circleErrorPercent = shapeRuleParameterDict[ 'circleErrorPercent' ]
+		squareErrorPercent = shapeRuleParameterDict[ 'squareErrorPercent' ]
+
+		# nothing to classify
+		if len( self.contourObjInAreaRangeList ) == 0:
+			return
+
+		# calculate perimeter of all contour
+		contourPerimeterArray = np.array( [ cv2.arcLength( contourObj.contour, True ) for contourObj in self.contourObjInAreaRangeList ] )
+
+		# shape type already known for each contour, None if unknown
+		if contourIndexToKnownShapeTypeDict is None:
+			contourIndexToKnownShapeTypeDict = dict()
+		knownShapeTypeList = [ contourIndexToKnownShapeTypeDict.get( contourObj.contourIndex ) for contourObj in self.contourObjInAreaRangeList ]
+		unknownShapeMask = np.array( [ knownShapeTypeStr is None for knownShapeTypeStr in knownShapeTypeList ], dtype=bool )
+		profiler.addCount( 'knownShapeContour', int( np.count_nonzero( ~unknownShapeMask ) ) )
+
+		# cheap pre filter, contour rejected here is not a plausible marker
+		anyShapeCandidateMask, squareLikeCandidateMask = self._preFilterContourObj( self.contourObjInAreaRangeList, contourPerimeterArray, unknownShapeMask,
+																				   max( circleEpsilonPercent, squareEpsilonPercent ), max( circleErrorPercent, squareErrorPercent ) )
+
+		# approximate polygon for circle and square rule, only for candidate
+		squareLikeCandidatePositionArray = np.flatnonzero( squareLikeCandidateMask )
+		squareLikeCandidateContourObjList = [ self.contourObjInAreaRangeList[ contourPosition ] for contourPosition in squareLikeCandidatePositionArray ]
+		circleVertexCountArray, circleAspectRatioArray = self._calculateVertexCountAndAspectRatio( squareLikeCandidateContourObjList, squareLikeCandidatePositionArray, contourPerimeterArray, circleEpsilonPercent )
+		if squareEpsilonPercent == circleEpsilonPercent:
+			squareVertexCountArray, squareAspectRatioArray = circleVertexCountArray, circleAspectRatioArray
+		else:
+			squareVertexCountArray, squareAspectRatioArray = self._calculateVertexCountAndAspectRatio( squareLikeCandidateContourObjList, squareLikeCandidatePositionArray, contourPerimeterArray, squareEpsilonPercent )
+
+		# approximate polygon for triangle rule, only for candidate
+		anyShapeCandidatePositionArray = np.flatnonzero( anyShapeCandidateMask )
+		triangleVertexCountArray, _ = self._calculateVertexCountAndAspectRatio( [ self.contourObjInAreaRangeList[ contourPosition ] for contourPosition in anyShapeCandidatePositionArray ], anyShapeCandidatePositionArray, contourPerimeterArray, triangleEpsilonPercent, isAspectRatioNeeded=False )
+
+		# circle: approximate point is more than 5 and bounding box is square with error
+		circleMask = ( circleVertexCountArray > 5 ) & ( 1 - circleErrorPercent / 100 <= circleAspectRatioArray ) & ( circleAspectRatioArray <= 1 + circleErrorPercent / 100 )
+
+		# triangle: approximate point is 3
+		triangleMask = ~circleMask & ( triangleVertexCountArray == 3 )
+
+		# square: approximate point is 4 and bounding box is square with error
+		squareMask = ~circleMask & ~triangleMask & ( squareVertexCountArray == 4 ) & ( 1 - squareErrorPercent / 100 <= squareAspectRatioArray ) & ( squareAspectRatioArray <= 1 + squareErrorPercent / 100 )
+
+		# contour with known shape type
+		circleMask |= np.array( [ knownShapeTypeStr == 'circle' for knownShapeTypeStr in knownShapeTypeList ], dtype=bool )
+		triangleMask |= np.array( [ knownShapeTypeStr == 'triangle' for knownShapeTypeStr in knownShapeTypeList ], dtype=bool )
+		squareMask |= np.array( [ knownShapeTypeStr == 'square' for knownShapeTypeStr in knownShapeTypeList ], dtype=bool )
+
 		# loop through each contour object in area range
-		for contourObj in self.contourObjInAreaRangeList:
-			
+		for contourPosition, contourObj in enumerate( self.contourObjInAreaRangeList ):
+
+			# latest epsilon used by one by one classification
+			contourObj.latestEpsilonPercent = triangleEpsilonPercent if triangleMask[ contourPosition ] else squareEpsilonPercent if squareMask[ contourPosition ] else circleEpsilonPercent
+
 			# this is circle contour
-			if self.isCircleContour( contourObj, 4, 6 ):
+			if circleMask[ contourPosition ]:
 			
 				# store contour object in circle contour storage
 				self.circleContourObjList.append( contourObj )
 
 				# set contour's shape type
 				contourObj.shapeTypeStr = 'circle'
-				continue
 
 			# this is triangle contour
-			if self.isTriangleContour( contourObj, 5 ):
+			elif triangleMask[ contourPosition ]:
 
 				# store contour object in triangle contour storage
 				self.triangleContourObjList.append( contourObj )
 
 				# set contour's shape type
 				contourObj.shapeTypeStr = 'triangle'
-				continue
 
 			# this is square contour
-			if self.isSquareContour( contourObj, 4, 5 ):
+			elif squareMask[ contourPosition ]:
 
 				# store contour object in square contour storage
 				self.squareContourObjList.append( contourObj )
 
 				# set contour's shape type
 				contourObj.shapeTypeStr = 'square'
-				continue
 	
 	def filterOnlyOuterMostContourObj( self, contourObjList, epsilonPercent, returnDebugVariable = False ):
 		''' - filter to get only the outer most contour obj from contour object list
 
+			- walk contour tree if hierarchy is given, otherwise check each pair of contour
+
 			ARGS: 
 				- contourObjList ( list ) --> input contour list
 				- epsilonPercent ( int )
@@ -269,37 +715,130 @@ class ContourStorage:
 		# outer most contour object storage
 		outerMostContourObjList = list()
 
+		# hierarchy is known and all contour object came from this storage, then walk contour tree
+		if self.parentIndexList is not None and all( self._isOwnContourObj( contourObj ) for contourObj in contourObjList ):
+
+			# find outer most contour index
+			outerMostContourIndexSet = self._filterOuterMostContourIndexByHierarchy( contourObjList )
+
+			# loop through each contour object
+			for contourObj in contourObjList:
+
+				# this is NOT outer most contour object
+				if contourObj.contourIndex not in outerMostContourIndexSet:
+					continue
+
+				# approximate polygon with the same epsilon as pairwise check does
+				contourObj.approximatePolygonOfContour( epsilonPercent )
+
+				# store it
+				outerMostContourObjList.append( contourObj )
+
+			# calculate center point and coordinate frame of all outer most contour at once
+			with profiler.measureStage( 'calculateCoordinateFrame' ):
+				self._storeCoordinateFrameOfAllContourObj( outerMostContourObjList )
+
+			return outerMostContourObjList
+
+		# get spatial index
+		boundingBoxGridIndex = self._getBoundingBoxGridIndex()
+
+		# spatial index can be used only if all contour object are stored in it
+		isIndexUsable = all( boundingBoxGridIndex.hasContourObj( contourObj ) for contourObj in contourObjList )
+
+		# id of all contour object in list
+		contourObjIdSet = { id( contourObj ) for contourObj in contourObjList }
+
 		# loop through each contour object
 		for contourObj in contourObjList:
 
-			# this is outer most contour object
-			if self.isOuterMostContour( contourObj=contourObj, otherContourObjList=contourObjList, epsilonPercent=epsilonPercent ):
-
-				# calculate center point of contour
-				contourObj.calculateCenterPoint()
+			# check outer most contour using spatial index
+			if isIndexUsable:
+				isOuterMost = self._isOuterMostContourWithIndex( contourObj, contourObjIdSet, epsilonPercent )
+			
+			# contour object is unknown to this storage, fallback to brute force
+			else:
+				isOuterMost = self.isOuterMostContour( contourObj=contourObj, otherContourObjList=contourObjList, epsilonPercent=epsilonPercent )
 
-				# calculate coordinate frame of contour
-				contourObj.calculateCoordinateFrame()
+			# this is outer most contour object
+			if isOuterMost:
 
 				# store it
 				outerMostContourObjList.append( contourObj )
 
+		# calculate center point and coordinate frame of all outer most contour at once
+		with profiler.measureStage( 'calculateCoordinateFrame' ):
+			self._storeCoordinateFrameOfAllContourObj( outerMostContourObjList )
+
 		return outerMostContourObjList
+
+	def _storeCoordinateFrameOfAllContourObj( self, contourObjList ):
+		''' - calculate center point and coordinate frame of contour object at once and store it in each contour object
+		'''
+
+		# calculate center point of all contour
+		centerPointArray = calculateCenterPointArray( [ contourObj.contour for contourObj in contourObjList ] )
+
+		# store center point as tuple of python int
+		for contourObj, centerPoint in zip( contourObjList, centerPointArray.tolist() ):
+			contourObj.centerPointTuple = tuple( centerPoint )
+
+		# calculate coordinate frame of all contour
+		calculateCoordinateFrameOfAllContourObj( contourObjList, centerPointArray )
+
+	def calculateCoordinateFrameArray( self, contourObjList ):
+		''' - calculate center point, x-axis and y-axis end point of contour object in one vectorized pass
+
+			- usually given outer most contour object list of one shape type, e.g. outerMostSquareContourObjList
+
+			- nothing is stored in contour object, result is returned as compact array for downstream consumer
+
+			ARGS:
+				- contourObjList ( list )
+
+			RETURN:
+				- ( centerPointArray, xAxisEndPointArray, yAxisEndPointArray ) ( tuple ) --> each shape is ( N, 2 ), int
+		'''
+
+		# no contour
+		if not contourObjList:
+			return np.zeros( ( 0, 2 ), dtype=np.int64 ), np.zeros( ( 0, 2 ), dtype=np.int64 ), np.zeros( ( 0, 2 ), dtype=np.int64 )
+
+		# center point from moment of all contour
+		centerPointArray = calculateCenterPointArray( [ contourObj.contour for contourObj in contourObjList ] )
+
+		# coordinate frame of all contour
+		xAxisEndPointArray, yAxisEndPointArray, _, _, _ = _calculateCoordinateFrameArray( contourObjList, centerPointArray )
+
+		return centerPointArray, xAxisEndPointArray, yAxisEndPointArray
 			
 class Contour:
 	''' - store information about contour of interest
+
+		- attribute is stored in __slots__ instead of per object dict, and dict storage 
+		  is only allocated when it is used, most contour is dropped by area filter before that
 	'''
 
-	def __init__( self, contour ):
+	__slots__ = ( 'contour', 'contourIndex', '_area', 'latestEpsilonPercent', '_epsilonPercentToApproximatedPointListDict',
+				  'shapeTypeStr', 'centerPointTuple', 'xAxisEndPointTuple', 'yAxisEndPointTuple',
+				  'vectorLengthInt', '_debugVariableNameToValueDict' )
+
+	def __init__( self, contour, contourIndex=None, area=None ):
 
 		# all pixel coordinate of this contour
 		self.contour = contour
 
+		# position of this contour in cv2.findContours output, used to look up contour hierarchy
+		self.contourIndex = contourIndex
+
+		# area of contour, calculated on first use if not given
+		self._area = area
+
 		# store the latest epsilon percent value used 
 		self.latestEpsilonPercent = None
 
-		# store percent of epsilon to approximated point list of contour
-		self.epsilonPercentToApproximatedPointListDict = dict()
+		# store percent of epsilon to approximated point list of contour, allocated on first use
+		self._epsilonPercentToApproximatedPointListDict = None
 
 		# contour type
 		# contour must be one of the following type
@@ -320,19 +859,44 @@ class Contour:
 		# length of vector ( in pixel ) to draw contour's coordinate frame
 		self.vectorLengthInt = 50
 
-		# debug variable storage
-		self.debugVariableNameToValueDict = dict()
+		# debug variable storage, allocated on first use
+		self._debugVariableNameToValueDict = None
+
+	@property
+	def epsilonPercentToApproximatedPointListDict( self ):
+		''' - percent of epsilon to approximated point list of contour
+		'''
+
+		# not allocated yet
+		if self._epsilonPercentToApproximatedPointListDict is None:
+			self._epsilonPercentToApproximatedPointListDict = dict()
+
+		return self._epsilonPercentToApproximatedPointListDict
+
+	@property
+	def debugVariableNameToValueDict( self ):
+		''' - debug variable storage
+		'''
+
+		# not allocated yet
+		if self._debugVariableNameToValueDict is None:
+			self._debugVariableNameToValueDict = dict()
+
+		return self._debugVariableNameToValueDict
 
 	@property
 	def area( self ):
-		''' - find area of contour
+		''' - find area of contour, calculated only once
 
 			RETURN: 	
 				- areaOfContour ( float )
 		'''
 
 		# calculate contour area``
-		return cv2.contourArea( self.contour )
+		if self._area is None:
+			self._area = cv2.contourArea( self.contour )
+
+		return self._area
 	
 	def approximatePolygonOfContour( self, epsilonPercent ):
 		''' - approximate polygon of contour to be a rougher shape
@@ -343,7 +907,7 @@ class Contour:
 
 			- first this function is going to find if the approximated point exist for selected percent of epsilon
 				- if exist --> return value from storage
-				- else --> calculate, store and return
+				- else --> look up shared cache across frame ( if it is on ), or calculate, then store and return
 		'''
 
 		# store the latest epsilon percent used 
@@ -353,14 +917,14 @@ class Contour:
 		if epsilonPercent in self.epsilonPercentToApproximatedPointListDict:
 			
 			# just return the calculated approximated point list
+			profiler.addCount( 'approximatePolygonCache_hit' )
 			return self.epsilonPercentToApproximatedPointListDict[ epsilonPercent ]
 
 		# the approximated point list dose NOT exist for selected percent of epsilon, then
-		# calculate contour perimeter
-		contourPerimeter = cv2.arcLength( self.contour, True )
+		profiler.addCount( 'approximatePolygonCache_miss' )
 
-		# approximate curve of contour
-		approximatedPointList = cv2.approxPolyDP( self.contour,  epsilonPercent / 100 * contourPerimeter, True )
+		# approximate curve of contour, shared cache across frame is looked up first if it is on
+		approximatedPointList = approximatedPolygonCache.approximatePolygon( self.contour, epsilonPercent )
 		
 		# store percent of epsilon to approximated point list
 		self.epsilonPercentToApproximatedPointListDict[ epsilonPercent ] = approximatedPointList 
@@ -369,11 +933,19 @@ class Contour:
 	
 	def calculateCenterPoint( self ):
 		''' - calculate center point of contour using opencv's moment
+
+			- contour without area, m00 is zero e.g. a line, falls back to center of its bounding box
 		'''
 
 		# calculate moment 
 		moment = cv2.moments( self.contour )
 
+		# no area, center of bounding box
+		if moment[ "m00" ] == 0:
+			( xPosition, yPosition, boxWidth, boxHeight ) = cv2.boundingRect( self.contour )
+			self.centerPointTuple = ( xPosition + boxWidth // 2, yPosition + boxHeight // 2 )
+			return
+
 		# calculate x-axis of center point
 		xComponent = int( moment[ "m10" ] / moment[ "m00" ] )
 
@@ -385,71 +957,188 @@ class Contour:
 	def calculateCoordinateFrame( self ):
 		''' - calculate coordinate frame of contour with respect to OpenCV's world coordinate
 		'''
+		calculateCoordinateFrameOfAllContourObj( [ self ] )
+ 
 
-		# this contour is circle contour, then
-		if self.shapeTypeStr == 'circle':
+def calculateCenterPointArray( contourList ):
+	''' - calculate center point of every contour at once using the same polygon moment formula as cv2.moments
 
-			# x-axis component is the same direction with camera's x-axis
-			self.xAxisEndPointTuple = ( self.centerPointTuple[ 0 ] + self.vectorLengthInt, self.centerPointTuple[ 1 ] )
+		- point of contour is integer so every partial sum is exact, result is the same as
+		  int( m10 / m00 ) and int( m01 / m00 ) of cv2.moments for each contour
 
-			# y-axis component is the same direction with camera's y-axis
-			self.yAxisEndPointTuple = ( self.centerPointTuple[ 0 ], self.centerPointTuple[ 1 ] + self.vectorLengthInt )
+		- contour without area, m00 is zero e.g. a line, falls back to center of its bounding box like calculateCenterPoint
 
-			# already got x-axis end point and y-axis end point so no need to calculate anything furthur
-			return
+		ARGS:
+			- contourList ( list ) --> contour from cv2.findContours, each shape is ( N, 1, 2 )
+
+		RETURN:
+			- centerPointArray ( numpy array ) --> shape is ( N, 2 ), int
+	'''
 
-		# this contour is triangle or square contour, then
-		# approximate polygon of contour
-		approximatedPolygon = self.approximatePolygonOfContour( self.latestEpsilonPercent )
+	# no contour
+	if not contourList:
+		return np.zeros( ( 0, 2 ), dtype=np.int64 )
 
-		# approximate polygon of contour in 1D tuple format for each point
-		approximatedPolygon1DList = list()
+	# number of point of each contour
+	numberOfPointArray = np.array( [ len( contour ) for contour in contourList ] )
 
-		# loop through each point in approximated polygon
-		for point in approximatedPolygon:
+	# all point in one array, shape is ( M, 2 )
+	pointArray = np.concatenate( contourList ).reshape( -1, 2 ).astype( np.int64 )
 
-			# convert point into 1D tuple
-			pointTuple = ( int( point[ 0 ][ 0 ] ), int( point[ 0 ][ 1 ] ) )
+	# index of first point of each contour
+	firstPointIndexArray = np.concatenate( ( [ 0 ], np.cumsum( numberOfPointArray )[ :-1 ] ) )
 
-			# store it
-			approximatedPolygon1DList.append( pointTuple )	
+	# previous point of each point, first point of contour is connected to its last point
+	previousPointIndexArray = np.arange( len( pointArray ) ) - 1
+	previousPointIndexArray[ firstPointIndexArray ] = firstPointIndexArray + numberOfPointArray - 1
+	previousPointArray = pointArray[ previousPointIndexArray ]
 
-		# dictionary to store distance between approximated point to OpenCV's world coordinate frame ( 0, 0 )
-		approximatedPointToDistanceFromOpenCVCoordinateFrameDict = dict()
+	# cross product of each edge
+	crossArray = previousPointArray[ :, 0 ] * pointArray[ :, 1 ] - pointArray[ :, 0 ] * previousPointArray[ :, 1 ]
 
-		# loop through all approximated point 
-		for approximatedPoint in approximatedPolygon1DList:
+	# sum of each contour
+	a00Array = np.add.reduceat( crossArray, firstPointIndexArray ).astype( np.float64 )
+	a10Array = np.add.reduceat( crossArray * ( previousPointArray[ :, 0 ] + pointArray[ :, 0 ] ), firstPointIndexArray ).astype( np.float64 )
+	a01Array = np.add.reduceat( crossArray * ( previousPointArray[ :, 1 ] + pointArray[ :, 1 ] ), firstPointIndexArray ).astype( np.float64 )
 
-			# find distance between OpenCV world coordinate frame ( 0, 0 ) and approximated point
-			distanceFromOpenCVWorldFrame = calculateVectorMagnitude( OpenCVWorldCoordinateTuple, approximatedPoint )
+	# moment, sign of area does not change the ratio so it is not flipped
+	m00Array = a00Array * 0.5
+	m10Array = a10Array * 0.16666666666666666
+	m01Array = a01Array * 0.16666666666666666
 
-			# store calculated distance in form of dictionary mapping between approximated point to calculated distance
-			approximatedPointToDistanceFromOpenCVCoordinateFrameDict[ approximatedPoint ] = distanceFromOpenCVWorldFrame
-		
-		# sort items in ascending format based on its distance
-		sortedApproximatedPointTupleList = list( dict( sorted(approximatedPointToDistanceFromOpenCVCoordinateFrameDict.items(), key=lambda item: item[ 1 ] ) ).keys() )
+	# center of bounding box, the same as x + w // 2 and y + h // 2 of cv2.boundingRect
+	minPointArray = np.minimum.reduceat( pointArray, firstPointIndexArray )
+	boundingBoxCenterArray = minPointArray + ( np.maximum.reduceat( pointArray, firstPointIndexArray ) - minPointArray + 1 ) // 2
+
+	# center point is truncated toward zero like int(), contour without area uses bounding box center
+	isAreaZeroArray = m00Array == 0
+	safeM00Array = np.where( isAreaZeroArray, 1.0, m00Array )
+	centerPointArray = np.trunc( np.stack( ( m10Array / safeM00Array, m01Array / safeM00Array ), axis=1 ) ).astype( np.int64 )
+	centerPointArray[ isAreaZeroArray ] = boundingBoxCenterArray[ isAreaZeroArray ]
+
+	return centerPointArray
+
+def _findTwoNearestPointArray( approximatedPolygonList ):
+	''' - find the two nearest approximated point to OpenCV's world coordinate frame of every polygon at once
+
+		- duplicated point is counted only once and tie in distance is broken by order of point in polygon,
+		  the same as sorting distance of each point one polygon at a time
+
+		ARGS:
+			- approximatedPolygonList ( list ) --> approximated polygon, each shape is ( N, 1, 2 )
+
+		RETURN:
+			- ( theNearestPointArray, secondNearestPointArray ) ( tuple ) --> each shape is ( N, 2 ), int
+	'''
+
+	# the largest number of point in one polygon
+	maxNumberOfPointInt = max( len( approximatedPolygon ) for approximatedPolygon in approximatedPolygonList )
+
+	# pad every polygon to the same number of point, padded point is marked invalid
+	pointArray = np.zeros( ( len( approximatedPolygonList ), maxNumberOfPointInt, 2 ), dtype=np.int64 )
+	isValidPointMask = np.zeros( ( len( approximatedPolygonList ), maxNumberOfPointInt ), dtype=bool )
+	for polygonPosition, approximatedPolygon in enumerate( approximatedPolygonList ):
+		pointArray[ polygonPosition, : len( approximatedPolygon ) ] = approximatedPolygon.reshape( -1, 2 )
+		isValidPointMask[ polygonPosition, : len( approximatedPolygon ) ] = True
 
-		# get the nearest point
-		theNearestApproximatedPointTuple = sortedApproximatedPointTupleList[ 0 ]
+	# point which is the same as an earlier point in the same polygon is counted only once
+	isSamePointMask = np.all( pointArray[ :, :, None, : ] == pointArray[ :, None, :, : ], axis=3 )
+	isValidPointMask &= ~np.any( np.tril( isSamePointMask, k=-1 ), axis=2 )
 
-		# get the second nearest point
-		secondNearestApproximatedPointTuple = sortedApproximatedPointTupleList[ 1 ]
+	# squared distance is integer and in the same order as distance, so distance then point order
+	# is combined into one integer key to compare
+	squaredDistanceArray = np.sum( pointArray * pointArray, axis=2 )
+	keyArray = np.where( isValidPointMask, squaredDistanceArray * maxNumberOfPointInt + np.arange( maxNumberOfPointInt ), np.iinfo( np.int64 ).max )
 
-		# determine x-axis's direction vector end point
-		xAxisDirectionalVectorEndPointTuple = secondNearestApproximatedPointTuple
-		xAxisDirecctionalVectorStartPointTuple = theNearestApproximatedPointTuple
-		if theNearestApproximatedPointTuple[ 0 ] > secondNearestApproximatedPointTuple[ 0 ]:
-			xAxisDirectionalVectorEndPointTuple = theNearestApproximatedPointTuple
-			xAxisDirecctionalVectorStartPointTuple = secondNearestApproximatedPointTuple
+	# two smallest key of each polygon, no need to sort all of them
+	twoNearestPositionArray = np.argpartition( keyArray, 1, axis=1 )[ :, : 2 ]
+	twoNearestPointArray = np.take_along_axis( pointArray, twoNearestPositionArray[ :, :, None ], axis=1 )
 
-		# find x-axis component of contour's coordinate frame
-		self.xAxisEndPointTuple = findParallelPointWithMagnitude( xAxisDirecctionalVectorStartPointTuple, xAxisDirectionalVectorEndPointTuple, self.centerPointTuple, self.vectorLengthInt )
+	return twoNearestPointArray[ :, 0 ], twoNearestPointArray[ :, 1 ]
 
-		# find y-axis componrnt of contour's coordinate frame
-		self.yAxisEndPointTuple = findPerpendicularPoint( xAxisDirecctionalVectorStartPointTuple, xAxisDirectionalVectorEndPointTuple, self.centerPointTuple, self.xAxisEndPointTuple, self.vectorLengthInt )
-		self.debugVariableNameToValueDict[ 'approximatedPolygon1DList' ] = approximatedPolygon1DList
-		self.debugVariableNameToValueDict[ 'twoNearestPointTupleList' ] = [ theNearestApproximatedPointTuple, secondNearestApproximatedPointTuple ]
-		self.debugVariableNameToValueDict[ 'xAxisDirecctionalVectorStartPointTuple' ] = xAxisDirecctionalVectorStartPointTuple
-		self.debugVariableNameToValueDict[ 'xAxisDirectionalVectorEndPointTuple' ] = xAxisDirectionalVectorEndPointTuple
+def _calculateCoordinateFrameArray( contourObjList, centerPointArray ):
+	''' - calculate x-axis and y-axis end point of every contour object at once
+
+		ARGS:
+			- contourObjList ( list )
+			- centerPointArray ( numpy array ) --> shape is ( N, 2 )
+
+		RETURN:
+			- ( xAxisEndPointArray, yAxisEndPointArray, theNearestPointArray, secondNearestPointArray, approximatedPolygonList ) ( tuple )
+				- nearest point array and approximated polygon list only have row of polygon contour
+	'''
+
+	# length of vector of each contour
+	vectorLengthArray = np.array( [ contourObj.vectorLengthInt for contourObj in contourObjList ], dtype=np.int64 )
+
+	# circle contour, x-axis and y-axis component are the same direction with camera's axis
+	isCircleMask = np.array( [ contourObj.shapeTypeStr == 'circle' for contourObj in contourObjList ], dtype=bool )
+	xAxisEndPointArray = centerPointArray + np.stack( ( vectorLengthArray, np.zeros_like( vectorLengthArray ) ), axis=1 )
+	yAxisEndPointArray = centerPointArray + np.stack( ( np.zeros_like( vectorLengthArray ), vectorLengthArray ), axis=1 )
+
+	# position of triangle or square contour
+	polygonPositionArray = np.flatnonzero( ~isCircleMask )
+
+	# no polygon contour
+	if len( polygonPositionArray ) == 0:
+		return xAxisEndPointArray, yAxisEndPointArray, np.zeros( ( 0, 2 ), dtype=np.int64 ), np.zeros( ( 0, 2 ), dtype=np.int64 ), list()
+
+	# approximated polygon of each polygon contour
+	approximatedPolygonList = [ contourObjList[ position ].approximatePolygonOfContour( contourObjList[ position ].latestEpsilonPercent ) for position in polygonPositionArray ]
+
+	# the two nearest point to OpenCV's world coordinate frame
+	theNearestPointArray, secondNearestPointArray = _findTwoNearestPointArray( approximatedPolygonList )
+
+	# x-axis's direction vector goes from the left point to the right point
+	isSwappedArray = theNearestPointArray[ :, 0 ] > secondNearestPointArray[ :, 0 ]
+	xAxisDirectionalVectorStartPointArray = np.where( isSwappedArray[ :, None ], secondNearestPointArray, theNearestPointArray )
+	xAxisDirectionalVectorEndPointArray = np.where( isSwappedArray[ :, None ], theNearestPointArray, secondNearestPointArray )
+
+	# find x-axis and y-axis component of contour's coordinate frame
+	xAxisEndPointArray[ polygonPositionArray ] = findParallelPointWithMagnitudeArray( xAxisDirectionalVectorStartPointArray, xAxisDirectionalVectorEndPointArray, centerPointArray[ polygonPositionArray ], vectorLengthArray[ polygonPositionArray ] )
+	yAxisEndPointArray[ polygonPositionArray ] = findPerpendicularPointArray( centerPointArray[ polygonPositionArray ], xAxisEndPointArray[ polygonPositionArray ], vectorLengthArray[ polygonPositionArray ] )
+
+	return xAxisEndPointArray, yAxisEndPointArray, theNearestPointArray, secondNearestPointArray, approximatedPolygonList
+
+def calculateCoordinateFrameOfAllContourObj( contourObjList, centerPointArray=None ):
+	''' - calculate coordinate frame of every contour object in one batch and store it in each contour object
+
+		- center point of contour must already be calculated
+
+		ARGS:
+			- contourObjList ( list )
+			- centerPointArray ( numpy array ) --> shape is ( N, 2 ), taken from center point of contour object if not given
+	'''
 
-		return 
\ No newline at end of file
+	# no contour
+	if not contourObjList:
+		return
+
+	# center point of each contour
+	if centerPointArray is None:
+		centerPointArray = np.array( [ contourObj.centerPointTuple for contourObj in contourObjList ], dtype=np.int64 )
+
+	# calculate coordinate frame
+	xAxisEndPointArray, yAxisEndPointArray, theNearestPointArray, secondNearestPointArray, approximatedPolygonList = _calculateCoordinateFrameArray( contourObjList, centerPointArray )
+
+	# store coordinate frame as tuple of python int
+	for contourObj, xAxisEndPoint, yAxisEndPoint in zip( contourObjList, xAxisEndPointArray.tolist(), yAxisEndPointArray.tolist() ):
+		contourObj.xAxisEndPointTuple = tuple( xAxisEndPoint )
+		contourObj.yAxisEndPointTuple = tuple( yAxisEndPoint )
+
+	# loop through each polygon contour object
+	polygonContourObjList = [ contourObj for contourObj in contourObjList if contourObj.shapeTypeStr != 'circle' ]
+	for polygonPosition, contourObj in enumerate( polygonContourObjList ):
+
+		# the two nearest point and x-axis's direction vector
+		theNearestPointTuple = tuple( theNearestPointArray[ polygonPosition ].tolist() )
+		secondNearestPointTuple = tuple( secondNearestPointArray[ polygonPosition ].tolist() )
+		xAxisDirecctionalVectorStartPointTuple, xAxisDirectionalVectorEndPointTuple = theNearestPointTuple, secondNearestPointTuple
+		if theNearestPointTuple[ 0 ] > secondNearestPointTuple[ 0 ]:
+			xAxisDirecctionalVectorStartPointTuple, xAxisDirectionalVectorEndPointTuple = secondNearestPointTuple, theNearestPointTuple
+
+		# store debug variable
+		contourObj.debugVariableNameToValueDict[ 'approximatedPolygon1DList' ] = [ tuple( point ) for point in approximatedPolygonList[ polygonPosition ].reshape( -1, 2 ).tolist() ]
+		contourObj.debugVariableNameToValueDict[ 'twoNearestPointTupleList' ] = [ theNearestPointTuple, secondNearestPointTuple ]
+		contourObj.debugVariableNameToValueDict[ 'xAxisDirecctionalVectorStartPointTuple' ] = xAxisDirecctionalVectorStartPointTuple
+		contourObj.debugVariableNameToValueDict[ 'xAxisDirectionalVectorEndPointTuple' ] = xAxisDirectionalVectorEndPointTuple
@@ -0,0 +1,248 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# measure processing time
+import time
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from contour_manipulation import ContourStorage
+
+from instrumentation import profiler
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+BinaryThresholdInt = 127
+MinContourAreaInt = 1000
+MaxContourAreaInt = 300000
+
+# epsilon percent of outer most filter for each shape
+DefaultOuterMostEpsilonPercentDict = { 'circle' : 4, 'triangle' : 5, 'square' : 4 }
+
+def convertToBinaryImage( image, thresholdInt=BinaryThresholdInt ):
+	''' - convert BGR or gray scale image to binary image
+
+		ARGS:
+			- image ( numpy array )
+			- thresholdInt ( int )
+
+		RETURN:
+			- binaryImage ( numpy array )
+	'''
+
+	with profiler.measureStage( 'threshold' ):
+
+		# converting image into grayscale image if it is not
+		grayScaleImage = image if image.ndim == 2 else cv2.cvtColor( image, cv2.COLOR_BGR2GRAY )
+
+		# convert to binary image
+		_, binaryImage = cv2.threshold( grayScaleImage, thresholdInt, 255, cv2.THRESH_BINARY )
+
+	return binaryImage
+
+def findContourTree( binaryImage ):
+	''' - find contour and its hierarchy from binary image
+
+		RETURN:
+			- ( contourList, hierarchy ) ( tuple )
+	'''
+	with profiler.measureStage( 'findContours' ):
+		return cv2.findContours( binaryImage, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE )
+
+def buildContourStorage( contourList, hierarchy ):
+	''' - store contour and its hierarchy in contour storage
+
+		RETURN:
+			- contourStorageObj ( ContourStorage )
+	'''
+
+	# count raw contour
+	profiler.addCount( 'contour', len( contourList ) )
+
+	with profiler.measureStage( 'contourConstruction' ):
+		return ContourStorage( contourList, hierarchy )
+
+def createContourStorage( binaryImage ):
+	''' - find contour tree from binary image and store it in contour storage
+
+		RETURN:
+			- contourStorageObj ( ContourStorage )
+	'''
+
+	# finding contours from binary image
+	contourList, hierarchy = findContourTree( binaryImage )
+
+	# init contour storage with contour tree
+	return buildContourStorage( contourList, hierarchy )
+
+def detectOuterMostContour( contourStorageObj, minArea=MinContourAreaInt, maxArea=MaxContourAreaInt, contourIndexToKnownShapeTypeDict=None,
+							shapeRuleParameterDict=None, outerMostEpsilonPercentDict=None ):
+	''' - run area filter, shape classification and outer most filter on contour storage
+
+		- result is stored in outerMost*ContourObjList of contour storage
+
+		- contour in contourIndexToKnownShapeTypeDict skips shape classification rule
+
+		- shapeRuleParameterDict and outerMostEpsilonPercentDict override DefaultShapeRuleParameterDict
+		  and DefaultOuterMostEpsilonPercentDict, e.g. in parameter sweep
+	'''
+
+	# epsilon percent of outer most filter
+	outerMostEpsilonPercentDict = dict( DefaultOuterMostEpsilonPercentDict, **( outerMostEpsilonPercentDict or dict() ) )
+
+	# filter contour only in area range
+	with profiler.measureStage( 'filterContoursOnlyInAreaRange' ):
+		contourStorageObj.filterContoursOnlyInAreaRange( minArea, maxArea )
+
+	# classify contour object by its shape
+	with profiler.measureStage( 'classifyContourObjByShape' ):
+		contourStorageObj.classifyContourObjByShape( contourIndexToKnownShapeTypeDict, shapeRuleParameterDict )
+
+	# filter only outer most contour object of each shape
+	with profiler.measureStage( 'filterOnlyOuterMostContourObj' ):
+		contourStorageObj.outerMostCircleContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.circleContourObjList, outerMostEpsilonPercentDict[ 'circle' ] )
+		contourStorageObj.outerMostTriangleContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.triangleContourObjList, outerMostEpsilonPercentDict[ 'triangle' ] )
+		contourStorageObj.outerMostSquareContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.squareContourObjList, outerMostEpsilonPercentDict[ 'square' ] )
+
+	# count contour left after each step
+	countContourStorage( contourStorageObj )
+
+	return contourStorageObj
+
+def countContourStorage( contourStorageObj ):
+	''' - add number of contour in each list of contour storage to profiler counter
+	'''
+
+	# profiling is off
+	if not profiler.isEnabled:
+		return
+
+	profiler.addCount( 'contourInAreaRange', len( contourStorageObj.contourObjInAreaRangeList ) )
+	profiler.addCount( 'circleContour', len( contourStorageObj.circleContourObjList ) )
+	profiler.addCount( 'triangleContour', len( contourStorageObj.triangleContourObjList ) )
+	profiler.addCount( 'squareContour', len( contourStorageObj.squareContourObjList ) )
+	profiler.addCount( 'outerMostCircleContour', len( contourStorageObj.outerMostCircleContourObjList ) )
+	profiler.addCount( 'outerMostTriangleContour', len( contourStorageObj.outerMostTriangleContourObjList ) )
+	profiler.addCount( 'outerMostSquareContour', len( contourStorageObj.outerMostSquareContourObjList ) )
+
+def extractPoseList( contourStorageObj ):
+	''' - get pose of all outer most contour as plain python value
+
+		RETURN:
+			- poseList ( list ) --> list of dict with shape type, center point, axis end point and area
+	'''
+	return extractPoseListFromContourObj( contourStorageObj.outerMostCircleContourObjList + \
+										  contourStorageObj.outerMostTriangleContourObjList + \
+										  contourStorageObj.outerMostSquareContourObjList )
+
+def extractPoseListFromContourObj( contourObjList ):
+	''' - get pose of contour object which already has coordinate frame as plain python value
+
+		RETURN:
+			- poseList ( list )
+	'''
+
+	# pose storage
+	poseList = list()
+
+	# loop through each contour object
+	for contourObj in contourObjList:
+
+		# store pose
+		poseList.append( { 'shapeTypeStr' : contourObj.shapeTypeStr,
+						   'centerPointTuple' : contourObj.centerPointTuple,
+						   'xAxisEndPointTuple' : contourObj.xAxisEndPointTuple,
+						   'yAxisEndPointTuple' : contourObj.yAxisEndPointTuple,
+						   'area' : contourObj.area } )
+
+	return poseList
+
+def detectPoseFromContourTree( contourList, hierarchy ):
+	''' - python side of detection, store contour, classify shape and get pose of outer most contour
+
+		RETURN:
+			- poseList ( list )
+	'''
+	return extractPoseList( detectOuterMostContour( buildContourStorage( contourList, hierarchy ) ) )
+
+def processFrame( image ):
+	''' - run the whole detection on one frame
+
+		RETURN:
+			- poseList ( list )
+	'''
+
+	# convert to binary image
+	binaryImage = convertToBinaryImage( image )
+
+	# find contour and detect outer most contour of each shape
+	contourStorageObj = detectOuterMostContour( createContourStorage( binaryImage ) )
+
+	return extractPoseList( contourStorageObj )
+
+def streamPoseFromFrame( frameIterator ):
+	''' - generator pipeline, grayscale --> threshold --> findContours --> ContourStorage --> outer most filter --> pose
+
+		ARGS:
+			- frameIterator ( iterator ) --> yield ( frameIndex, frame )
+
+		YIELD:
+			- ( frameIndex, poseList ) ( tuple )
+	'''
+
+	# loop through each frame
+	for frameIndex, frame in frameIterator:
+
+		# detect pose in this frame
+		profiler.beginFrame( frameIndex )
+		poseList = processFrame( frame )
+		profiler.endFrame()
+
+		yield frameIndex, poseList
+
+class FrameRateCounter:
+	''' - measure sustained frame per second
+	'''
+
+	def __init__( self ):
+
+		# time of first frame
+		self.startTimeFloat = time.perf_counter()
+
+		# number of processed frame
+		self.numberOfFrame = 0
+
+	def tick( self ):
+		''' - count one processed frame
+		'''
+		self.numberOfFrame += 1
+
+	@property
+	def elapsedTimeFloat( self ):
+		''' - elapsed time since start ( in second )
+		'''
+		return time.perf_counter() - self.startTimeFloat
+
+	@property
+	def framePerSecondFloat( self ):
+		''' - average frame per second since start
+		'''
+
+		# no time has passed yet
+		if self.elapsedTimeFloat <= 0:
+			return 0.0
+
+		return self.numberOfFrame / self.elapsedTimeFloat
@@ -0,0 +1,350 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# array operation
+import numpy as np
+
+# read and write schema of store
+import json
+
+import os
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# name of schema file in store directory
+SchemaFileNameStr = 'schema.json'
+
+# name of file in store directory which keeps the latest appended frame id, also of frame without detection
+FrameMarkFileNameStr = 'frame_mark.json'
+
+# column name to its data type, each column is one append only raw file in store directory
+ColumnNameToDataTypeDict = { 'frameId' : np.dtype( '<i8' ),
+							 'shapeType' : np.dtype( 'u1' ),
+							 'area' : np.dtype( '<f8' ),
+							 'centerX' : np.dtype( '<i4' ),
+							 'centerY' : np.dtype( '<i4' ),
+							 'xAxisEndX' : np.dtype( '<i4' ),
+							 'xAxisEndY' : np.dtype( '<i4' ),
+							 'yAxisEndX' : np.dtype( '<i4' ),
+							 'yAxisEndY' : np.dtype( '<i4' ),
+							 'isOuterMost' : np.dtype( '?' ) }
+
+# shape type is stored as small code
+ShapeTypeStrList = [ 'circle', 'triangle', 'square' ]
+ShapeTypeStrToCodeDict = { shapeTypeStr : shapeTypeCode for shapeTypeCode, shapeTypeStr in enumerate( ShapeTypeStrList ) }
+
+# number of buffered detection written at once
+DefaultFlushEveryRowInt = 65536
+
+def getColumnPathStr( directoryPathStr, columnNameStr ):
+	''' - path of raw file of one column
+	'''
+	return os.path.join( directoryPathStr, columnNameStr + '.bin' )
+
+class DetectionStoreWriter:
+	''' - append detection of each frame to columnar store on disk
+
+		- store is a directory with one raw little endian file per column and a schema file, so each
+		  column can be memory mapped and read without touching other column
+
+		- detection is buffered in memory and appended in chunk, frame id must not decrease
+		  so reader can find frame with binary search
+
+		- opening existing store appends to it, row which is half written by an interrupted flush is cut off
+		  so every column file holds the same number of whole value
+
+		- latest appended frame id is kept as high water mark next to column file, so frame id of trailing
+		  frame without detection is not given again to the next run
+	'''
+
+	def __init__( self, directoryPathStr, flushEveryRowInt=DefaultFlushEveryRowInt ):
+
+		# store directory
+		self.directoryPathStr = directoryPathStr
+		os.makedirs( directoryPathStr, exist_ok=True )
+
+		# write schema, or check schema of existing store
+		schemaPathStr = os.path.join( directoryPathStr, SchemaFileNameStr )
+		schemaDict = { 'columnNameToDataTypeDict' : { columnNameStr : dataType.str for columnNameStr, dataType in ColumnNameToDataTypeDict.items() },
+					   'shapeTypeStrList' : ShapeTypeStrList }
+		if os.path.exists( schemaPathStr ):
+			with open( schemaPathStr ) as schemaFile:
+				assert json.load( schemaFile ) == schemaDict, 'store {} has different schema'.format( directoryPathStr )
+		else:
+			with open( schemaPathStr, 'w' ) as schemaFile:
+				json.dump( schemaDict, schemaFile )
+
+		# number of buffered detection written at once
+		self.flushEveryRowInt = flushEveryRowInt
+
+		# column name to buffered value
+		self.columnNameToBufferListDict = { columnNameStr : list() for columnNameStr in ColumnNameToDataTypeDict }
+
+		# number of complete detection already in store, the same rule as DetectionStore
+		numberOfStoredRowInt = min( os.path.getsize( getColumnPathStr( directoryPathStr, columnNameStr ) ) // dataType.itemsize
+									if os.path.exists( getColumnPathStr( directoryPathStr, columnNameStr ) ) else 0
+									for columnNameStr, dataType in ColumnNameToDataTypeDict.items() )
+
+		# cut every column file to complete detection, so appended detection lines up across column
+		for columnNameStr, dataType in ColumnNameToDataTypeDict.items():
+			columnPathStr = getColumnPathStr( directoryPathStr, columnNameStr )
+			if os.path.exists( columnPathStr ) and os.path.getsize( columnPathStr ) != numberOfStoredRowInt * dataType.itemsize:
+				os.truncate( columnPathStr, numberOfStoredRowInt * dataType.itemsize )
+
+		# last frame id already in store, a frame can only be appended after it
+		self.latestFrameIdInt = None
+		if numberOfStoredRowInt > 0:
+			self.latestFrameIdInt = int( np.memmap( getColumnPathStr( directoryPathStr, 'frameId' ), dtype=ColumnNameToDataTypeDict[ 'frameId' ], mode='r',
+													shape=( 1, ), offset=( numberOfStoredRowInt - 1 ) * ColumnNameToDataTypeDict[ 'frameId' ].itemsize )[ 0 ] )
+
+		# high water mark also counts frame without detection, it is written after column so it may lag behind it
+		frameMarkPathStr = os.path.join( directoryPathStr, FrameMarkFileNameStr )
+		if os.path.exists( frameMarkPathStr ):
+			with open( frameMarkPathStr ) as frameMarkFile:
+				markedFrameIdInt = json.load( frameMarkFile )[ 'latestFrameIdInt' ]
+			if markedFrameIdInt is not None and ( self.latestFrameIdInt is None or markedFrameIdInt > self.latestFrameIdInt ):
+				self.latestFrameIdInt = markedFrameIdInt
+
+		# latest frame id written to high water mark file
+		self.markedFrameIdInt = self.latestFrameIdInt
+
+		# number of detection written by this writer
+		self.numberOfRowInt = 0
+
+		# writer is closed
+		self.isClosed = False
+
+	@property
+	def nextFrameIdInt( self ):
+		''' - smallest frame id which can be appended, e.g. offset for frame index of a new run appended to existing store
+		'''
+		return self.latestFrameIdInt + 1 if self.latestFrameIdInt is not None else 0
+
+	def _appendRow( self, frameIdInt, shapeTypeStr, area, centerPointTuple, xAxisEndPointTuple, yAxisEndPointTuple, isOuterMost ):
+		''' - buffer one detection
+		'''
+
+		# store one value per column
+		for columnNameStr, value in ( ( 'frameId', frameIdInt ), ( 'shapeType', ShapeTypeStrToCodeDict[ shapeTypeStr ] ), ( 'area', area ),
+									  ( 'centerX', centerPointTuple[ 0 ] ), ( 'centerY', centerPointTuple[ 1 ] ),
+									  ( 'xAxisEndX', xAxisEndPointTuple[ 0 ] ), ( 'xAxisEndY', xAxisEndPointTuple[ 1 ] ),
+									  ( 'yAxisEndX', yAxisEndPointTuple[ 0 ] ), ( 'yAxisEndY', yAxisEndPointTuple[ 1 ] ),
+									  ( 'isOuterMost', isOuterMost ) ):
+			self.columnNameToBufferListDict[ columnNameStr ].append( value )
+
+		self.numberOfRowInt += 1
+
+	def _checkFrameId( self, frameIdInt ):
+		''' - frame id must not decrease
+		'''
+
+		assert not self.isClosed, 'detection store writer is already closed'
+		assert self.latestFrameIdInt is None or frameIdInt >= self.latestFrameIdInt, \
+			'frame id must not decrease, got {} after {}'.format( frameIdInt, self.latestFrameIdInt )
+		self.latestFrameIdInt = frameIdInt
+
+	def appendPoseList( self, frameIdInt, poseList ):
+		''' - append pose of outer most contour of one frame, e.g. from streamPoseFromFrame
+
+			- frame id moves high water mark even if pose list is empty
+
+			ARGS:
+				- frameIdInt ( int )
+				- poseList ( list ) --> area is NaN if pose has no area
+		'''
+
+		self._checkFrameId( frameIdInt )
+
+		# loop through each pose
+		for poseDict in poseList:
+			self._appendRow( frameIdInt, poseDict[ 'shapeTypeStr' ], poseDict.get( 'area', np.nan ), poseDict[ 'centerPointTuple' ],
+							 poseDict[ 'xAxisEndPointTuple' ], poseDict[ 'yAxisEndPointTuple' ], True )
+
+		# write buffer if it is full
+		if len( self.columnNameToBufferListDict[ 'frameId' ] ) >= self.flushEveryRowInt:
+			self.flush()
+
+	def appendContourStorage( self, frameIdInt, contourStorageObj ):
+		''' - append every classified contour of one frame, outer most flag tells which one is outer most
+
+			- outer most filter must already run on contour storage, coordinate frame of contour which is not
+			  outer most is calculated here
+
+			ARGS:
+				- frameIdInt ( int )
+				- contourStorageObj ( ContourStorage )
+		'''
+
+		self._checkFrameId( frameIdInt )
+
+		# id of outer most contour object
+		outerMostContourObjIdSet = { id( contourObj ) for contourObj in contourStorageObj.outerMostCircleContourObjList +
+																		 contourStorageObj.outerMostTriangleContourObjList +
+																		 contourStorageObj.outerMostSquareContourObjList }
+
+		# loop through classified contour of each shape
+		for contourObjList in ( contourStorageObj.circleContourObjList, contourStorageObj.triangleContourObjList, contourStorageObj.squareContourObjList ):
+
+			# center point and coordinate frame of all contour of this shape
+			centerPointArray, xAxisEndPointArray, yAxisEndPointArray = contourStorageObj.calculateCoordinateFrameArray( contourObjList )
+
+			# loop through each contour object
+			for contourPosition, contourObj in enumerate( contourObjList ):
+				self._appendRow( frameIdInt, contourObj.shapeTypeStr, contourObj.area, centerPointArray[ contourPosition ],
+								 xAxisEndPointArray[ contourPosition ], yAxisEndPointArray[ contourPosition ], id( contourObj ) in outerMostContourObjIdSet )
+
+		# write buffer if it is full
+		if len( self.columnNameToBufferListDict[ 'frameId' ] ) >= self.flushEveryRowInt:
+			self.flush()
+
+	def flush( self ):
+		''' - append buffered detection to column file, then write high water mark
+		'''
+
+		# append each column
+		if self.columnNameToBufferListDict[ 'frameId' ]:
+			for columnNameStr, bufferList in self.columnNameToBufferListDict.items():
+				with open( getColumnPathStr( self.directoryPathStr, columnNameStr ), 'ab' ) as columnFile:
+					columnFile.write( np.asarray( bufferList, dtype=ColumnNameToDataTypeDict[ columnNameStr ] ).tobytes() )
+				bufferList.clear()
+
+		# high water mark is replaced at once, so it is never half written
+		if self.latestFrameIdInt != self.markedFrameIdInt:
+			frameMarkPathStr = os.path.join( self.directoryPathStr, FrameMarkFileNameStr )
+			with open( frameMarkPathStr + '.tmp', 'w' ) as frameMarkFile:
+				json.dump( { 'latestFrameIdInt' : self.latestFrameIdInt }, frameMarkFile )
+			os.replace( frameMarkPathStr + '.tmp', frameMarkPathStr )
+			self.markedFrameIdInt = self.latestFrameIdInt
+
+	def close( self ):
+		''' - write every buffered detection
+		'''
+
+		# already closed
+		if self.isClosed:
+			return
+
+		self.flush()
+		self.isClosed = True
+
+	def __enter__( self ):
+		return self
+
+	def __exit__( self, exceptionType, exceptionValue, traceback ):
+		self.close()
+
+class DetectionStore:
+	''' - read columnar detection store written by DetectionStoreWriter
+
+		- every column is memory mapped, so opening store and querying frame do not read whole file,
+		  result column is a view into the mapped file
+
+		- number of detection is taken from the shortest column, so detection which is half written
+		  by a writer that is still running is not read
+	'''
+
+	def __init__( self, directoryPathStr ):
+
+		# store directory
+		self.directoryPathStr = directoryPathStr
+
+		# read schema
+		with open( os.path.join( directoryPathStr, SchemaFileNameStr ) ) as schemaFile:
+			schemaDict = json.load( schemaFile )
+		self.shapeTypeStrList = schemaDict[ 'shapeTypeStrList' ]
+		columnNameToDataTypeDict = { columnNameStr : np.dtype( dataTypeStr ) for columnNameStr, dataTypeStr in schemaDict[ 'columnNameToDataTypeDict' ].items() }
+
+		# number of complete detection
+		self.numberOfRowInt = min( os.path.getsize( getColumnPathStr( directoryPathStr, columnNameStr ) ) // dataType.itemsize
+								   if os.path.exists( getColumnPathStr( directoryPathStr, columnNameStr ) ) else 0
+								   for columnNameStr, dataType in columnNameToDataTypeDict.items() )
+
+		# memory map each column, empty file can not be mapped
+		self.columnNameToArrayDict = { columnNameStr : np.memmap( getColumnPathStr( directoryPathStr, columnNameStr ), dtype=dataType, mode='r', shape=( self.numberOfRowInt, ) )
+													   if self.numberOfRowInt > 0 else np.zeros( 0, dtype=dataType )
+									   for columnNameStr, dataType in columnNameToDataTypeDict.items() }
+
+	def __len__( self ):
+		return self.numberOfRowInt
+
+	def getColumn( self, columnNameStr ):
+		''' - whole column as memory mapped array
+
+			RETURN:
+				- columnArray ( numpy array )
+		'''
+		return self.columnNameToArrayDict[ columnNameStr ]
+
+	def findRowRange( self, startFrameIdInt, stopFrameIdInt ):
+		''' - row range of detection whose frame id is in [ start, stop ), found by binary search
+
+			RETURN:
+				- ( startRowInt, stopRowInt ) ( tuple )
+		'''
+		frameIdArray = self.columnNameToArrayDict[ 'frameId' ]
+		return int( np.searchsorted( frameIdArray, startFrameIdInt, side='left' ) ), int( np.searchsorted( frameIdArray, stopFrameIdInt, side='left' ) )
+
+	def queryFrameRange( self, startFrameIdInt, stopFrameIdInt, shapeTypeStr=None, isOnlyOuterMost=False ):
+		''' - detection whose frame id is in [ start, stop )
+
+			ARGS:
+				- startFrameIdInt, stopFrameIdInt ( int )
+				- shapeTypeStr ( str ) --> only this shape if given
+				- isOnlyOuterMost ( bool ) --> only outer most contour if set
+
+			RETURN:
+				- columnNameToArrayDict ( dict ) --> view of mapped column if nothing is filtered, otherwise copy
+		'''
+
+		# row of frame range
+		startRowInt, stopRowInt = self.findRowRange( startFrameIdInt, stopFrameIdInt )
+		columnNameToArrayDict = { columnNameStr : columnArray[ startRowInt : stopRowInt ] for columnNameStr, columnArray in self.columnNameToArrayDict.items() }
+
+		# nothing to filter
+		if shapeTypeStr is None and not isOnlyOuterMost:
+			return columnNameToArrayDict
+
+		# row which passes filter
+		isSelectedMask = np.ones( stopRowInt - startRowInt, dtype=bool )
+		if shapeTypeStr is not None:
+			isSelectedMask &= columnNameToArrayDict[ 'shapeType' ] == self.shapeTypeStrList.index( shapeTypeStr )
+		if isOnlyOuterMost:
+			isSelectedMask &= columnNameToArrayDict[ 'isOuterMost' ]
+
+		return { columnNameStr : columnArray[ isSelectedMask ] for columnNameStr, columnArray in columnNameToArrayDict.items() }
+
+	def getFrameIdArray( self ):
+		''' - every frame id which has any detection, in ascending order
+
+			RETURN:
+				- frameIdArray ( numpy array )
+		'''
+
+		# frame id is not decreasing, first row of each frame is where it changes
+		frameIdArray = self.columnNameToArrayDict[ 'frameId' ]
+		return np.asarray( frameIdArray[ np.concatenate( ( [ True ], frameIdArray[ 1: ] != frameIdArray[ :-1 ] ) ) ] ) if len( frameIdArray ) > 0 else np.zeros( 0, dtype=frameIdArray.dtype )
+
+	def getPoseList( self, frameIdInt ):
+		''' - pose of outer most contour of one frame, the same format as extractPoseList
+
+			RETURN:
+				- poseList ( list )
+		'''
+
+		# outer most detection of this frame
+		columnNameToArrayDict = self.queryFrameRange( frameIdInt, frameIdInt + 1, isOnlyOuterMost=True )
+
+		return [ { 'shapeTypeStr' : self.shapeTypeStrList[ shapeTypeCode ],
+				   'centerPointTuple' : ( centerX, centerY ),
+				   'xAxisEndPointTuple' : ( xAxisEndX, xAxisEndY ),
+				   'yAxisEndPointTuple' : ( yAxisEndX, yAxisEndY ),
+				   'area' : area }
+				 for shapeTypeCode, centerX, centerY, xAxisEndX, xAxisEndY, yAxisEndX, yAxisEndY, area in
+				 zip( *( columnNameToArrayDict[ columnNameStr ].tolist() for columnNameStr in ( 'shapeType', 'centerX', 'centerY', 'xAxisEndX', 'xAxisEndY', 'yAxisEndX', 'yAxisEndY', 'area' ) ) ) ]
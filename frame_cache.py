@@ -0,0 +1,208 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# array operation
+import numpy as np
+
+# read and write format of cache
+import json
+
+import os
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import convertToBinaryImage, BinaryThresholdInt
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# file name in cache directory
+FrameCacheMetaFileNameStr = 'meta.json'
+FrameCachePixelFileNameStr = 'pixel.bin'
+FrameCacheIndexFileNameStr = 'index.bin'
+
+# one row per frame, pixel of frame starts at byte offset in pixel file
+FrameCacheIndexDataType = np.dtype( [ ( 'frameIndex', '<i8' ), ( 'offset', '<i8' ), ( 'height', '<i4' ), ( 'width', '<i4' ) ] )
+
+# type of frame stored in cache
+# - gray --> grayscale frame, thresholding can still be changed when cache is read
+# - binary --> binary frame after thresholding, 0 or 255
+FrameTypeStrTuple = ( 'gray', 'binary' )
+
+def isFrameCacheDir( directoryPathStr ):
+	''' - check if directory is a frame cache
+	'''
+	return os.path.isfile( os.path.join( directoryPathStr, FrameCacheMetaFileNameStr ) )
+
+class FrameCacheWriter:
+	''' - append decoded frame to frame cache on disk
+
+		- frame is converted to grayscale or binary and its raw pixel is appended to one pixel file,
+		  index file keeps frame index, byte offset and size of each frame
+
+		- pixel of frame is written before its index row, so every frame in index is complete
+
+		- opening existing cache appends to it, frame index of appended frame continues after the largest
+		  frame index already in cache so every frame index in cache is unique
+	'''
+
+	def __init__( self, directoryPathStr, frameTypeStr='gray', thresholdInt=BinaryThresholdInt ):
+
+		assert frameTypeStr in FrameTypeStrTuple, 'unknown frame type {}'.format( frameTypeStr )
+
+		# cache directory
+		self.directoryPathStr = directoryPathStr
+		os.makedirs( directoryPathStr, exist_ok=True )
+
+		# write meta, or check meta of existing cache
+		metaPathStr = os.path.join( directoryPathStr, FrameCacheMetaFileNameStr )
+		metaDict = { 'frameTypeStr' : frameTypeStr, 'thresholdInt' : thresholdInt if frameTypeStr == 'binary' else None }
+		if os.path.exists( metaPathStr ):
+			with open( metaPathStr ) as metaFile:
+				assert json.load( metaFile ) == metaDict, 'frame cache {} has different frame type'.format( directoryPathStr )
+		else:
+			with open( metaPathStr, 'w' ) as metaFile:
+				json.dump( metaDict, metaFile )
+
+		# type of frame and threshold for binary frame
+		self.frameTypeStr = frameTypeStr
+		self.thresholdInt = thresholdInt
+
+		# cut index row which is half written, so appended row lines up
+		indexPathStr = os.path.join( directoryPathStr, FrameCacheIndexFileNameStr )
+		indexSizeInt = os.path.getsize( indexPathStr ) if os.path.exists( indexPathStr ) else 0
+		if indexSizeInt % FrameCacheIndexDataType.itemsize != 0:
+			indexSizeInt -= indexSizeInt % FrameCacheIndexDataType.itemsize
+			os.truncate( indexPathStr, indexSizeInt )
+
+		# frame index of this writer is shifted after the largest frame index already in cache
+		self.frameIndexOffsetInt = int( np.fromfile( indexPathStr, dtype=FrameCacheIndexDataType )[ 'frameIndex' ].max() ) + 1 if indexSizeInt > 0 else 0
+
+		# pixel and index file, opened for append
+		self.pixelFile = open( os.path.join( directoryPathStr, FrameCachePixelFileNameStr ), 'ab' )
+		self.indexFile = open( os.path.join( directoryPathStr, FrameCacheIndexFileNameStr ), 'ab' )
+
+		# number of frame written by this writer
+		self.numberOfFrameInt = 0
+
+	def append( self, frameIndex, frame ):
+		''' - convert frame and append it to cache
+
+			ARGS:
+				- frameIndex ( int ) --> stored after adding frameIndexOffsetInt
+				- frame ( numpy array ) --> BGR or grayscale
+		'''
+
+		# convert to frame type of cache
+		if self.frameTypeStr == 'binary':
+			frame = convertToBinaryImage( frame, self.thresholdInt )
+		elif frame.ndim == 3:
+			frame = cv2.cvtColor( frame, cv2.COLOR_BGR2GRAY )
+
+		# append pixel first, then index row which points to it
+		offsetInt = self.pixelFile.tell()
+		self.pixelFile.write( np.ascontiguousarray( frame, dtype=np.uint8 ).tobytes() )
+		self.pixelFile.flush()
+		self.indexFile.write( np.array( [ ( self.frameIndexOffsetInt + frameIndex, offsetInt, frame.shape[ 0 ], frame.shape[ 1 ] ) ], dtype=FrameCacheIndexDataType ).tobytes() )
+
+		self.numberOfFrameInt += 1
+
+	def close( self ):
+		''' - close pixel and index file
+		'''
+		self.pixelFile.close()
+		self.indexFile.close()
+
+	def __enter__( self ):
+		return self
+
+	def __exit__( self, exceptionType, exceptionValue, traceback ):
+		self.close()
+
+def buildFrameCache( frameIterator, directoryPathStr, frameTypeStr='gray', thresholdInt=BinaryThresholdInt ):
+	''' - decode every frame once and append it to frame cache
+
+		ARGS:
+			- frameIterator ( iterator ) --> yield ( frameIndex, frame ), e.g. iterateFrameFromSource
+			- directoryPathStr ( str )
+			- frameTypeStr ( str ) --> 'gray' or 'binary'
+
+		RETURN:
+			- numberOfFrame ( int ) --> number of appended frame
+	'''
+
+	with FrameCacheWriter( directoryPathStr, frameTypeStr, thresholdInt ) as frameCacheWriter:
+
+		# loop through each frame
+		for frameIndex, frame in frameIterator:
+			frameCacheWriter.append( frameIndex, frame )
+
+	return frameCacheWriter.numberOfFrameInt
+
+class FrameCache:
+	''' - read frame cache written by FrameCacheWriter
+
+		- pixel file is memory mapped, each frame is a zero copy read only view into it,
+		  so reading frame costs no decode and no copy
+	'''
+
+	def __init__( self, directoryPathStr ):
+
+		# cache directory
+		self.directoryPathStr = directoryPathStr
+
+		# read meta
+		with open( os.path.join( directoryPathStr, FrameCacheMetaFileNameStr ) ) as metaFile:
+			metaDict = json.load( metaFile )
+		self.frameTypeStr = metaDict[ 'frameTypeStr' ]
+		self.thresholdInt = metaDict[ 'thresholdInt' ]
+
+		# memory map pixel file, empty file can not be mapped
+		pixelPathStr = os.path.join( directoryPathStr, FrameCachePixelFileNameStr )
+		pixelSizeInt = os.path.getsize( pixelPathStr ) if os.path.exists( pixelPathStr ) else 0
+		self.pixelArray = np.memmap( pixelPathStr, dtype=np.uint8, mode='r' ) if pixelSizeInt > 0 else np.zeros( 0, dtype=np.uint8 )
+
+		# read index, row of frame which is not fully written is dropped
+		indexPathStr = os.path.join( directoryPathStr, FrameCacheIndexFileNameStr )
+		indexArray = np.fromfile( indexPathStr, dtype=np.uint8 ) if os.path.exists( indexPathStr ) else np.zeros( 0, dtype=np.uint8 )
+		indexArray = indexArray[ : len( indexArray ) // FrameCacheIndexDataType.itemsize * FrameCacheIndexDataType.itemsize ].view( FrameCacheIndexDataType )
+		self.indexArray = indexArray[ indexArray[ 'offset' ] + indexArray[ 'height' ].astype( np.int64 ) * indexArray[ 'width' ] <= pixelSizeInt ]
+
+	def __len__( self ):
+		return len( self.indexArray )
+
+	def getFrame( self, position ):
+		''' - frame at position in cache as zero copy view
+
+			RETURN:
+				- ( frameIndex, frame ) ( tuple ) --> frame is read only, shape is ( height, width )
+		'''
+
+		# index row of this frame
+		frameIndex, offsetInt, heightInt, widthInt = self.indexArray[ position ].tolist()
+
+		return frameIndex, self.pixelArray[ offsetInt : offsetInt + heightInt * widthInt ].reshape( heightInt, widthInt )
+
+	def iterateFrame( self ):
+		''' - read every frame in cache as zero copy view
+
+			YIELD:
+				- ( frameIndex, frame ) ( tuple )
+		'''
+
+		# loop through each frame
+		for position in range( len( self.indexArray ) ):
+			yield self.getFrame( position )
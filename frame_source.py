@@ -0,0 +1,115 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import os
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from frame_cache import FrameCache, isFrameCacheDir
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+ImageFileExtensionTuple = ( '.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp' )
+
+def listImagePathInDir( imageDirStr ):
+	''' - list path of all image file in directory, sorted by file name
+
+		RETURN:
+			- imagePathList ( list )
+	'''
+	return [ os.path.join( imageDirStr, fileNameStr ) for fileNameStr in sorted( os.listdir( imageDirStr ) )
+			 if fileNameStr.lower().endswith( ImageFileExtensionTuple ) ]
+
+def iterateFrameFromImageDir( imageDirStr ):
+	''' - read image file in directory one by one
+
+		YIELD:
+			- ( frameIndex, frame ) ( tuple )
+	'''
+
+	# loop through each image path
+	for frameIndex, imagePathStr in enumerate( listImagePathInDir( imageDirStr ) ):
+
+		# reading image
+		frame = cv2.imread( imagePathStr )
+
+		# this file can not be decoded
+		if frame is None:
+			continue
+
+		yield frameIndex, frame
+
+def iterateFrameFromVideoCapture( videoCaptureSource ):
+	''' - read frame from video file or camera
+
+		ARGS:
+			- videoCaptureSource ( str or int ) --> video file path or camera index
+
+		YIELD:
+			- ( frameIndex, frame ) ( tuple )
+	'''
+
+	# open video source
+	videoCapture = cv2.VideoCapture( videoCaptureSource )
+
+	# video source can not be opened
+	if not videoCapture.isOpened():
+		raise IOError( 'can not open video source {}'.format( videoCaptureSource ) )
+
+	try:
+		frameIndex = 0
+		while True:
+
+			# read next frame
+			isFrameRead, frame = videoCapture.read()
+
+			# end of video or camera is disconnected
+			if not isFrameRead:
+				break
+
+			yield frameIndex, frame
+			frameIndex += 1
+	finally:
+
+		# release video source
+		videoCapture.release()
+
+def iterateFrameFromSource( sourceStr ):
+	''' - read frame from video file, image directory, frame cache directory or camera index
+
+		- frame from frame cache is a zero copy grayscale or binary view, not BGR
+
+		ARGS:
+			- sourceStr ( str ) --> camera index ( e.g. '0' ), image directory, frame cache directory or video file path
+
+		YIELD:
+			- ( frameIndex, frame ) ( tuple )
+	'''
+
+	# camera index
+	if sourceStr.isdigit():
+		return iterateFrameFromVideoCapture( int( sourceStr ) )
+
+	# frame cache directory
+	if os.path.isdir( sourceStr ) and isFrameCacheDir( sourceStr ):
+		return FrameCache( sourceStr ).iterateFrame()
+
+	# image directory
+	if os.path.isdir( sourceStr ):
+		return iterateFrameFromImageDir( sourceStr )
+
+	# video file or stream url
+	return iterateFrameFromVideoCapture( sourceStr )
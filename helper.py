@@ -7,12 +7,12 @@
 # image processing
 import cv2
 
-# display image
-from matplotlib import pyplot as plt
-
 # mathematical operation
 import math
 
+# array operation
+import numpy as np
+
 def calculateVectorMagnitude( vectorStartPointTuple, vectorEndPointTuple ):
 	''' - calculate the magnitude of the given vector
 
@@ -78,4 +78,69 @@ def findPerpendicularPoint( point1, point2, point3, point4, magnitude ):
     # Find point5 using v3 and point3
     point5 = ( int( point3[ 0 ] + v3X ), int( point3[ 1 ] + v3Y ) )
 
-    return point5
\ No newline at end of file
+    return point5
+
+def calculateVectorMagnitudeArray( vectorStartPointArray, vectorEndPointArray ):
+	''' - batch version of calculateVectorMagnitude, calculate magnitude of every vector at once
+
+		ARGS: 
+			- vectorStartPointArray ( numpy array ) --> shape is ( N, 2 ) or ( 2, ) which is shared by every vector
+			- vectorEndPointArray ( numpy array ) --> shape is ( N, 2 )
+
+		RETURN: 
+			- vectorMagnitudeArray ( numpy array ) --> shape is ( N, ), float
+	'''
+
+	# difference is kept as integer when point is integer, so sum of square is exact like python int
+	differenceArray = np.asarray( vectorEndPointArray ) - np.asarray( vectorStartPointArray )
+
+	# calculate the vector's magnitude
+	return np.sqrt( np.sum( differenceArray * differenceArray, axis=-1 ) )
+
+def findParallelPointWithMagnitudeArray( point1Array, point2Array, point3Array, magnitude ):
+	''' - batch version of findParallelPointWithMagnitude, every row is one call
+
+		ARGS:
+			- point1Array, point2Array, point3Array ( numpy array ) --> shape is ( N, 2 )
+			- magnitude ( float or numpy array ) --> one magnitude for all or shape is ( N, )
+
+		RETURN:
+			- point4Array ( numpy array ) --> shape is ( N, 2 ), int, truncated toward zero like int()
+	'''
+
+	# direction vector from point1 to point2
+	directionVectorArray = np.asarray( point2Array ) - np.asarray( point1Array )
+
+	# magnitude of direction vector
+	directionMagnitudeArray = np.sqrt( np.sum( directionVectorArray * directionVectorArray, axis=-1 ) )
+
+	# scaling factor to achieve the desired magnitude
+	scalingFactorArray = magnitude / directionMagnitudeArray
+
+	# end point point4
+	return np.trunc( np.asarray( point3Array ) + directionVectorArray * scalingFactorArray[ :, None ] ).astype( np.int64 )
+
+def findPerpendicularPointArray( point3Array, point4Array, magnitude ):
+	''' - batch version of findPerpendicularPoint, every row is one call
+
+		- point1 and point2 of findPerpendicularPoint are not used by it, so they are not taken here
+
+		ARGS:
+			- point3Array, point4Array ( numpy array ) --> shape is ( N, 2 )
+			- magnitude ( float or numpy array ) --> one magnitude for all or shape is ( N, )
+
+		RETURN:
+			- point5Array ( numpy array ) --> shape is ( N, 2 ), int, truncated toward zero like int()
+	'''
+
+	# direction vector from point3 to point4
+	v2Array = np.asarray( point4Array ) - np.asarray( point3Array )
+
+	# perpendicular vector
+	v3Array = np.stack( [ -v2Array[ :, 1 ], v2Array[ :, 0 ] ], axis=1 )
+
+	# scale it to the desired magnitude
+	scalingFactorArray = magnitude / np.sqrt( np.sum( v3Array * v3Array, axis=-1 ) )
+
+	# point5 from point3
+	return np.trunc( np.asarray( point3Array ) + v3Array * scalingFactorArray[ :, None ] ).astype( np.int64 )
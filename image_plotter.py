@@ -7,38 +7,107 @@
 # image processing
 import cv2
 
-# display image
-from matplotlib import pyplot as plt
-
 # mathematical operation
 import math
 
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from instrumentation import profiler
+
 class Image:
 	''' - store information about image
+
+		- only reference to image is kept, RGB image is converted when it is used for the first time
+
+		- image can also be given as render function which is called on first use, 
+		  rendered image is dropped by releaseImage so the render buffer can be reused
 	'''
 
-	def __init__( self, image, imageNameStr, imageStorageDirStr ):
-		self.image = image
-		self.rgbImage = cv2.cvtColor( self.image, cv2.COLOR_BGR2RGB )
+	def __init__( self, image, imageNameStr, imageStorageDirStr, renderFunction=None ):
+		self._image = image
+		self._rgbImage = None
+		self.renderFunction = renderFunction
 		self.imageNameStr = imageNameStr
 		self.pathToSaveImageStr = imageStorageDirStr + '/' + self.imageNameStr.replace( ' ', '_' ) + '.jpg'
 
-	def saveImage( self ):
+	@property
+	def image( self ):
+		''' - image in BGR, rendered on first use if render function is given
+		'''
+
+		# not rendered yet
+		if self._image is None and self.renderFunction is not None:
+			self._image = self.renderFunction()
+
+		return self._image
+
+	def releaseImage( self ):
+		''' - drop rendered image and its RGB version, do nothing if image was given directly
+		'''
+
+		# image was given directly
+		if self.renderFunction is None:
+			return
+
+		self._image = None
+		self._rgbImage = None
+
+	@property
+	def rgbImage( self ):
+		''' - RGB version of image for matplotlib, converted on first use
+		'''
+
+		# not converted yet
+		if self._rgbImage is None:
+			self._rgbImage = cv2.cvtColor( self.image, cv2.COLOR_BGR2RGB )
+
+		return self._rgbImage
+
+	def saveImage( self, imageWriter=None ):
 		''' save image to path
+
+			- image is written in background if image writer is given
 		'''
 
+		# save image in background, rendered image buffer is reused so it has to be copied,
+		# the copy is held until a writer thread has encoded it
+		if imageWriter is not None:
+			imageWriter.write( self.pathToSaveImageStr, self.image, isCopyNeeded=self.renderFunction is not None )
+			return
+
 		# save image 
 		cv2.imwrite( self.pathToSaveImageStr, self.image )
 
 
 class ImagePlotter:
 	''' - used to dynamically create image plot using matplotlib
+
+		- headless mode never imports matplotlib and never shows figure, image is only saved
+		  if isImageSaved is set, otherwise added image is not even stored
+
+		- image is saved in background if image writer is given, caller closes the writer
 	'''
 
-	def __init__( self, widthPerImageInch, heightPerImageInInch, numberOfColumn, imageStorageDirStr ):
+	def __init__( self, widthPerImageInch, heightPerImageInInch, numberOfColumn, imageStorageDirStr, isHeadless=False, isImageSaved=True, imageWriter=None ):
 		
-		# matplotlib pyplot
-		self.plt  = plt
+		# run without matplotlib
+		self.isHeadless = isHeadless
+
+		# save image when plotting
+		self.isImageSaved = isImageSaved
+
+		# background image writer, None means write in this thread
+		self.imageWriter = imageWriter
+
+		# matplotlib pyplot, import only when it is needed
+		self.plt = None
+		if not self.isHeadless:
+			from matplotlib import pyplot as plt
+			self.plt = plt
 
 		# image width
 		self.widthPerImageInch = widthPerImageInch
@@ -71,16 +140,67 @@ class ImagePlotter:
 		''' - add image to be plotted
 		'''
 
+		# nobody will look at or save this image
+		if self.isHeadless and not self.isImageSaved:
+			return
+
 		# create image object
 		imageObj = Image( image, imageNameStr, self.imageStorageDirStr )
 
 		# store image object
 		self.imageObjStorageList.append( imageObj )
 
+	def addRenderedImageToPlot( self, renderFunction, imageNameStr ):
+		''' - add image which is rendered only when it is plotted or saved
+
+			- render function may return the same reused buffer every time, each image is 
+			  released right after it is plotted and saved
+		'''
+
+		# nobody will look at or save this image
+		if self.isHeadless and not self.isImageSaved:
+			return
+
+		# create image object
+		imageObj = Image( None, imageNameStr, self.imageStorageDirStr, renderFunction )
+
+		# store image object
+		self.imageObjStorageList.append( imageObj )
+
 	def plotAndShowAllImage( self ):
 		''' - construct all image in figure and show them 
+
+			- headless mode only saves image
+
+			- plotting time without showing figure is measured by profiler
 		'''
 
+		# construct figure
+		with profiler.measureStage( 'plotting' ):
+			self._plotAllImage()
+
+		# show figure
+		if not self.isHeadless:
+			self.plt.show()
+
+	def _plotAllImage( self ):
+		''' - construct all image in figure, headless mode only saves image
+		'''
+
+		# no figure in headless mode
+		if self.isHeadless:
+
+			# loop through image object
+			for imageObj in self.imageObjStorageList:
+
+				# save image
+				if self.isImageSaved:
+					imageObj.saveImage( self.imageWriter )
+
+				# free rendered image
+				imageObj.releaseImage()
+			return
+
 		# get number of image in figure
 		self.numberOfImage = len( self.imageObjStorageList )
 
@@ -109,7 +229,8 @@ class ImagePlotter:
 			self.plt.title( imageObj.imageNameStr )
 
 			# save image 
-			imageObj.saveImage()
-		
-		# show figure
-		plt.show()
\ No newline at end of file
+			if self.isImageSaved:
+				imageObj.saveImage( self.imageWriter )
+
+			# free rendered image, matplotlib keeps its own copy
+			imageObj.releaseImage()
\ No newline at end of file
@@ -0,0 +1,162 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# bounded queue of pending image
+import queue
+
+# run writer concurrently
+import threading
+
+import os
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# image format to file extension and cv2 quality flag
+ImageFormatToExtensionAndQualityFlagDict = { 'jpg' : ( '.jpg', cv2.IMWRITE_JPEG_QUALITY ),
+											 'png' : ( '.png', cv2.IMWRITE_PNG_COMPRESSION ),
+											 'webp' : ( '.webp', cv2.IMWRITE_WEBP_QUALITY ) }
+
+# default quality of each format, png value is compression level 0 - 9
+ImageFormatToDefaultQualityDict = { 'jpg' : 95, 'png' : 3, 'webp' : 90 }
+
+# marker put in queue to stop writer thread
+StopWriterMarker = object()
+
+class AsyncImageWriter:
+	''' - encode and write image in background thread
+
+		- pending image is kept in bounded queue, write() blocks when queue is full so memory stays bounded,
+		  at most queueSizeInt queued image plus one image being encoded per writer thread is held
+
+		- file extension of given path is replaced by extension of selected format
+	'''
+
+	def __init__( self, imageFormatStr='jpg', qualityInt=None, numberOfWorker=2, queueSizeInt=8 ):
+
+		assert imageFormatStr in ImageFormatToExtensionAndQualityFlagDict, 'unknown image format {}'.format( imageFormatStr )
+
+		# file extension and encoder parameter
+		self.fileExtensionStr, qualityFlag = ImageFormatToExtensionAndQualityFlagDict[ imageFormatStr ]
+		self.encodeParameterList = [ qualityFlag, qualityInt if qualityInt is not None else ImageFormatToDefaultQualityDict[ imageFormatStr ] ]
+
+		# bounded queue of ( path, image )
+		self.pendingImageQueue = queue.Queue( maxsize=queueSizeInt )
+
+		# path of image which can not be written
+		self.failedPathList = list()
+
+		# number of written image
+		self.numberOfWrittenImage = 0
+
+		# lock to update statistic
+		self.lock = threading.Lock()
+
+		# start writer thread
+		self.workerThreadList = [ threading.Thread( target=self._runWorker, name='image-writer-{}'.format( workerPosition ), daemon=True ) for workerPosition in range( numberOfWorker ) ]
+		for workerThread in self.workerThreadList:
+			workerThread.start()
+
+		# writer is closed
+		self.isClosed = False
+
+	def _runWorker( self ):
+		''' - write image from queue until stop marker
+		'''
+
+		while True:
+
+			# get next image
+			item = self.pendingImageQueue.get()
+
+			# stop this worker
+			if item is StopWriterMarker:
+				self.pendingImageQueue.task_done()
+				break
+
+			pathToSaveImageStr, image = item
+
+			try:
+
+				# encode and write image
+				isWritten = cv2.imwrite( pathToSaveImageStr, image, self.encodeParameterList )
+
+			except cv2.error:
+				isWritten = False
+
+			# update statistic
+			with self.lock:
+				if isWritten:
+					self.numberOfWrittenImage += 1
+				else:
+					self.failedPathList.append( pathToSaveImageStr )
+
+			self.pendingImageQueue.task_done()
+
+	def write( self, pathToSaveImageStr, image, isCopyNeeded=False ):
+		''' - queue image to be written, block if queue is full
+
+			ARGS:
+				- pathToSaveImageStr ( str ) --> extension is replaced by extension of selected format
+				- image ( numpy array )
+				- isCopyNeeded ( bool ) --> set if caller reuses image buffer after this call
+
+			RETURN:
+				- pathToSaveImageStr ( str ) --> path image will be written to
+		'''
+
+		assert not self.isClosed, 'image writer is already closed'
+
+		# use extension of selected format
+		pathToSaveImageStr = os.path.splitext( pathToSaveImageStr )[ 0 ] + self.fileExtensionStr
+
+		# queue image
+		self.pendingImageQueue.put( ( pathToSaveImageStr, image.copy() if isCopyNeeded else image ) )
+
+		return pathToSaveImageStr
+
+	def flush( self ):
+		''' - wait until every queued image is written
+		'''
+		self.pendingImageQueue.join()
+
+	def close( self, isErrorRaised=True ):
+		''' - write every queued image and stop writer thread
+
+			ARGS:
+				- isErrorRaised ( bool ) --> raise IOError if some image can not be written, failed path is kept in failedPathList either way
+		'''
+
+		# already closed
+		if self.isClosed:
+			return
+		self.isClosed = True
+
+		# stop each worker after queued image
+		for _ in self.workerThreadList:
+			self.pendingImageQueue.put( StopWriterMarker )
+
+		# wait for worker
+		for workerThread in self.workerThreadList:
+			workerThread.join()
+
+		# report image which can not be written
+		if self.failedPathList and isErrorRaised:
+			raise IOError( 'can not write image {}'.format( self.failedPathList ) )
+
+	def __enter__( self ):
+		return self
+
+	def __exit__( self, exceptionType, exceptionValue, traceback ):
+
+		# body already failed, do not hide its exception behind write error
+		self.close( isErrorRaised=exceptionType is None )
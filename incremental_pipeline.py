@@ -0,0 +1,357 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# array operation
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from contour_manipulation import ContourStorage
+
+from detection_pipeline import convertToBinaryImage, findContourTree, detectOuterMostContour, extractPoseListFromContourObj, MinContourAreaInt, MaxContourAreaInt
+
+from spatial_index import isBoundingBoxInside, isBoundingBoxOverlapping, mergeBoundingBox
+
+from roi_pipeline import createContourStorageInRegionOfInterest
+
+from instrumentation import profiler
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# known contour this close to region of interest ( in pixel ) is treated as passing through it
+RegionOfInterestMarginInt = 2
+
+def findDirtyTileMask( binaryImage, previousBinaryImage, tileSizeInt ):
+	''' - find tile which has any pixel changed since previous binary image
+
+		RETURN:
+			- ( dirtyTileMask, changedPixelMask ) ( tuple ) --> dirtyTileMask shape is ( number of tile row, number of tile column ), bool
+	'''
+
+	# changed pixel
+	changedPixelMask = binaryImage != previousBinaryImage
+
+	# pad image to multiple of tile size
+	imageHeightInt, imageWidthInt = changedPixelMask.shape
+	numberOfTileRow = -( -imageHeightInt // tileSizeInt )
+	numberOfTileColumn = -( -imageWidthInt // tileSizeInt )
+	paddedChangedPixelMask = np.zeros( ( numberOfTileRow * tileSizeInt, numberOfTileColumn * tileSizeInt ), dtype=bool )
+	paddedChangedPixelMask[ :imageHeightInt, :imageWidthInt ] = changedPixelMask
+
+	# any changed pixel in each tile
+	return paddedChangedPixelMask.reshape( numberOfTileRow, tileSizeInt, numberOfTileColumn, tileSizeInt ).any( axis=( 1, 3 ) ), changedPixelMask
+
+class IncrementalDetector:
+	''' - detect outer most contour frame by frame, only re-analyse region which changed since previous frame
+
+		- binary image is compared with previous one tile by tile, changed pixel of connected dirty tile
+		  becomes region of interest
+
+		- region of interest grows until every known contour passing near it is fully inside it,
+		  then findContours runs only in that region and contour cut by its border is ignored
+
+		- contour and detection outside every region of interest is carried forward from previous frame
+
+		- whole frame is processed again when too many tile changed, e.g. when change reaches image border
+	'''
+
+	def __init__( self, tileSizeInt=64, maxDirtyTileRatioFloat=0.5, minArea=MinContourAreaInt, maxArea=MaxContourAreaInt ):
+
+		# size of tile to compare ( in pixel )
+		self.tileSizeInt = tileSizeInt
+
+		# ratio of dirty tile above which whole frame is processed
+		self.maxDirtyTileRatioFloat = maxDirtyTileRatioFloat
+
+		# area range of contour of interest
+		self.minArea = minArea
+		self.maxArea = maxArea
+
+		# binary image of previous frame
+		self.previousBinaryImage = None
+
+		# size of current frame ( width, height )
+		self.imageSizeTuple = None
+
+		# every contour of current frame in full frame coordinate and its bounding box
+		self.contourList = list()
+		self.contourBoundingBoxList = list()
+
+		# outer most contour object of current frame, all shape
+		self.outerMostContourObjList = list()
+
+		# statistic of latest frame
+		self.latestDirtyTileRatioFloat = 0.0
+		self.latestRegionOfInterestList = list()
+		self.isLatestFrameFull = False
+
+	def _processFullFrame( self, binaryImage ):
+		''' - find contour and detect outer most contour on the whole frame
+		'''
+
+		# find contour on whole frame
+		contourList, hierarchy = findContourTree( binaryImage )
+		contourStorageObj = detectOuterMostContour( ContourStorage( contourList, hierarchy ), self.minArea, self.maxArea )
+
+		# replace state
+		self.contourList = list( contourList )
+		self.contourBoundingBoxList = [ cv2.boundingRect( contour ) for contour in contourList ]
+		self.outerMostContourObjList = contourStorageObj.outerMostCircleContourObjList + \
+									   contourStorageObj.outerMostTriangleContourObjList + \
+									   contourStorageObj.outerMostSquareContourObjList
+
+	def _growByMargin( self, regionOfInterestTuple ):
+		''' - grow region of interest by margin inside image
+		'''
+
+		( xPosition, yPosition, regionWidth, regionHeight ) = regionOfInterestTuple
+
+		# grow by margin, clip to image
+		grownXPosition, grownYPosition = max( xPosition - RegionOfInterestMarginInt, 0 ), max( yPosition - RegionOfInterestMarginInt, 0 )
+		return ( grownXPosition, grownYPosition,
+				 min( xPosition + regionWidth + RegionOfInterestMarginInt, self.imageSizeTuple[ 0 ] ) - grownXPosition,
+				 min( yPosition + regionHeight + RegionOfInterestMarginInt, self.imageSizeTuple[ 1 ] ) - grownYPosition )
+
+	def _isContourPassingThrough( self, contourPosition, regionOfInterestTuple ):
+		''' - check if known contour passes through region of interest grown by margin, pixel right outside
+			  region can change from inside to border of a shape when its neighbour inside region changes
+
+			- contour only keeps corner point, so its outline is drawn into a mask of the region
+			  instead of testing point
+
+			- shape touching image border is part of the outline of background, which also runs along
+			  image border, so change near image border grows region to whole frame
+		'''
+
+		# region grown by margin
+		( xPosition, yPosition, regionWidth, regionHeight ) = self._growByMargin( regionOfInterestTuple )
+
+		# bounding box does not even overlap
+		if not isBoundingBoxOverlapping( self.contourBoundingBoxList[ contourPosition ], ( xPosition, yPosition, regionWidth, regionHeight ) ):
+			return False
+
+		# draw outline of contour in mask of region, outline outside mask is clipped
+		regionMask = np.zeros( ( regionHeight, regionWidth ), dtype=np.uint8 )
+		cv2.polylines( regionMask, [ self.contourList[ contourPosition ] - np.array( [ xPosition, yPosition ], dtype=np.int32 ) ], True, 1 )
+
+		return bool( regionMask.any() )
+
+	def _findRegionOfInterestList( self, dirtyTileMask, changedPixelMask ):
+		''' - group connected dirty tile into region of interest, shrink it to changed pixel and grow it
+			  until every known contour passing through it is fully inside it
+
+			RETURN:
+				- regionOfInterestList ( list ) --> list of ( x, y, width, height ), already grown by margin
+		'''
+
+		# connected dirty tile
+		_, _, tileStatArray, _ = cv2.connectedComponentsWithStats( dirtyTileMask.astype( np.uint8 ), connectivity=8 )
+
+		# bounding box of changed pixel in each group, first row is background
+		regionOfInterestList = list()
+		for tileColumn, tileRow, numberOfTileColumn, numberOfTileRow, _ in tileStatArray[ 1: ]:
+			xPosition, yPosition = int( tileColumn ) * self.tileSizeInt, int( tileRow ) * self.tileSizeInt
+			( changedX, changedY, changedWidth, changedHeight ) = cv2.boundingRect( changedPixelMask[ yPosition : yPosition + int( numberOfTileRow ) * self.tileSizeInt,
+																									  xPosition : xPosition + int( numberOfTileColumn ) * self.tileSizeInt ].view( np.uint8 ) )
+			regionOfInterestList.append( ( xPosition + changedX, yPosition + changedY, changedWidth, changedHeight ) )
+
+		# grow and merge region until nothing changes
+		isChanged = True
+		while isChanged:
+			isChanged = False
+
+			# grow each region to contain every contour passing through it
+			for regionPosition, regionOfInterestTuple in enumerate( regionOfInterestList ):
+				for contourPosition, contourBoundingBoxTuple in enumerate( self.contourBoundingBoxList ):
+					if not isBoundingBoxInside( contourBoundingBoxTuple, regionOfInterestTuple ) and self._isContourPassingThrough( contourPosition, regionOfInterestTuple ):
+						regionOfInterestTuple = mergeBoundingBox( regionOfInterestTuple, contourBoundingBoxTuple )
+						isChanged = True
+				regionOfInterestList[ regionPosition ] = regionOfInterestTuple
+
+			# merge region whose margin overlaps, so no contour is found by two region
+			mergedRegionOfInterestList = list()
+			for regionOfInterestTuple in regionOfInterestList:
+				for mergedPosition, mergedRegionOfInterestTuple in enumerate( mergedRegionOfInterestList ):
+					if isBoundingBoxOverlapping( self._growByMargin( regionOfInterestTuple ), self._growByMargin( mergedRegionOfInterestTuple ) ):
+						mergedRegionOfInterestList[ mergedPosition ] = mergeBoundingBox( regionOfInterestTuple, mergedRegionOfInterestTuple )
+						isChanged = True
+						break
+				else:
+					mergedRegionOfInterestList.append( regionOfInterestTuple )
+			regionOfInterestList = mergedRegionOfInterestList
+
+		return [ self._growByMargin( regionOfInterestTuple ) for regionOfInterestTuple in regionOfInterestList ]
+
+	def _processRegionOfInterestList( self, binaryImage, regionOfInterestList ):
+		''' - find contour and detect outer most contour in every region of interest at once
+
+			- contour touching region border which is not image border is cut by the region,
+			  e.g. border of background, it is dropped
+
+			RETURN:
+				- ( contourList, outerMostContourObjList ) ( tuple ) --> contour cut by region border is not included
+		'''
+
+		# contour of every region in one contour storage, cut contour never passes area filter
+		contourStorageObj, cutContourIndexList = createContourStorageInRegionOfInterest( binaryImage, regionOfInterestList, isBinaryImage=True )
+
+		# no contour in any region
+		if contourStorageObj is None:
+			return list(), list()
+
+		# detect outer most contour
+		detectOuterMostContour( contourStorageObj, self.minArea, self.maxArea )
+
+		# contour which is not cut
+		cutContourIndexSet = set( cutContourIndexList )
+		keptContourList = [ contour for contourIndex, contour in enumerate( contourStorageObj.allContourList ) if contourIndex not in cutContourIndexSet ]
+
+		return keptContourList, contourStorageObj.outerMostCircleContourObjList + \
+								contourStorageObj.outerMostTriangleContourObjList + \
+								contourStorageObj.outerMostSquareContourObjList
+
+	def processFrame( self, image ):
+		''' - detect outer most contour of this frame, only re-analyse changed region
+
+			RETURN:
+				- outerMostContourObjList ( list )
+		'''
+
+		# convert to binary image
+		binaryImage = convertToBinaryImage( image )
+		imageHeightInt, imageWidthInt = binaryImage.shape
+		self.imageSizeTuple = ( imageWidthInt, imageHeightInt )
+
+		# first frame or frame size changed, process whole frame
+		if self.previousBinaryImage is None or self.previousBinaryImage.shape != binaryImage.shape:
+			self.latestDirtyTileRatioFloat = 1.0
+			self.latestRegionOfInterestList = [ ( 0, 0, imageWidthInt, imageHeightInt ) ]
+			self.isLatestFrameFull = True
+			self._processFullFrame( binaryImage )
+			self.previousBinaryImage = binaryImage
+			return self.outerMostContourObjList
+
+		# find changed tile
+		with profiler.measureStage( 'findDirtyTile' ):
+			dirtyTileMask, changedPixelMask = findDirtyTileMask( binaryImage, self.previousBinaryImage, self.tileSizeInt )
+		self.latestDirtyTileRatioFloat = float( dirtyTileMask.mean() )
+		self.previousBinaryImage = binaryImage
+		profiler.addCount( 'dirtyTile', int( dirtyTileMask.sum() ) )
+
+		# nothing changed, carry everything forward
+		if not dirtyTileMask.any():
+			self.latestRegionOfInterestList = list()
+			self.isLatestFrameFull = False
+			return self.outerMostContourObjList
+
+		# find region of interest
+		with profiler.measureStage( 'findRegionOfInterest' ):
+			regionOfInterestList = self._findRegionOfInterestList( dirtyTileMask, changedPixelMask )
+
+		# too much changed, process whole frame
+		regionOfInterestAreaInt = sum( regionWidth * regionHeight for _, _, regionWidth, regionHeight in regionOfInterestList )
+		if self.latestDirtyTileRatioFloat > self.maxDirtyTileRatioFloat or regionOfInterestAreaInt > self.maxDirtyTileRatioFloat * imageWidthInt * imageHeightInt:
+			self.latestRegionOfInterestList = [ ( 0, 0, imageWidthInt, imageHeightInt ) ]
+			self.isLatestFrameFull = True
+			self._processFullFrame( binaryImage )
+			return self.outerMostContourObjList
+
+		self.latestRegionOfInterestList = regionOfInterestList
+		self.isLatestFrameFull = False
+
+		# carry forward contour and detection outside every region of interest
+		keptPositionList = [ contourPosition for contourPosition, contourBoundingBoxTuple in enumerate( self.contourBoundingBoxList )
+							 if not any( isBoundingBoxInside( contourBoundingBoxTuple, regionOfInterestTuple ) for regionOfInterestTuple in regionOfInterestList ) ]
+		self.contourList = [ self.contourList[ contourPosition ] for contourPosition in keptPositionList ]
+		self.contourBoundingBoxList = [ self.contourBoundingBoxList[ contourPosition ] for contourPosition in keptPositionList ]
+		carriedContourObjList = [ contourObj for contourObj in self.outerMostContourObjList
+								  if not any( isBoundingBoxInside( cv2.boundingRect( contourObj.contour ), regionOfInterestTuple ) for regionOfInterestTuple in regionOfInterestList ) ]
+
+		# re-analyse every region of interest
+		contourList, newContourObjList = self._processRegionOfInterestList( binaryImage, regionOfInterestList )
+		self.contourList.extend( contourList )
+		self.contourBoundingBoxList.extend( cv2.boundingRect( contour ) for contour in contourList )
+
+		# new contour can be nested in carried contour, keep only the outer most one of each shape
+		self.outerMostContourObjList = self._removeNestedContourObj( carriedContourObjList, newContourObjList )
+
+		return self.outerMostContourObjList
+
+	def _removeNestedContourObj( self, carriedContourObjList, newContourObjList ):
+		''' - remove new contour object whose center is inside carried contour object of the same shape,
+			  new contour object nested in another new one is already removed by contour tree of its region
+
+			RETURN:
+				- outerMostContourObjList ( list )
+		'''
+
+		# outer most contour object storage
+		outerMostContourObjList = list( carriedContourObjList )
+
+		# loop through each new contour object
+		for contourObj in newContourObjList:
+
+			# center point as float
+			centerPointTuple = ( float( contourObj.centerPointTuple[ 0 ] ), float( contourObj.centerPointTuple[ 1 ] ) )
+
+			# center is inside carried contour of the same shape
+			isNested = any( carriedContourObj.shapeTypeStr == contourObj.shapeTypeStr and
+							cv2.pointPolygonTest( carriedContourObj.contour, centerPointTuple, False ) > 0
+							for carriedContourObj in carriedContourObjList )
+
+			# store it
+			if not isNested:
+				outerMostContourObjList.append( contourObj )
+
+		return outerMostContourObjList
+
+	def getStatistic( self ):
+		''' - ratio of dirty tile and region of interest of latest frame
+
+			RETURN:
+				- statisticDict ( dict )
+		'''
+		return { 'dirtyTileRatioFloat' : self.latestDirtyTileRatioFloat,
+				 'regionOfInterestList' : self.latestRegionOfInterestList,
+				 'isFullFrame' : self.isLatestFrameFull,
+				 'numberOfContour' : len( self.contourList ),
+				 'numberOfOuterMostContour' : len( self.outerMostContourObjList ) }
+
+def streamPoseFromFrameIncremental( frameIterator, incrementalDetectorObj=None ):
+	''' - generator pipeline like streamPoseFromFrame, but only changed region of each frame is re-analysed
+
+		ARGS:
+			- frameIterator ( iterator ) --> yield ( frameIndex, frame )
+			- incrementalDetectorObj ( IncrementalDetector ) --> new detector with default setting if not given
+
+		YIELD:
+			- ( frameIndex, poseList ) ( tuple )
+	'''
+
+	# detector which keeps state between frame
+	if incrementalDetectorObj is None:
+		incrementalDetectorObj = IncrementalDetector()
+
+	# loop through each frame
+	for frameIndex, frame in frameIterator:
+
+		# detect pose in this frame
+		profiler.beginFrame( frameIndex )
+		poseList = extractPoseListFromContourObj( incrementalDetectorObj.processFrame( frame ) )
+		profiler.endFrame()
+
+		yield frameIndex, poseList
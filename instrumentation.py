@@ -0,0 +1,232 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# measure stage latency
+import time
+
+# export frame record
+import json
+
+# guard shared record against worker thread
+import threading
+
+class NullStageTimer:
+	''' - stage timer used when profiling is off, does nothing
+	'''
+
+	def __enter__( self ):
+		return self
+
+	def __exit__( self, exceptionType, exceptionValue, traceback ):
+		return False
+
+# shared timer returned when profiling is off so nothing is allocated per call
+NullStageTimerObj = NullStageTimer()
+
+class StageTimer:
+	''' - measure time of one stage and add it to profiler
+	'''
+
+	def __init__( self, profiler, stageNameStr ):
+		self.profiler = profiler
+		self.stageNameStr = stageNameStr
+		self.startTimeFloat = None
+
+	def __enter__( self ):
+		self.startTimeFloat = time.perf_counter()
+		return self
+
+	def __exit__( self, exceptionType, exceptionValue, traceback ):
+		self.profiler.addStageLatency( self.stageNameStr, time.perf_counter() - self.startTimeFloat )
+		return False
+
+class StageProfiler:
+	''' - timer and counter around each stage of detection pipeline
+
+		- off by default, measureStage returns a shared no-op timer and addCount returns right away
+
+		- per frame record:
+			- stage latency ( in millisecond ), summed if stage runs more than once in a frame
+			- counter, e.g. number of contour and cache hit / miss
+
+		- per frame record can be written as JSON lines, total since start as Prometheus text format
+
+		- every update holds a lock, so total since start stays right when stage runs in worker thread,
+		  but per frame record is only meaningful when one frame is processed at a time
+	'''
+
+	def __init__( self ):
+
+		# profiling is on
+		self.isEnabled = False
+
+		# file to write one JSON line per frame, None means do not write
+		self.jsonLineFile = None
+
+		# frame id of current frame
+		self.frameId = None
+
+		# stage name to latency of current frame ( in second )
+		self.stageNameToLatencyDict = dict()
+
+		# counter name to value of current frame
+		self.counterNameToValueDict = dict()
+
+		# stage name to total latency since start ( in second )
+		self.stageNameToTotalLatencyDict = dict()
+
+		# stage name to number of call since start
+		self.stageNameToTotalCallDict = dict()
+
+		# counter name to total value since start
+		self.counterNameToTotalValueDict = dict()
+
+		# number of finished frame
+		self.numberOfFrame = 0
+
+		# lock to update record
+		self.lock = threading.Lock()
+
+	def enable( self, jsonLineFile=None ):
+		''' - turn profiling on
+
+			ARGS:
+				- jsonLineFile ( file ) --> write one JSON line per frame if given
+		'''
+		self.isEnabled = True
+		self.jsonLineFile = jsonLineFile
+
+	def disable( self ):
+		''' - turn profiling off
+		'''
+		self.isEnabled = False
+		self.jsonLineFile = None
+
+	def measureStage( self, stageNameStr ):
+		''' - context manager to measure latency of one stage
+
+			RETURN:
+				- stageTimer ( StageTimer or NullStageTimer )
+		'''
+
+		# profiling is off
+		if not self.isEnabled:
+			return NullStageTimerObj
+
+		return StageTimer( self, stageNameStr )
+
+	def addStageLatency( self, stageNameStr, latencyFloat ):
+		''' - add latency of one stage call to current frame and total
+		'''
+		with self.lock:
+			self.stageNameToLatencyDict[ stageNameStr ] = self.stageNameToLatencyDict.get( stageNameStr, 0.0 ) + latencyFloat
+			self.stageNameToTotalLatencyDict[ stageNameStr ] = self.stageNameToTotalLatencyDict.get( stageNameStr, 0.0 ) + latencyFloat
+			self.stageNameToTotalCallDict[ stageNameStr ] = self.stageNameToTotalCallDict.get( stageNameStr, 0 ) + 1
+
+	def addCount( self, counterNameStr, valueInt=1 ):
+		''' - add value to counter of current frame and total
+		'''
+
+		# profiling is off
+		if not self.isEnabled:
+			return
+
+		with self.lock:
+			self.counterNameToValueDict[ counterNameStr ] = self.counterNameToValueDict.get( counterNameStr, 0 ) + valueInt
+			self.counterNameToTotalValueDict[ counterNameStr ] = self.counterNameToTotalValueDict.get( counterNameStr, 0 ) + valueInt
+
+	def beginFrame( self, frameId ):
+		''' - start record of new frame
+		'''
+		with self.lock:
+			self.frameId = frameId
+			self.stageNameToLatencyDict = dict()
+			self.counterNameToValueDict = dict()
+
+	def endFrame( self ):
+		''' - finish record of current frame and write it as JSON line if file is given
+
+			RETURN:
+				- frameRecordDict ( dict ) --> None if profiling is off
+		'''
+
+		# profiling is off
+		if not self.isEnabled:
+			return None
+
+		# record of this frame
+		with self.lock:
+			self.numberOfFrame += 1
+			frameRecordDict = { 'frameId' : self.frameId,
+								'stageLatencyMsDict' : { stageNameStr : latencyFloat * 1000 for stageNameStr, latencyFloat in self.stageNameToLatencyDict.items() },
+								'counterDict' : dict( self.counterNameToValueDict ) }
+
+		# write record
+		if self.jsonLineFile is not None:
+			self.jsonLineFile.write( json.dumps( frameRecordDict ) + '\n' )
+
+		return frameRecordDict
+
+	def getCacheHitRate( self, cacheNameStr ):
+		''' - hit rate of cache since start, counted by '<cacheNameStr>_hit' and '<cacheNameStr>_miss' counter
+
+			RETURN:
+				- hitRateFloat ( float ) --> None if cache was never used
+		'''
+		numberOfHit = self.counterNameToTotalValueDict.get( cacheNameStr + '_hit', 0 )
+		numberOfMiss = self.counterNameToTotalValueDict.get( cacheNameStr + '_miss', 0 )
+
+		# cache was never used
+		if numberOfHit + numberOfMiss == 0:
+			return None
+
+		return numberOfHit / ( numberOfHit + numberOfMiss )
+
+	def formatPrometheusText( self, metricPrefixStr='module89' ):
+		''' - total latency, call and counter since start in Prometheus text format
+
+			RETURN:
+				- prometheusTextStr ( str )
+		'''
+
+		# text line storage
+		lineList = list()
+
+		# copy total, worker thread may still update it
+		with self.lock:
+			stageNameToTotalLatencyDict = dict( self.stageNameToTotalLatencyDict )
+			stageNameToTotalCallDict = dict( self.stageNameToTotalCallDict )
+			counterNameToTotalValueDict = dict( self.counterNameToTotalValueDict )
+
+		# number of frame
+		lineList.append( '# TYPE {}_frames_total counter'.format( metricPrefixStr ) )
+		lineList.append( '{}_frames_total {}'.format( metricPrefixStr, self.numberOfFrame ) )
+
+		# stage latency
+		lineList.append( '# TYPE {}_stage_seconds_total counter'.format( metricPrefixStr ) )
+		for stageNameStr, latencyFloat in sorted( stageNameToTotalLatencyDict.items() ):
+			lineList.append( '{}_stage_seconds_total{{stage="{}"}} {:.9f}'.format( metricPrefixStr, stageNameStr, latencyFloat ) )
+
+		# stage call
+		lineList.append( '# TYPE {}_stage_calls_total counter'.format( metricPrefixStr ) )
+		for stageNameStr, numberOfCall in sorted( stageNameToTotalCallDict.items() ):
+			lineList.append( '{}_stage_calls_total{{stage="{}"}} {}'.format( metricPrefixStr, stageNameStr, numberOfCall ) )
+
+		# counter
+		lineList.append( '# TYPE {}_count_total counter'.format( metricPrefixStr ) )
+		for counterNameStr, valueInt in sorted( counterNameToTotalValueDict.items() ):
+			lineList.append( '{}_count_total{{name="{}"}} {}'.format( metricPrefixStr, counterNameStr, valueInt ) )
+
+		return '\n'.join( lineList ) + '\n'
+
+	def writePrometheusText( self, pathStr ):
+		''' - write Prometheus text to file, e.g. for node exporter textfile collector
+		'''
+		with open( pathStr, 'w' ) as prometheusFile:
+			prometheusFile.write( self.formatPrometheusText() )
+
+# profiler shared by every module
+profiler = StageProfiler()
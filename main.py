@@ -7,190 +7,365 @@
 # image processing
 import cv2
 
-# display image
-from matplotlib import pyplot as plt
-
-# mathematical operation
-import math
-
 # argument parser
 import argparse
 
 import os
 
+# bind layer name to render function
+import functools
+
 #####################################################################################################
 #
 # Local Import
 #
 #####################################################################################################
 
-from helper import calculateVectorMagnitude
+from image_plotter import ImagePlotter
 
-from image_plotter import Image, ImagePlotter
+from detection_pipeline import streamPoseFromFrame, FrameRateCounter, convertToBinaryImage, createContourStorage, detectOuterMostContour
 
-from contour_manipulation import Contour, ContourStorage 
+from instrumentation import profiler
 
-if __name__ == '__main__':
+from approximation_cache import approximatedPolygonCache
 
-	# argument parser
-	parser = argparse.ArgumentParser()
-	parser.add_argument( 'resultImageStoragePathStr', type=str, 
-		     			help='path to save result image' )
-	args = parser.parse_args()
-	resultImageStoragePathStr = os.getcwd() +  args.resultImageStoragePathStr
+from frame_source import iterateFrameFromSource
 
-	# create image plotter object
-	imagePlotter = ImagePlotter( 7, 7, 2, resultImageStoragePathStr )
+from threaded_pipeline import ThreadedPipeline
 
-	# reading image
-	originalImage = cv2.imread( 'field_image_from_manual.png' )
+from overlay_renderer import OverlayRenderer, LayerNameTuple
 
-	# add original image to figure
-	imagePlotter.addImageToPlot( originalImage, 'original image' )
+from image_writer import AsyncImageWriter, ImageFormatToExtensionAndQualityFlagDict
 
-	# converting image into grayscale image
-	grayScaleImage = cv2.cvtColor( originalImage, cv2.COLOR_BGR2GRAY )
+from incremental_pipeline import IncrementalDetector, streamPoseFromFrameIncremental
 
-	# add gray scale image to figure 
-	imagePlotter.addImageToPlot( grayScaleImage, 'gray scale image' )
+from shape_tracker import ShapeTracker, streamTrackPoseFromFrame
+
+from roi_pipeline import RegionOfInterestDetector, streamPoseFromFrameRegionOfInterest, DefaultScanIntervalInt
+
+from detection_store import DetectionStoreWriter
+
+from frame_cache import buildFrameCache, FrameTypeStrTuple
+
+from pyramid_pipeline import PyramidDetector, streamPoseFromFramePyramid, DefaultPyramidLevelInt
+
+from binarization import Binarizer, streamPoseFromFrameWithBinarizer, detectOuterMostContourOfAllLevel, BinarizationMethodStrTuple, \
+						 DefaultNumberOfThresholdInt, DefaultAdaptiveBlockSizeInt
+
+def runStreaming( sourceStr, isThreaded=False, isIncremental=False, isTracked=False, isRegionOfInterest=False, scanIntervalInt=DefaultScanIntervalInt, storeDirectoryPathStr=None, reportEveryFrameInt=100, binarizerObj=None,
+				  isPyramid=False, pyramidLevelInt=DefaultPyramidLevelInt ):
+	''' - detect pose on every frame of video file, image directory or camera without any plotting
+
+		- report sustained frame per second while running and at the end
+
+		- threaded mode keeps several frame in flight and also reports queue depth and per stage latency
+
+		- incremental mode re-analyses only region which changed since previous frame and also reports dirty tile ratio
 
-	# convert to binary image
-	_, binaryImage = cv2.threshold( grayScaleImage, 127, 255, cv2.THRESH_BINARY )
+		- tracked mode gives pose with stable track id and smoothed axis, and also reports number of alive track
 
-	# add binary image to figure 
-	imagePlotter.addImageToPlot( binaryImage, 'binary image' )
+		- region of interest mode processes only region around previous detection and scans whole frame
+		  every scanIntervalInt frame, and also reports number of full frame scan
 
-	# finding contours from binary image
-	contourList, _ = cv2.findContours( binaryImage, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE )
+		- pose of every frame is appended to columnar detection store if store directory is given,
+		  frame id continues after the last frame already in store
 
-	# init contour storage
-	contourStorageObj = ContourStorage( contourList )
+		- pyramid mode detects marker on downscaled frame and refines only its region at full resolution,
+		  and also reports number of coarse detection
 
-	# filter contour only in area range
-	contourObjInAreaRangeList = contourStorageObj.filterContoursOnlyInAreaRange( 1000, 300000 )
+		- threaded, incremental, tracked, region of interest and pyramid mode exclude each other
 
-	# copy original image to draw contour in area range
-	originalImageForDrawContourInAreaRange = originalImage.copy()
+		- frame is binarized by binarizer if it is given, e.g. adaptive or multi level threshold,
+		  otherwise by the fixed global threshold, binarizer is only supported without any of the mode above
+	'''
 
-	# loop through contour in area range
-	for contourObj in contourObjInAreaRangeList:
-		
-		# using drawContours() function
-		cv2.drawContours( originalImageForDrawContourInAreaRange, [ contourObj.contour ], 0, (0, 0, 255), 3 )
+	# at most one mode, none of them supports binarizer
+	numberOfModeInt = sum( ( isThreaded, isIncremental, isTracked, isRegionOfInterest, isPyramid ) )
+	assert numberOfModeInt <= 1, 'threaded, incremental, tracked, region of interest and pyramid mode exclude each other'
+	assert binarizerObj is None or numberOfModeInt == 0, 'binarizer is only supported in plain streaming mode'
 
-	# add original image with contour in area range to figure 
-	imagePlotter.addImageToPlot( originalImageForDrawContourInAreaRange, 'contour in area range' )
+	# frame rate counter
+	frameRateCounter = FrameRateCounter()
 
-	# copy original image to draw circle contour
-	originalImageForDrawCircleContour = originalImage.copy()
+	# staged pipeline with one thread per stage
+	threadedPipeline = ThreadedPipeline( iterateFrameFromSource( sourceStr ) ) if isThreaded else None
 
-	# copy original image to draw triangle contour
-	originalImageForDrawTriangleContour = originalImage.copy()
+	# detector which keeps state between frame
+	incrementalDetectorObj = IncrementalDetector() if isIncremental else None
 
-	# copy original image to draw square contour
-	originalImageForDrawSquareContour = originalImage.copy()
+	# tracker which keeps track between frame
+	shapeTrackerObj = ShapeTracker() if isTracked else None
 
-	# classify contour object by its shape
-	contourStorageObj.classifyContourObjByShape()
+	# detector which keeps previous detection between frame
+	regionOfInterestDetectorObj = RegionOfInterestDetector( scanIntervalInt ) if isRegionOfInterest else None
 
-	# loop through each circle contour
-	for circleContourObj in contourStorageObj.circleContourObjList:
+	# detector which finds marker at coarse pyramid level first
+	pyramidDetectorObj = PyramidDetector( pyramidLevelInt ) if isPyramid else None
 
-		# draw contour 
-		cv2.drawContours( originalImageForDrawCircleContour, [ circleContourObj.contour ], 0, (0, 0, 255), 3 )
+	# detection store to append pose of each frame to, frame of this run is stored after frame already in store
+	detectionStoreWriterObj = DetectionStoreWriter( storeDirectoryPathStr ) if storeDirectoryPathStr is not None else None
+	frameIdOffsetInt = detectionStoreWriterObj.nextFrameIdInt if detectionStoreWriterObj is not None else 0
 
-	# add original image with circle contour 
-	imagePlotter.addImageToPlot( originalImageForDrawCircleContour, 'circle contour' )
+	# pose of each frame
+	if isThreaded:
+		framePoseIterator = threadedPipeline.run()
+	elif isIncremental:
+		framePoseIterator = streamPoseFromFrameIncremental( iterateFrameFromSource( sourceStr ), incrementalDetectorObj )
+	elif isTracked:
+		framePoseIterator = streamTrackPoseFromFrame( iterateFrameFromSource( sourceStr ), shapeTrackerObj )
+	elif isRegionOfInterest:
+		framePoseIterator = streamPoseFromFrameRegionOfInterest( iterateFrameFromSource( sourceStr ), regionOfInterestDetectorObj )
+	elif isPyramid:
+		framePoseIterator = streamPoseFromFramePyramid( iterateFrameFromSource( sourceStr ), pyramidDetectorObj )
+	elif binarizerObj is not None:
+		framePoseIterator = streamPoseFromFrameWithBinarizer( iterateFrameFromSource( sourceStr ), binarizerObj )
+	else:
+		framePoseIterator = streamPoseFromFrame( iterateFrameFromSource( sourceStr ) )
 
-	# loop through each circle contour
-	for triangleContourObj in contourStorageObj.triangleContourObjList:
+	# loop through pose of each frame
+	for frameIndex, poseList in framePoseIterator:
 
-		# draw contour 
-		cv2.drawContours( originalImageForDrawTriangleContour, [ triangleContourObj.contour ], 0, (0, 0, 255), 3 )
+		# count processed frame
+		frameRateCounter.tick()
 
-	# add original image with triangle contour 
-	imagePlotter.addImageToPlot( originalImageForDrawTriangleContour, 'triangle contour' )
+		# store pose of this frame
+		if detectionStoreWriterObj is not None:
+			detectionStoreWriterObj.appendPoseList( frameIdOffsetInt + frameIndex, poseList )
 
-	# loop through each circle contour
-	for squareContourObj in contourStorageObj.squareContourObjList:
+		# report frame rate periodically
+		if frameRateCounter.numberOfFrame % reportEveryFrameInt == 0:
+			print( '[runStreaming] frame: {}, pose: {}, fps: {:.2f}'.format( frameIndex, len( poseList ), frameRateCounter.framePerSecondFloat ) )
 
-		# draw contour 
-		cv2.drawContours( originalImageForDrawSquareContour, [ squareContourObj.contour ], 0, (0, 0, 255), 3 )
+		# report pipeline statistic periodically
+		if isThreaded and frameRateCounter.numberOfFrame % reportEveryFrameInt == 0:
+			print( '[runStreaming] {}'.format( threadedPipeline.getStatistic() ) )
 
-	# add original image with square contour 
-	imagePlotter.addImageToPlot( originalImageForDrawSquareContour, 'square contour' )
+		# report incremental statistic periodically
+		if incrementalDetectorObj is not None and frameRateCounter.numberOfFrame % reportEveryFrameInt == 0:
+			print( '[runStreaming] {}'.format( incrementalDetectorObj.getStatistic() ) )
 
-	# copy original image to draw outer most circle contour
-	originalImageForDrawOuterMostCircleContour = originalImage.copy()
+		# report number of alive track periodically
+		if shapeTrackerObj is not None and frameRateCounter.numberOfFrame % reportEveryFrameInt == 0:
+			print( '[runStreaming] alive track: {}, confirmed track: {}'.format( len( shapeTrackerObj.trackList ), sum( track.isConfirmed for track in shapeTrackerObj.trackList ) ) )
 
-	# copy original image to draw outer most triangle contour
-	originalImageForDrawOuterMostTriangleContour = originalImage.copy()
+		# report region of interest statistic periodically
+		if regionOfInterestDetectorObj is not None and frameRateCounter.numberOfFrame % reportEveryFrameInt == 0:
+			print( '[runStreaming] {}'.format( regionOfInterestDetectorObj.getStatistic() ) )
 
-	# copy original image to draw outer most square contour
-	originalImageForDrawOuterMostSquareContour = originalImage.copy()
+		# report pyramid statistic periodically
+		if pyramidDetectorObj is not None and frameRateCounter.numberOfFrame % reportEveryFrameInt == 0:
+			print( '[runStreaming] {}'.format( pyramidDetectorObj.getStatistic() ) )
 
-	# filter only outer most circle contour object
-	contourStorageObj.outerMostCircleContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.circleContourObjList, 4 )
+	print( '[runStreaming] processed {} frame in {:.2f} s, fps: {:.2f}'.format( frameRateCounter.numberOfFrame, frameRateCounter.elapsedTimeFloat, frameRateCounter.framePerSecondFloat ) )
 
-	# loop through each outer most circle contour object
-	for circleContourObj in contourStorageObj.outerMostCircleContourObjList:
+	# write buffered detection
+	if detectionStoreWriterObj is not None:
+		detectionStoreWriterObj.close()
+		print( '[runStreaming] stored {} detection in {}'.format( detectionStoreWriterObj.numberOfRowInt, storeDirectoryPathStr ) )
 
-		# draw contour 
-		cv2.drawContours( originalImageForDrawOuterMostCircleContour, [ circleContourObj.contour ], 0, ( 0, 0, 255 ), 3 )
+	# report final pipeline statistic
+	if isThreaded:
+		print( '[runStreaming] {}'.format( threadedPipeline.getStatistic() ) )
 
-		# draw center point of contour
-		cv2.circle( originalImageForDrawOuterMostCircleContour, circleContourObj.centerPointTuple, 7, ( 255, 255, 255 ), -1)
+	# report threshold of latest frame
+	if binarizerObj is not None:
+		print( '[runStreaming] {}'.format( binarizerObj.getStatistic() ) )
 
-		# draw x-axis line of coordinate frame
-		cv2.line( originalImageForDrawOuterMostCircleContour, circleContourObj.centerPointTuple, circleContourObj.xAxisEndPointTuple, ( 0, 0, 255 ), 3)
+def runSingleImage( resultImageStoragePathStr, isHeadless=False, isImageSaved=True, enabledLayerNameList=None, isOverlayCombined=False, imageWriter=None, binarizerObj=None ):
+	''' - detect pose on field image, plot every step and save result image
 
-		# draw y-axis line of coordinate frame
-		cv2.line( originalImageForDrawOuterMostCircleContour, circleContourObj.centerPointTuple, circleContourObj.yAxisEndPointTuple, ( 0, 255, 0 ), 3)
+		- headless mode does not import matplotlib nor show figure
 
-	# add original image with outer most circle contour to figure
-	imagePlotter.addImageToPlot( originalImageForDrawOuterMostCircleContour, 'outer most circle contour' )
+		- enabledLayerNameList selects overlay layer to draw, None means all layer
 
-	# filter only outer most triangle contour object
-	contourStorageObj.outerMostTriangleContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.triangleContourObjList, 5, returnDebugVariable=True )
+		- combined overlay draws all enabled layer on one image
 
-	# loop through each outer most triangle contour object
-	for triangleContourObj in contourStorageObj.outerMostTriangleContourObjList:
+		- result image is written in background if image writer is given
 
-		# draw contour 
-		cv2.drawContours( originalImageForDrawOuterMostTriangleContour, [ triangleContourObj.contour ], 0, ( 0, 0, 255 ), 3 )
+		- image is binarized by binarizer if it is given, binary image of each level is plotted
+	'''
 
-		# draw center point of contour
-		cv2.circle( originalImageForDrawOuterMostTriangleContour, triangleContourObj.centerPointTuple, 7, ( 255, 255, 255 ), -1)
+	# create image plotter object
+	imagePlotter = ImagePlotter( 7, 7, 2, resultImageStoragePathStr, isHeadless, isImageSaved, imageWriter )
+
+	# start profiler record of this image
+	profiler.beginFrame( 'field_image_from_manual.png' )
+
+	# reading image
+	originalImage = cv2.imread( 'field_image_from_manual.png' )
+
+	# add original image to figure
+	imagePlotter.addImageToPlot( originalImage, 'original image' )
+
+	# converting image into grayscale image
+	grayScaleImage = cv2.cvtColor( originalImage, cv2.COLOR_BGR2GRAY )
+
+	# add gray scale image to figure 
+	imagePlotter.addImageToPlot( grayScaleImage, 'gray scale image' )
+
+	# binarize with binarizer, one binary image per level
+	if binarizerObj is not None:
+
+		# convert to binary image of each level
+		binaryImageList = binarizerObj.binarize( grayScaleImage )
+
+		# add binary image of each level to figure
+		for binaryImage, levelInt in zip( binaryImageList, binarizerObj.latestLevelList ):
+			imagePlotter.addImageToPlot( binaryImage, 'binary image ( {} {} )'.format( binarizerObj.methodStr, levelInt ) )
 
-		# draw x-axis line of coordinate frame
-		cv2.line( originalImageForDrawOuterMostTriangleContour, triangleContourObj.centerPointTuple, triangleContourObj.xAxisEndPointTuple, ( 0, 0, 255 ), 3)
+		# finding contours from binary image of all level and init one contour storage with contour tree of all level
+		contourStorageObj = binarizerObj.createContourStorageFromBinaryImageList( binaryImageList )
 
-		# draw y-axis line of coordinate frame
-		cv2.line( originalImageForDrawOuterMostTriangleContour, triangleContourObj.centerPointTuple, triangleContourObj.yAxisEndPointTuple, ( 0, 255, 0 ), 3)
+		# filter contour in area range, classify contour by its shape and filter only outer most contour of each shape
+		detectOuterMostContourOfAllLevel( contourStorageObj, len( binaryImageList ) )
 
-	# add original image with outer most triangle contour to figure
-	imagePlotter.addImageToPlot( originalImageForDrawOuterMostTriangleContour, 'outer most triangle contour' )
+	else:
 
-	# filter only outer most square contour object
-	contourStorageObj.outerMostSquareContourObjList = contourStorageObj.filterOnlyOuterMostContourObj( contourStorageObj.squareContourObjList, 4 )
+		# convert to binary image
+		binaryImage = convertToBinaryImage( grayScaleImage, 127 )
 
-	# loop through each outer most square contour object
-	for squareContourObj in contourStorageObj.outerMostSquareContourObjList:
+		# add binary image to figure 
+		imagePlotter.addImageToPlot( binaryImage, 'binary image' )
 
-		# draw contour 
-		cv2.drawContours( originalImageForDrawOuterMostSquareContour, [ squareContourObj.contour ], 0, ( 0, 0, 255 ), 3 )
+		# finding contours from binary image and init contour storage with contour tree
+		contourStorageObj = createContourStorage( binaryImage )
 
-		# draw center point of contour
-		cv2.circle( originalImageForDrawOuterMostSquareContour, squareContourObj.centerPointTuple, 7, ( 255, 255, 255 ), -1)
+		# filter contour in area range, classify contour by its shape and filter only outer most contour of each shape
+		detectOuterMostContour( contourStorageObj, 1000, 300000 )
 
-		# draw x-axis line of coordinate frame
-		cv2.line( originalImageForDrawOuterMostSquareContour, squareContourObj.centerPointTuple, squareContourObj.xAxisEndPointTuple, ( 0, 0, 255 ), 3)
+	# overlay renderer draws on one reused canvas instead of one copy of original image per layer
+	overlayRenderer = OverlayRenderer( originalImage, contourStorageObj, enabledLayerNameList )
 
-		# draw y-axis line of coordinate frame
-		cv2.line( originalImageForDrawOuterMostSquareContour, squareContourObj.centerPointTuple, squareContourObj.yAxisEndPointTuple, ( 0, 255, 0 ), 3)
+	# all enabled layer on one image
+	if isOverlayCombined:
+		imagePlotter.addRenderedImageToPlot( overlayRenderer.renderCombined, 'overlay' )
 
-	# add original image with outer most square contour to figure
-	imagePlotter.addImageToPlot( originalImageForDrawOuterMostSquareContour, 'outer most square contour' )
+	# one image per enabled layer, each one is rendered only when it is plotted or saved
+	else:
+		for layerNameStr in overlayRenderer.enabledLayerNameList:
+			imagePlotter.addRenderedImageToPlot( functools.partial( overlayRenderer.renderLayer, layerNameStr ), layerNameStr )
 
 	# show figure
-	imagePlotter.plotAndShowAllImage()
\ No newline at end of file
+	imagePlotter.plotAndShowAllImage()
+
+	# finish profiler record of this image
+	profiler.endFrame()
+
+if __name__ == '__main__':
+
+	# argument parser
+	parser = argparse.ArgumentParser()
+	parser.add_argument( 'resultImageStoragePathStr', type=str, nargs='?', default='/resultImage',
+		     			help='path to save result image' )
+	parser.add_argument( '--stream', dest='streamSourceStr', type=str, default=None,
+						help='video file, image directory or camera index to process in streaming mode' )
+	modeGroup = parser.add_mutually_exclusive_group()
+	modeGroup.add_argument( '--threaded', dest='isThreaded', action='store_true',
+						help='run streaming mode as staged pipeline with one thread per stage' )
+	modeGroup.add_argument( '--incremental', dest='isIncremental', action='store_true',
+						help='in streaming mode, re-analyse only region which changed since previous frame' )
+	modeGroup.add_argument( '--track', dest='isTracked', action='store_true',
+						help='in streaming mode, track shape across frame with stable id and smoothed pose' )
+	modeGroup.add_argument( '--roi', dest='isRegionOfInterest', action='store_true',
+						help='in streaming mode, process only region around previous detection between full frame scan' )
+	parser.add_argument( '--scan-interval', dest='scanIntervalInt', type=int, default=DefaultScanIntervalInt,
+						help='number of frame between full frame scan in region of interest mode' )
+	modeGroup.add_argument( '--pyramid', dest='isPyramid', action='store_true',
+						help='in streaming mode, detect marker on downscaled frame and refine only its region at full resolution' )
+	parser.add_argument( '--pyramid-level', dest='pyramidLevelInt', type=int, default=DefaultPyramidLevelInt,
+						help='number of pyramid level below full resolution in pyramid mode, each level halves width and height' )
+	parser.add_argument( '--store', dest='storeDirectoryPathStr', type=str, default=None,
+						help='in streaming mode, append detection of every frame to columnar detection store in this directory' )
+	parser.add_argument( '--build-frame-cache', dest='frameCacheDirectoryPathStr', type=str, default=None,
+						help='decode every frame of stream source once into frame cache in this directory instead of detecting, '
+							 'the directory can then be given to --stream' )
+	parser.add_argument( '--frame-cache-type', dest='frameCacheTypeStr', choices=FrameTypeStrTuple, default='gray',
+						help='store grayscale frame or binary frame after thresholding in frame cache' )
+	parser.add_argument( '--binarization', dest='binarizationMethodStr', choices=BinarizationMethodStrTuple, default=None,
+						help='binarization method of single image mode and plain streaming mode, can not be used with --threaded, --incremental, '
+							 '--track, --roi nor --pyramid, default is fixed global threshold' )
+	parser.add_argument( '--threshold', dest='thresholdList', type=int, nargs='+', default=None,
+						help='threshold of global binarization, or fixed threshold of each level of multiLevel binarization' )
+	parser.add_argument( '--number-of-threshold', dest='numberOfThresholdInt', type=int, default=DefaultNumberOfThresholdInt,
+						help='number of threshold found from histogram of each frame in multiLevel binarization without --threshold' )
+	parser.add_argument( '--adaptive-block-size', dest='adaptiveBlockSizeInt', type=int, default=DefaultAdaptiveBlockSizeInt,
+						help='odd block size of adaptive binarization' )
+	parser.add_argument( '--adaptive-offset', dest='adaptiveOffsetList', type=int, nargs='+', default=None,
+						help='offset subtracted from local mean in adaptive binarization, one level per offset' )
+	parser.add_argument( '--headless', dest='isHeadless', action='store_true',
+						help='do not import matplotlib nor show figure in single image mode' )
+	parser.add_argument( '--no-save', dest='isImageSaved', action='store_false',
+						help='do not save result image in single image mode' )
+	parser.add_argument( '--layer', dest='enabledLayerNameList', action='append', choices=LayerNameTuple, default=None,
+						help='overlay layer to draw in single image mode, can be given more than once, default is all layer' )
+	parser.add_argument( '--combined-overlay', dest='isOverlayCombined', action='store_true',
+						help='draw all enabled overlay layer on one image in single image mode' )
+	parser.add_argument( '--image-format', dest='imageFormatStr', choices=ImageFormatToExtensionAndQualityFlagDict.keys(), default='jpg',
+						help='format of saved result image' )
+	parser.add_argument( '--image-quality', dest='imageQualityInt', type=int, default=None,
+						help='quality of jpg and webp, compression level of png' )
+	parser.add_argument( '--writer-thread', dest='numberOfWriterThread', type=int, default=2,
+						help='number of background thread to write result image' )
+	parser.add_argument( '--profile', dest='profilePathStr', type=str, default=None,
+						help='turn profiling on and write stage latency and counter of each frame to this JSON lines file' )
+	parser.add_argument( '--prometheus', dest='prometheusPathStr', type=str, default=None,
+						help='turn profiling on and write total stage latency and counter to this file in Prometheus text format' )
+	parser.add_argument( '--approximation-cache-mb', dest='approximationCacheMegabyteFloat', type=float, default=None,
+						help='turn shared polygon approximation cache across frame on with this memory budget' )
+	args = parser.parse_args()
+
+	# per frame profile record needs one frame at a time
+	if args.profilePathStr is not None and args.isThreaded:
+		parser.error( '--profile writes one record per frame and can not be used with --threaded where several frame are in flight, '
+					  'use --prometheus for total stage latency instead' )
+
+	# frame cache is built from stream source
+	if args.frameCacheDirectoryPathStr is not None and args.streamSourceStr is None:
+		parser.error( '--build-frame-cache needs --stream to give the source to decode' )
+
+	# streaming mode other than plain one always uses fixed global threshold
+	if args.binarizationMethodStr is not None and ( args.isThreaded or args.isIncremental or args.isTracked or args.isRegionOfInterest or args.isPyramid ):
+		parser.error( '--binarization is only supported in single image mode and plain streaming mode, '
+					  'it can not be used with --threaded, --incremental, --track, --roi nor --pyramid' )
+
+	# turn shared polygon approximation cache on
+	if args.approximationCacheMegabyteFloat is not None:
+		approximatedPolygonCache.enable( int( args.approximationCacheMegabyteFloat * 1024 * 1024 ) )
+
+	# turn profiling on
+	profileFile = open( args.profilePathStr, 'w' ) if args.profilePathStr is not None else None
+	if profileFile is not None or args.prometheusPathStr is not None:
+		profiler.enable( profileFile )
+
+	# pluggable binarization stage
+	binarizerObj = Binarizer( args.binarizationMethodStr, args.thresholdList, args.numberOfThresholdInt, args.adaptiveBlockSizeInt, args.adaptiveOffsetList ) \
+				   if args.binarizationMethodStr is not None else None
+
+	# decode stream source once into frame cache
+	if args.frameCacheDirectoryPathStr is not None:
+		numberOfFrame = buildFrameCache( iterateFrameFromSource( args.streamSourceStr ), args.frameCacheDirectoryPathStr, args.frameCacheTypeStr )
+		print( '[main] stored {} frame in frame cache {}'.format( numberOfFrame, args.frameCacheDirectoryPathStr ) )
+
+	# streaming mode
+	elif args.streamSourceStr is not None:
+		runStreaming( args.streamSourceStr, args.isThreaded, args.isIncremental, args.isTracked, args.isRegionOfInterest, args.scanIntervalInt, args.storeDirectoryPathStr, binarizerObj=binarizerObj,
+					  isPyramid=args.isPyramid, pyramidLevelInt=args.pyramidLevelInt )
+
+	# single image mode, result image is written in background
+	else:
+		with AsyncImageWriter( args.imageFormatStr, args.imageQualityInt, args.numberOfWriterThread ) as imageWriter:
+			runSingleImage( os.getcwd() + args.resultImageStoragePathStr, args.isHeadless, args.isImageSaved, args.enabledLayerNameList, args.isOverlayCombined, imageWriter, binarizerObj )
+
+	# stop thread pool of binarization stage
+	if binarizerObj is not None:
+		binarizerObj.close()
+
+	# report shared polygon approximation cache
+	if approximatedPolygonCache.isEnabled:
+		print( '[main] approximation cache: {}'.format( approximatedPolygonCache.getStatistic() ) )
+
+	# write profiling result
+	if profileFile is not None:
+		profileFile.close()
+	if args.prometheusPathStr is not None:
+		profiler.writePrometheusText( args.prometheusPathStr )
@@ -0,0 +1,150 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# array operation
+import numpy as np
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# all overlay layer in drawing order
+LayerNameTuple = ( 'contour in area range',
+				   'circle contour',
+				   'triangle contour',
+				   'square contour',
+				   'outer most circle contour',
+				   'outer most triangle contour',
+				   'outer most square contour' )
+
+# layer name to name of contour object list in contour storage
+LayerNameToContourObjListNameDict = { 'contour in area range' : 'contourObjInAreaRangeList',
+									  'circle contour' : 'circleContourObjList',
+									  'triangle contour' : 'triangleContourObjList',
+									  'square contour' : 'squareContourObjList',
+									  'outer most circle contour' : 'outerMostCircleContourObjList',
+									  'outer most triangle contour' : 'outerMostTriangleContourObjList',
+									  'outer most square contour' : 'outerMostSquareContourObjList' }
+
+# contour color of each layer when several layer are drawn on the same canvas
+LayerNameToCombinedColorTupleDict = { 'contour in area range' : ( 128, 128, 128 ),
+									  'circle contour' : ( 255, 0, 0 ),
+									  'triangle contour' : ( 0, 255, 255 ),
+									  'square contour' : ( 255, 0, 255 ),
+									  'outer most circle contour' : ( 0, 0, 255 ),
+									  'outer most triangle contour' : ( 0, 0, 255 ),
+									  'outer most square contour' : ( 0, 0, 255 ) }
+
+# contour color when only one layer is drawn on canvas
+SingleLayerColorTuple = ( 0, 0, 255 )
+
+class OverlayRenderer:
+	''' - draw contour overlay of contour storage on one reused canvas
+
+		- canvas is allocated once and the original image is copied into it before each render,
+		  so returned canvas is only valid until the next render
+
+		- without image writer only the canvas is held, with AsyncImageWriter each rendered layer is
+		  copied before it is queued, so up to queueSizeInt + numberOfWorker + 1 frame is held
+	'''
+
+	def __init__( self, image, contourStorageObj, enabledLayerNameList=None ):
+
+		# image to draw on
+		self.image = image
+
+		# contour storage to draw
+		self.contourStorageObj = contourStorageObj
+
+		# layer name to whether it is drawn, all layer is enabled by default
+		self.layerNameToEnabledDict = { layerNameStr : enabledLayerNameList is None or layerNameStr in enabledLayerNameList for layerNameStr in LayerNameTuple }
+
+		# reused canvas, allocated on first render
+		self.canvas = None
+
+	def setLayerEnabled( self, layerNameStr, isEnabled ):
+		''' - turn layer on or off
+		'''
+		assert layerNameStr in self.layerNameToEnabledDict, 'unknown layer {}'.format( layerNameStr )
+		self.layerNameToEnabledDict[ layerNameStr ] = isEnabled
+
+	@property
+	def enabledLayerNameList( self ):
+		''' - name of enabled layer in drawing order
+		'''
+		return [ layerNameStr for layerNameStr in LayerNameTuple if self.layerNameToEnabledDict[ layerNameStr ] ]
+
+	def _resetCanvas( self ):
+		''' - copy original image into canvas without allocating new buffer
+		'''
+
+		# canvas not allocated yet or image size changed
+		if self.canvas is None or self.canvas.shape != self.image.shape:
+			self.canvas = np.empty_like( self.image )
+
+		# copy original image into canvas
+		np.copyto( self.canvas, self.image )
+
+	def _drawLayer( self, layerNameStr, colorTuple ):
+		''' - draw contour of one layer on canvas, outer most layer also draws center point and coordinate frame
+		'''
+
+		# loop through each contour object of this layer
+		for contourObj in getattr( self.contourStorageObj, LayerNameToContourObjListNameDict[ layerNameStr ] ):
+
+			# draw contour
+			cv2.drawContours( self.canvas, [ contourObj.contour ], 0, colorTuple, 3 )
+
+			# only outer most contour has coordinate frame
+			if not layerNameStr.startswith( 'outer most' ):
+				continue
+
+			# draw center point of contour
+			cv2.circle( self.canvas, contourObj.centerPointTuple, 7, ( 255, 255, 255 ), -1 )
+
+			# draw x-axis line of coordinate frame
+			cv2.line( self.canvas, contourObj.centerPointTuple, contourObj.xAxisEndPointTuple, ( 0, 0, 255 ), 3 )
+
+			# draw y-axis line of coordinate frame
+			cv2.line( self.canvas, contourObj.centerPointTuple, contourObj.yAxisEndPointTuple, ( 0, 255, 0 ), 3 )
+
+	def renderLayer( self, layerNameStr ):
+		''' - draw only one layer on canvas
+
+			RETURN:
+				- canvas ( numpy array ) --> valid until the next render
+		'''
+
+		# start from original image
+		self._resetCanvas()
+
+		# draw layer
+		self._drawLayer( layerNameStr, SingleLayerColorTuple )
+
+		return self.canvas
+
+	def renderCombined( self ):
+		''' - draw all enabled layer on canvas, each layer has its own color
+
+			RETURN:
+				- canvas ( numpy array ) --> valid until the next render
+		'''
+
+		# start from original image
+		self._resetCanvas()
+
+		# loop through each enabled layer
+		for layerNameStr in self.enabledLayerNameList:
+
+			# draw layer
+			self._drawLayer( layerNameStr, LayerNameToCombinedColorTupleDict[ layerNameStr ] )
+
+		return self.canvas
@@ -0,0 +1,395 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# argument parser
+import argparse
+
+# read ground truth
+import json
+
+# write result table
+import csv
+
+import os
+
+# build parameter grid
+import itertools
+
+# pass fixed argument to worker
+import functools
+
+# run worker in parallel
+from concurrent.futures import ProcessPoolExecutor
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from contour_manipulation import ContourStorage, DefaultShapeRuleParameterDict
+
+from detection_pipeline import convertToBinaryImage, findContourTree, detectOuterMostContour, extractPoseList, FrameRateCounter, \
+							   BinaryThresholdInt, MinContourAreaInt, MaxContourAreaInt, DefaultOuterMostEpsilonPercentDict
+
+from frame_source import listImagePathInDir
+
+from frame_cache import FrameCache
+
+from synthetic_field import generateSyntheticField
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# parameter name to its default value, a grid gives one or more value for each of them
+DefaultParameterDict = { 'thresholdInt' : BinaryThresholdInt,
+						 'minArea' : MinContourAreaInt,
+						 'maxArea' : MaxContourAreaInt,
+						 'circleEpsilonPercent' : DefaultShapeRuleParameterDict[ 'circleEpsilonPercent' ],
+						 'triangleEpsilonPercent' : DefaultShapeRuleParameterDict[ 'triangleEpsilonPercent' ],
+						 'squareEpsilonPercent' : DefaultShapeRuleParameterDict[ 'squareEpsilonPercent' ],
+						 'circleErrorPercent' : DefaultShapeRuleParameterDict[ 'circleErrorPercent' ],
+						 'squareErrorPercent' : DefaultShapeRuleParameterDict[ 'squareErrorPercent' ],
+						 'outerMostCircleEpsilonPercent' : DefaultOuterMostEpsilonPercentDict[ 'circle' ],
+						 'outerMostTriangleEpsilonPercent' : DefaultOuterMostEpsilonPercentDict[ 'triangle' ],
+						 'outerMostSquareEpsilonPercent' : DefaultOuterMostEpsilonPercentDict[ 'square' ] }
+
+# detection is matched to ground truth marker of the same shape if its center is this close ( in pixel )
+DefaultCenterTolerancePixelFloat = 10.0
+
+# size of synthetic scene ( width, height, number of circle, number of triangle, number of square )
+SyntheticSceneTuple = ( 1538, 1226, 8, 8, 8 )
+
+# frame cache directory to opened frame cache, each worker process opens a cache once
+frameCacheDirToFrameCacheDict = dict()
+
+# column of result table after parameter column
+ResultColumnNameList = [ 'circleCount', 'triangleCount', 'squareCount', 'scoredImageCount', 'truePositive', 'falsePositive', 'falseNegative', 'precision', 'recall', 'f1' ]
+
+def expandParameterGrid( parameterNameToValueListDict ):
+	''' - every combination of parameter value, parameter which is not given keeps its default value
+
+		- combination is ordered by threshold first, so grid point sharing contour are next to each other
+
+		ARGS:
+			- parameterNameToValueListDict ( dict ) --> parameter name to list of value
+
+		RETURN:
+			- parameterDictList ( list )
+	'''
+
+	assert set( parameterNameToValueListDict ) <= set( DefaultParameterDict ), 'unknown parameter {}'.format( set( parameterNameToValueListDict ) - set( DefaultParameterDict ) )
+
+	# value list of every parameter, in the order of default parameter dict
+	valueListList = [ parameterNameToValueListDict.get( parameterNameStr ) or [ defaultValue ] for parameterNameStr, defaultValue in DefaultParameterDict.items() ]
+
+	return [ dict( zip( DefaultParameterDict, valueTuple ) ) for valueTuple in itertools.product( *valueListList ) ]
+
+def matchPoseList( poseList, groundTruthMarkerList, centerTolerancePixelFloat=DefaultCenterTolerancePixelFloat ):
+	''' - match detected pose to ground truth marker, closest pair of the same shape first
+
+		ARGS:
+			- poseList ( list ) --> detected pose
+			- groundTruthMarkerList ( list ) --> list of ( shapeTypeStr, centerPointTuple )
+
+		RETURN:
+			- ( truePositive, falsePositive, falseNegative ) ( tuple )
+	'''
+
+	# every pair of the same shape close enough, with its distance
+	candidatePairList = list()
+	for posePosition, poseDict in enumerate( poseList ):
+		for markerPosition, ( shapeTypeStr, centerPointTuple ) in enumerate( groundTruthMarkerList ):
+			if poseDict[ 'shapeTypeStr' ] != shapeTypeStr:
+				continue
+			distanceFloat = ( ( poseDict[ 'centerPointTuple' ][ 0 ] - centerPointTuple[ 0 ] ) ** 2 + ( poseDict[ 'centerPointTuple' ][ 1 ] - centerPointTuple[ 1 ] ) ** 2 ) ** 0.5
+			if distanceFloat <= centerTolerancePixelFloat:
+				candidatePairList.append( ( distanceFloat, posePosition, markerPosition ) )
+
+	# closest pair first, each pose and marker is matched once
+	matchedPosePositionSet = set()
+	matchedMarkerPositionSet = set()
+	for _, posePosition, markerPosition in sorted( candidatePairList ):
+		if posePosition not in matchedPosePositionSet and markerPosition not in matchedMarkerPositionSet:
+			matchedPosePositionSet.add( posePosition )
+			matchedMarkerPositionSet.add( markerPosition )
+
+	truePositive = len( matchedPosePositionSet )
+	return truePositive, len( poseList ) - truePositive, len( groundTruthMarkerList ) - truePositive
+
+def readSweepImage( imageSourceObj ):
+	''' - read image of sweep, image file, frame of frame cache or synthetic scene
+
+		- frame of frame cache is a zero copy grayscale or binary view, nothing is decoded
+
+		ARGS:
+			- imageSourceObj ( str, tuple or int ) --> image path, ( frame cache directory, position in cache ), or seed of synthetic scene
+
+		RETURN:
+			- ( image, groundTruthMarkerList ) ( tuple ) --> ground truth is None for image file and frame cache, image is None if it can not be read
+	'''
+
+	# image file
+	if isinstance( imageSourceObj, str ):
+		return cv2.imread( imageSourceObj ), None
+
+	# frame of frame cache
+	if isinstance( imageSourceObj, tuple ):
+		frameCacheDirStr, position = imageSourceObj
+		if frameCacheDirStr not in frameCacheDirToFrameCacheDict:
+			frameCacheDirToFrameCacheDict[ frameCacheDirStr ] = FrameCache( frameCacheDirStr )
+		return frameCacheDirToFrameCacheDict[ frameCacheDirStr ].getFrame( position )[ 1 ], None
+
+	# synthetic scene, ground truth is every drawn outer marker
+	image, markerList = generateSyntheticField( *SyntheticSceneTuple, seedInt=imageSourceObj )
+	return image, [ ( shapeTypeStr, centerPointTuple ) for shapeTypeStr, centerPointTuple, _ in markerList ]
+
+def sweepImage( imageSourceAndGroundTruthTuple, parameterDictList, centerTolerancePixelFloat=DefaultCenterTolerancePixelFloat ):
+	''' - worker function, detect pose on one image with every grid point
+
+		- image is read and converted to grayscale once, findContours runs once per threshold, and contour object
+		  with its approximated polygon is kept across grid point of the same threshold, so approxPolyDP runs
+		  once per epsilon and is shared by every area range, error percent and outer most epsilon
+
+		ARGS:
+			- imageSourceAndGroundTruthTuple ( tuple ) --> ( image source, ground truth marker list or None )
+			- parameterDictList ( list ) --> grid point
+
+		RETURN:
+			- resultList ( list ) --> one dict per grid point, None if image can not be read
+	'''
+
+	imageSourceObj, groundTruthMarkerList = imageSourceAndGroundTruthTuple
+
+	# read image
+	image, syntheticGroundTruthMarkerList = readSweepImage( imageSourceObj )
+	if image is None:
+		return None
+	groundTruthMarkerList = groundTruthMarkerList if groundTruthMarkerList is not None else syntheticGroundTruthMarkerList
+
+	# convert to grayscale once
+	grayScaleImage = image if image.ndim == 2 else cv2.cvtColor( image, cv2.COLOR_BGR2GRAY )
+
+	# contour storage of each threshold
+	thresholdToContourStorageDict = dict()
+
+	# result of each grid point
+	resultList = list()
+
+	# loop through each grid point
+	for parameterDict in parameterDictList:
+
+		# find contour once per threshold, grid point is ordered by threshold so only one storage is kept
+		if parameterDict[ 'thresholdInt' ] not in thresholdToContourStorageDict:
+			thresholdToContourStorageDict.clear()
+			thresholdToContourStorageDict[ parameterDict[ 'thresholdInt' ] ] = ContourStorage( *findContourTree( convertToBinaryImage( grayScaleImage, parameterDict[ 'thresholdInt' ] ) ) )
+		contourStorageObj = thresholdToContourStorageDict[ parameterDict[ 'thresholdInt' ] ]
+
+		# detect with this grid point
+		contourStorageObj.resetClassification()
+		detectOuterMostContour( contourStorageObj, parameterDict[ 'minArea' ], parameterDict[ 'maxArea' ],
+								shapeRuleParameterDict={ parameterNameStr : parameterDict[ parameterNameStr ] for parameterNameStr in DefaultShapeRuleParameterDict },
+								outerMostEpsilonPercentDict={ 'circle' : parameterDict[ 'outerMostCircleEpsilonPercent' ],
+															  'triangle' : parameterDict[ 'outerMostTriangleEpsilonPercent' ],
+															  'square' : parameterDict[ 'outerMostSquareEpsilonPercent' ] } )
+		poseList = extractPoseList( contourStorageObj )
+
+		# count detection and match it to ground truth
+		resultDict = { 'circleCount' : len( contourStorageObj.outerMostCircleContourObjList ),
+					   'triangleCount' : len( contourStorageObj.outerMostTriangleContourObjList ),
+					   'squareCount' : len( contourStorageObj.outerMostSquareContourObjList ) }
+		if groundTruthMarkerList is not None:
+			resultDict[ 'truePositive' ], resultDict[ 'falsePositive' ], resultDict[ 'falseNegative' ] = matchPoseList( poseList, groundTruthMarkerList, centerTolerancePixelFloat )
+
+		resultList.append( resultDict )
+
+	return resultList
+
+def loadGroundTruth( groundTruthPathStr ):
+	''' - read ground truth from JSON lines file in the same format as batch_runner output
+
+		RETURN:
+			- imagePathToGroundTruthMarkerListDict ( dict ) --> image path to list of ( shapeTypeStr, centerPointTuple )
+	'''
+
+	# image path to marker list
+	imagePathToGroundTruthMarkerListDict = dict()
+
+	with open( groundTruthPathStr ) as groundTruthFile:
+
+		# loop through each image
+		for lineStr in groundTruthFile:
+			resultDict = json.loads( lineStr )
+			if resultDict[ 'poseList' ] is None:
+				continue
+			imagePathToGroundTruthMarkerListDict[ os.path.normpath( resultDict[ 'imagePathStr' ] ) ] = [ ( poseDict[ 'shapeTypeStr' ], tuple( poseDict[ 'centerPointTuple' ] ) ) for poseDict in resultDict[ 'poseList' ] ]
+
+	return imagePathToGroundTruthMarkerListDict
+
+def listFrameCacheSource( frameCacheDirStr ):
+	''' - sweep source of every frame in frame cache
+
+		- binary frame cache is already thresholded, so sweeping thresholdInt on it changes nothing
+
+		RETURN:
+			- imageSourceList ( list ) --> list of ( frame cache directory, position in cache )
+	'''
+	return [ ( frameCacheDirStr, position ) for position in range( len( FrameCache( frameCacheDirStr ) ) ) ]
+
+def runParameterSweep( imageSourceList, parameterNameToValueListDict, outputPathStr=None, imagePathToGroundTruthMarkerListDict=None,
+					   centerTolerancePixelFloat=DefaultCenterTolerancePixelFloat, numberOfWorker=None ):
+	''' - evaluate every grid point on every image using one worker process per core and build result table
+
+		- each worker takes a whole image so decode and contour of that image are shared by every grid point
+
+		- accuracy is measured only over image with ground truth, scoredImageCount tells how many image it is,
+		  accuracy column is None if no image has ground truth
+
+		ARGS:
+			- imageSourceList ( list ) --> image path, ( frame cache directory, position in cache ) or seed of synthetic scene, see listFrameCacheSource
+			- parameterNameToValueListDict ( dict ) --> parameter name to list of value, see DefaultParameterDict
+			- outputPathStr ( str ) --> CSV file to write result table, optional
+			- imagePathToGroundTruthMarkerListDict ( dict ) --> ground truth of image file, optional
+			- numberOfWorker ( int ) --> None means number of cpu core
+
+		RETURN:
+			- resultRowList ( list ) --> one dict per grid point with parameter and result column
+	'''
+
+	# every grid point
+	parameterDictList = expandParameterGrid( parameterNameToValueListDict )
+
+	# ground truth of each image, synthetic scene makes its own
+	imagePathToGroundTruthMarkerListDict = imagePathToGroundTruthMarkerListDict or dict()
+	imageSourceAndGroundTruthTupleList = [ ( imageSourceObj, imagePathToGroundTruthMarkerListDict.get( os.path.normpath( imageSourceObj ) ) if isinstance( imageSourceObj, str ) else None )
+										   for imageSourceObj in imageSourceList ]
+
+	# summed result of each grid point
+	resultRowList = [ dict( parameterDict, circleCount=0, triangleCount=0, squareCount=0, truePositive=0, falsePositive=0, falseNegative=0 ) for parameterDict in parameterDictList ]
+
+	# number of image with ground truth, accuracy is summed over them only
+	numberOfScoredImageInt = 0
+
+	# frame rate counter
+	frameRateCounter = FrameRateCounter()
+
+	# one worker per core
+	numberOfWorker = numberOfWorker or os.cpu_count()
+
+	with ProcessPoolExecutor( max_workers=numberOfWorker ) as executor:
+
+		# loop through result of each image
+		for resultList in executor.map( functools.partial( sweepImage, parameterDictList=parameterDictList, centerTolerancePixelFloat=centerTolerancePixelFloat ), imageSourceAndGroundTruthTupleList ):
+
+			# this image can not be read
+			if resultList is None:
+				continue
+
+			# add result of each grid point
+			for resultRowDict, resultDict in zip( resultRowList, resultList ):
+				for columnNameStr, value in resultDict.items():
+					resultRowDict[ columnNameStr ] += value
+			numberOfScoredImageInt += 'truePositive' in resultList[ 0 ]
+
+			# count processed image
+			frameRateCounter.tick()
+
+	# precision, recall and f1 of each grid point over image with ground truth, unknown if there is none
+	for resultRowDict in resultRowList:
+		resultRowDict[ 'scoredImageCount' ] = numberOfScoredImageInt
+		if numberOfScoredImageInt == 0:
+			for columnNameStr in ( 'truePositive', 'falsePositive', 'falseNegative', 'precision', 'recall', 'f1' ):
+				resultRowDict[ columnNameStr ] = None
+			continue
+		truePositive, falsePositive, falseNegative = resultRowDict[ 'truePositive' ], resultRowDict[ 'falsePositive' ], resultRowDict[ 'falseNegative' ]
+		resultRowDict[ 'precision' ] = truePositive / ( truePositive + falsePositive ) if truePositive + falsePositive > 0 else 0.0
+		resultRowDict[ 'recall' ] = truePositive / ( truePositive + falseNegative ) if truePositive + falseNegative > 0 else 0.0
+		resultRowDict[ 'f1' ] = 2 * truePositive / ( 2 * truePositive + falsePositive + falseNegative ) if truePositive > 0 else 0.0
+
+	print( '[runParameterSweep] evaluated {} grid point on {} image with {} worker in {:.2f} s'.format( len( parameterDictList ), frameRateCounter.numberOfFrame, numberOfWorker, frameRateCounter.elapsedTimeFloat ) )
+
+	# accuracy does not cover every image
+	if numberOfScoredImageInt < frameRateCounter.numberOfFrame:
+		print( '[runParameterSweep] accuracy is measured on {} of {} image, other image has no ground truth'.format( numberOfScoredImageInt, frameRateCounter.numberOfFrame ) )
+
+	# write result table
+	if outputPathStr is not None:
+		with open( outputPathStr, 'w', newline='' ) as outputFile:
+			csvWriter = csv.DictWriter( outputFile, fieldnames=list( DefaultParameterDict ) + ResultColumnNameList )
+			csvWriter.writeheader()
+			csvWriter.writerows( resultRowList )
+
+	return resultRowList
+
+def printResultTable( resultRowList, numberOfRowInt=20 ):
+	''' - print best grid point, by f1 if accuracy is known otherwise by number of detection
+
+		- only parameter which differs between grid point is printed
+	'''
+
+	# nothing to print
+	if not resultRowList:
+		return
+
+	# parameter which is swept
+	sweptParameterNameList = [ parameterNameStr for parameterNameStr in DefaultParameterDict if len( { resultRowDict[ parameterNameStr ] for resultRowDict in resultRowList } ) > 1 ]
+	columnNameList = sweptParameterNameList + ResultColumnNameList
+
+	# best grid point first
+	if resultRowList[ 0 ][ 'f1' ] is not None:
+		sortedResultRowList = sorted( resultRowList, key=lambda resultRowDict: resultRowDict[ 'f1' ], reverse=True )
+	else:
+		sortedResultRowList = sorted( resultRowList, key=lambda resultRowDict: resultRowDict[ 'circleCount' ] + resultRowDict[ 'triangleCount' ] + resultRowDict[ 'squareCount' ], reverse=True )
+
+	# width of each column fits its name
+	columnWidthList = [ max( len( columnNameStr ), 8 ) for columnNameStr in columnNameList ]
+
+	# print header and each row
+	print( ' '.join( columnNameStr.rjust( columnWidthInt ) for columnNameStr, columnWidthInt in zip( columnNameList, columnWidthList ) ) )
+	for resultRowDict in sortedResultRowList[ : numberOfRowInt ]:
+		print( ' '.join( ( '{:.3f}'.format( resultRowDict[ columnNameStr ] ) if isinstance( resultRowDict[ columnNameStr ], float ) else str( resultRowDict[ columnNameStr ] ) ).rjust( columnWidthInt )
+						 for columnNameStr, columnWidthInt in zip( columnNameList, columnWidthList ) ) )
+
+if __name__ == '__main__':
+
+	# argument parser
+	parser = argparse.ArgumentParser()
+	parser.add_argument( '--image-dir', dest='imageDirStr', type=str, default=None,
+						help='directory of field image to sweep on' )
+	parser.add_argument( '--frame-cache', dest='frameCacheDirStr', type=str, default=None,
+						help='frame cache directory built by main.py --build-frame-cache to sweep on' )
+	parser.add_argument( '--synthetic', dest='numberOfSyntheticScene', type=int, default=0,
+						help='number of synthetic scene with known marker to sweep on' )
+	parser.add_argument( '--ground-truth', dest='groundTruthPathStr', type=str, default=None,
+						help='JSON lines file with pose of each image in batch_runner format, used to measure accuracy of image file' )
+	parser.add_argument( '--output', dest='outputPathStr', type=str, default=None,
+						help='path of CSV file to write result table' )
+	parser.add_argument( '--worker', dest='numberOfWorker', type=int, default=None,
+						help='number of worker process, default is number of cpu core' )
+	parser.add_argument( '--center-tolerance', dest='centerTolerancePixelFloat', type=float, default=DefaultCenterTolerancePixelFloat,
+						help='largest center distance in pixel to match detection to ground truth' )
+
+	# one option per parameter, each takes one or more value
+	for parameterNameStr, defaultValue in DefaultParameterDict.items():
+		parser.add_argument( '--' + parameterNameStr, dest=parameterNameStr, type=type( defaultValue ), nargs='+', default=None,
+							help='value of {} to sweep, default is {}'.format( parameterNameStr, defaultValue ) )
+	args = parser.parse_args()
+
+	# image to sweep on
+	imageSourceList = ( listImagePathInDir( args.imageDirStr ) if args.imageDirStr is not None else list() ) + \
+					  ( listFrameCacheSource( args.frameCacheDirStr ) if args.frameCacheDirStr is not None else list() ) + list( range( args.numberOfSyntheticScene ) )
+
+	# run sweep and print best grid point
+	resultRowList = runParameterSweep( imageSourceList, { parameterNameStr : getattr( args, parameterNameStr ) for parameterNameStr in DefaultParameterDict if getattr( args, parameterNameStr ) is not None },
+									   args.outputPathStr, loadGroundTruth( args.groundTruthPathStr ) if args.groundTruthPathStr is not None else None,
+									   args.centerTolerancePixelFloat, args.numberOfWorker )
+	printResultTable( resultRowList )
@@ -0,0 +1,218 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import convertToBinaryImage, createContourStorage, extractPoseListFromContourObj, MinContourAreaInt, MaxContourAreaInt
+
+from roi_pipeline import padBoundingBox, mergeOverlappingRegion, detectOuterMostContourInRegionOfInterest, DefaultMinPaddingInt
+
+from instrumentation import profiler
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# number of pyramid level below full resolution, each level halves width and height
+DefaultPyramidLevelInt = 1
+
+# area range at coarse level is widened by this ratio, so marker near the area limit is decided at full resolution
+CoarseAreaSlackRatioFloat = 0.2
+
+# padding around coarse detection, ratio of its bounding box size, enough for edge moved by downscaling
+DefaultPyramidPaddingRatioFloat = 0.1
+
+class PyramidDetector:
+	''' - coarse to fine detection, find marker on downscaled pyramid level and refine it at full resolution
+
+		- threshold and findContours of the whole frame run on pyramid level where image is 4 ** pyramidLevelInt
+		  times smaller, area range is scaled by the same factor
+
+		- padded bounding box of every outer most contour in area range found at coarse level, whatever its shape,
+		  is then processed at full resolution where shape is classified, so a marker whose polygon has a different
+		  number of vertex after downscaling is still found, and center point and axis end point are as precise
+		  as full frame detection
+
+		- marker which is missed at coarse level, e.g. its area falls out of widened area range after downscaling,
+		  is not found at full resolution either
+
+		- it pays off when marker covers a small part of frame, e.g. high resolution frame with few marker
+	'''
+
+	def __init__( self, pyramidLevelInt=DefaultPyramidLevelInt, minArea=MinContourAreaInt, maxArea=MaxContourAreaInt,
+				  paddingRatioFloat=DefaultPyramidPaddingRatioFloat, minPaddingInt=DefaultMinPaddingInt ):
+
+		assert pyramidLevelInt >= 0, 'pyramid level must not be negative but got {}'.format( pyramidLevelInt )
+
+		# number of pyramid level below full resolution
+		self.pyramidLevelInt = pyramidLevelInt
+
+		# area range of contour of interest at full resolution
+		self.minArea = minArea
+		self.maxArea = maxArea
+
+		# padding around coarse detection at full resolution
+		self.paddingRatioFloat = paddingRatioFloat
+		self.minPaddingInt = minPaddingInt
+
+		# statistic of latest frame
+		self.latestCoarseContourObjList = list()
+		self.latestRegionOfInterestList = list()
+		self.latestImageAreaInt = 0
+
+	@property
+	def scaleInt( self ):
+		''' - size ratio of full resolution to coarse level
+		'''
+		return 2 ** self.pyramidLevelInt
+
+	def _buildCoarseImage( self, image ):
+		''' - downscale BGR or gray scale image to coarse pyramid level in gray scale
+
+			- first level halves BGR image by linear interpolation, which averages each 2x2 block at exactly half size,
+			  so full frame is never converted to grayscale, next level is gaussian pyramid of gray scale image
+
+			RETURN:
+				- coarseImage ( numpy array )
+		'''
+
+		# first level, average of each 2x2 block
+		coarseImage = cv2.resize( image, ( image.shape[ 1 ] // 2, image.shape[ 0 ] // 2 ), interpolation=cv2.INTER_LINEAR )
+
+		# converting image into grayscale image if it is not
+		if coarseImage.ndim == 3:
+			coarseImage = cv2.cvtColor( coarseImage, cv2.COLOR_BGR2GRAY )
+
+		# next level, one at a time
+		for _ in range( self.pyramidLevelInt - 1 ):
+			coarseImage = cv2.pyrDown( coarseImage )
+
+		return coarseImage
+
+	def _detectCoarseContourObj( self, coarseImage ):
+		''' - find outer most contour in area range at coarse level, shape is not classified
+
+			- area range is scaled by 4 ** pyramidLevelInt and widened by CoarseAreaSlackRatioFloat
+
+			RETURN:
+				- coarseContourObjList ( list ) --> contour is in coarse level coordinate
+		'''
+
+		# area at coarse level is smaller by square of scale
+		areaScaleInt = self.scaleInt ** 2
+		coarseMinArea = self.minArea / areaScaleInt * ( 1 - CoarseAreaSlackRatioFloat )
+		coarseMaxArea = self.maxArea / areaScaleInt * ( 1 + CoarseAreaSlackRatioFloat )
+
+		# find contour at coarse level
+		contourStorageObj = createContourStorage( convertToBinaryImage( coarseImage ) )
+
+		# contour in area range, only its bounding box is needed so it is not classified
+		with profiler.measureStage( 'filterContoursOnlyInAreaRange' ):
+			contourObjInAreaRangeList = contourStorageObj.filterContoursOnlyInAreaRange( coarseMinArea, coarseMaxArea )
+
+		# contour nested in another one is inside its region anyway
+		return contourStorageObj.filterOnlyOuterMostContourObjByHierarchy( contourObjInAreaRangeList )
+
+	def _findRegionOfInterestList( self, coarseContourObjList, imageSizeTuple ):
+		''' - padded bounding box of every coarse detection at full resolution, overlapping box is merged
+
+			RETURN:
+				- regionOfInterestList ( list )
+		'''
+
+		# bounding box of each coarse detection at full resolution, one coarse pixel covers scale full resolution pixel
+		paddedBoundingBoxList = list()
+		for contourObj in coarseContourObjList:
+			( xPosition, yPosition, boxWidth, boxHeight ) = cv2.boundingRect( contourObj.contour )
+			paddedBoundingBoxList.append( padBoundingBox( ( xPosition * self.scaleInt, yPosition * self.scaleInt, boxWidth * self.scaleInt, boxHeight * self.scaleInt ),
+														  imageSizeTuple, self.paddingRatioFloat, self.minPaddingInt ) )
+
+		return mergeOverlappingRegion( paddedBoundingBoxList )
+
+	def processFrame( self, image ):
+		''' - detect outer most contour at coarse level, then refine it at full resolution
+
+			RETURN:
+				- outerMostContourObjList ( list ) --> contour is in full resolution coordinate
+		'''
+
+		# no pyramid level, full frame detection
+		if self.pyramidLevelInt == 0:
+			self.latestCoarseContourObjList = list()
+			self.latestRegionOfInterestList = [ ( 0, 0, image.shape[ 1 ], image.shape[ 0 ] ) ]
+			self.latestImageAreaInt = image.shape[ 0 ] * image.shape[ 1 ]
+			return detectOuterMostContourInRegionOfInterest( image, self.latestRegionOfInterestList, self.minArea, self.maxArea )
+
+		# downscale to coarse level
+		with profiler.measureStage( 'buildPyramid' ):
+			coarseImage = self._buildCoarseImage( image )
+
+		# detect at coarse level
+		coarseContourObjList = self._detectCoarseContourObj( coarseImage )
+		profiler.addCount( 'coarseContour', len( coarseContourObjList ) )
+
+		# region around coarse detection at full resolution
+		with profiler.measureStage( 'findRegionOfInterest' ):
+			regionOfInterestList = self._findRegionOfInterestList( coarseContourObjList, ( image.shape[ 1 ], image.shape[ 0 ] ) )
+		profiler.addCount( 'regionOfInterest', len( regionOfInterestList ) )
+
+		# keep statistic
+		self.latestCoarseContourObjList = coarseContourObjList
+		self.latestRegionOfInterestList = regionOfInterestList
+		self.latestImageAreaInt = image.shape[ 0 ] * image.shape[ 1 ]
+
+		# refine in every region at full resolution, only region is converted to grayscale
+		return detectOuterMostContourInRegionOfInterest( image, regionOfInterestList, self.minArea, self.maxArea )
+
+	def getStatistic( self ):
+		''' - number of coarse detection and region of interest of latest frame
+
+			RETURN:
+				- statisticDict ( dict )
+		'''
+
+		# ratio of image area processed at full resolution in latest frame
+		regionOfInterestAreaInt = sum( regionWidth * regionHeight for _, _, regionWidth, regionHeight in self.latestRegionOfInterestList )
+
+		return { 'pyramidLevel' : self.pyramidLevelInt,
+				 'numberOfCoarseContour' : len( self.latestCoarseContourObjList ),
+				 'regionOfInterestList' : self.latestRegionOfInterestList,
+				 'regionOfInterestAreaRatioFloat' : regionOfInterestAreaInt / self.latestImageAreaInt if self.latestImageAreaInt > 0 else 0.0 }
+
+def streamPoseFromFramePyramid( frameIterator, pyramidDetectorObj=None ):
+	''' - generator pipeline like streamPoseFromFrame, but whole frame is processed at coarse pyramid level
+		  and only region around coarse detection at full resolution
+
+		ARGS:
+			- frameIterator ( iterator ) --> yield ( frameIndex, frame )
+			- pyramidDetectorObj ( PyramidDetector ) --> new detector with default setting if not given
+
+		YIELD:
+			- ( frameIndex, poseList ) ( tuple )
+	'''
+
+	# coarse to fine detector
+	if pyramidDetectorObj is None:
+		pyramidDetectorObj = PyramidDetector()
+
+	# loop through each frame
+	for frameIndex, frame in frameIterator:
+
+		# detect pose in this frame
+		profiler.beginFrame( frameIndex )
+		poseList = extractPoseListFromContourObj( pyramidDetectorObj.processFrame( frame ) )
+		profiler.endFrame()
+
+		yield frameIndex, poseList
@@ -0,0 +1,366 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# array operation
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from contour_manipulation import ContourStorage
+
+from detection_pipeline import convertToBinaryImage, createContourStorage, detectOuterMostContour, extractPoseListFromContourObj, MinContourAreaInt, MaxContourAreaInt
+
+from spatial_index import isBoundingBoxOverlapping, mergeBoundingBox
+
+from instrumentation import profiler
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# number of frame between full frame scan
+DefaultScanIntervalInt = 30
+
+# padding around previous detection, ratio of its bounding box size, enough for shape moving between frame
+DefaultPaddingRatioFloat = 0.5
+
+# padding is never smaller than this ( in pixel )
+DefaultMinPaddingInt = 16
+
+def padBoundingBox( boundingBoxTuple, imageSizeTuple, paddingRatioFloat=DefaultPaddingRatioFloat, minPaddingInt=DefaultMinPaddingInt ):
+	''' - pad bounding box ( x, y, width, height ) by ratio of its size, clipped to image
+
+		ARGS:
+			- boundingBoxTuple ( tuple )
+			- imageSizeTuple ( tuple ) --> ( width, height )
+
+		RETURN:
+			- regionOfInterestTuple ( tuple )
+	'''
+
+	( xPosition, yPosition, boxWidth, boxHeight ) = boundingBoxTuple
+
+	# padding of this bounding box
+	paddingInt = max( minPaddingInt, int( paddingRatioFloat * max( boxWidth, boxHeight ) ) )
+
+	# pad, clip to image
+	paddedXPosition, paddedYPosition = max( xPosition - paddingInt, 0 ), max( yPosition - paddingInt, 0 )
+	return ( paddedXPosition, paddedYPosition,
+			 min( xPosition + boxWidth + paddingInt, imageSizeTuple[ 0 ] ) - paddedXPosition,
+			 min( yPosition + boxHeight + paddingInt, imageSizeTuple[ 1 ] ) - paddedYPosition )
+
+def mergeOverlappingRegion( regionOfInterestList ):
+	''' - merge region until nothing overlaps
+
+		RETURN:
+			- mergedRegionOfInterestList ( list )
+	'''
+
+	# merge region until nothing overlaps
+	regionOfInterestList = list( regionOfInterestList )
+	isChanged = True
+	while isChanged:
+		isChanged = False
+		mergedRegionOfInterestList = list()
+		for regionOfInterestTuple in regionOfInterestList:
+			for mergedPosition, mergedRegionOfInterestTuple in enumerate( mergedRegionOfInterestList ):
+				if isBoundingBoxOverlapping( regionOfInterestTuple, mergedRegionOfInterestTuple ):
+					mergedRegionOfInterestList[ mergedPosition ] = mergeBoundingBox( regionOfInterestTuple, mergedRegionOfInterestTuple )
+					isChanged = True
+					break
+			else:
+				mergedRegionOfInterestList.append( regionOfInterestTuple )
+		regionOfInterestList = mergedRegionOfInterestList
+
+	return regionOfInterestList
+
+def findContourInRegionOfInterest( image, regionOfInterestTuple, isBinaryImage=False ):
+	''' - threshold and find contour in one region of interest
+
+		- contour touching region border which is not image border is cut by the region
+
+		ARGS:
+			- image ( numpy array ) --> frame, or binary image of frame if isBinaryImage
+			- regionOfInterestTuple ( tuple ) --> ( x, y, width, height )
+			- isBinaryImage ( bool ) --> image is already binarized, region is not thresholded again
+
+		RETURN:
+			- ( contourList, hierarchy, cutContourIndexList ) ( tuple ) --> contour is in full frame coordinate
+	'''
+
+	( xPosition, yPosition, regionWidth, regionHeight ) = regionOfInterestTuple
+	imageHeightInt, imageWidthInt = image.shape[ : 2 ]
+
+	# threshold only the cropped region
+	binaryImage = image[ yPosition : yPosition + regionHeight, xPosition : xPosition + regionWidth ]
+	if not isBinaryImage:
+		binaryImage = convertToBinaryImage( binaryImage )
+
+	# find contour in region, offset gives full frame coordinate
+	with profiler.measureStage( 'findContours' ):
+		contourList, hierarchy = cv2.findContours( binaryImage, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE, offset=( xPosition, yPosition ) )
+
+	# contour touching a region border which is not an image border
+	cutContourIndexList = list()
+	for contourIndex, contour in enumerate( contourList ):
+		( contourX, contourY, contourWidth, contourHeight ) = cv2.boundingRect( contour )
+		if ( contourX == xPosition and xPosition > 0 ) or ( contourY == yPosition and yPosition > 0 ) or \
+		   ( contourX + contourWidth == xPosition + regionWidth and xPosition + regionWidth < imageWidthInt ) or \
+		   ( contourY + contourHeight == yPosition + regionHeight and yPosition + regionHeight < imageHeightInt ):
+			cutContourIndexList.append( contourIndex )
+
+	return list( contourList ), hierarchy, cutContourIndexList
+
+def createContourStorageInRegionOfInterest( image, regionOfInterestList, isBinaryImage=False ):
+	''' - find contour in every region of interest and join contour tree of all region into one contour storage
+
+		- region must not overlap, so shape classification can run once per frame instead of once per region
+
+		ARGS:
+			- image ( numpy array ) --> frame, or binary image of frame if isBinaryImage
+			- regionOfInterestList ( list ) --> list of ( x, y, width, height )
+			- isBinaryImage ( bool ) --> image is already binarized
+
+		RETURN:
+			- ( contourStorageObj, cutContourIndexList ) ( tuple ) --> contour storage is None if no region has contour,
+				cut contour never passes area filter of the storage
+	'''
+
+	# contour, hierarchy and cut contour of all region
+	allContourList = list()
+	hierarchyList = list()
+	allCutContourIndexList = list()
+
+	# loop through each region
+	for regionOfInterestTuple in regionOfInterestList:
+
+		# find contour in region
+		contourList, hierarchy, cutContourIndexList = findContourInRegionOfInterest( image, regionOfInterestTuple, isBinaryImage )
+
+		# no contour in region
+		if not contourList:
+			continue
+
+		# shift index in hierarchy and cut contour list by number of contour already stored, -1 stays -1
+		indexOffsetInt = len( allContourList )
+		hierarchyList.append( np.where( hierarchy >= 0, hierarchy + indexOffsetInt, hierarchy ) )
+		allCutContourIndexList.extend( contourIndex + indexOffsetInt for contourIndex in cutContourIndexList )
+		allContourList.extend( contourList )
+
+	# no contour in any region
+	if not allContourList:
+		return None, allCutContourIndexList
+
+	# cut contour never passes area filter
+	contourStorageObj = ContourStorage( allContourList, np.concatenate( hierarchyList, axis=1 ) )
+	contourStorageObj.excludeContourFromAreaFilter( allCutContourIndexList )
+
+	return contourStorageObj, allCutContourIndexList
+
+def detectOuterMostContourInRegionOfInterest( image, regionOfInterestList, minArea=MinContourAreaInt, maxArea=MaxContourAreaInt ):
+	''' - find contour in every region of interest, then detect outer most contour of all region at once
+
+		RETURN:
+			- outerMostContourObjList ( list ) --> contour is in full frame coordinate
+	'''
+
+	# contour of all region in one contour storage
+	contourStorageObj, _ = createContourStorageInRegionOfInterest( image, regionOfInterestList )
+
+	# no contour in any region
+	if contourStorageObj is None:
+		return list()
+
+	# detect outer most contour
+	detectOuterMostContour( contourStorageObj, minArea, maxArea )
+
+	return contourStorageObj.outerMostCircleContourObjList + \
+		   contourStorageObj.outerMostTriangleContourObjList + \
+		   contourStorageObj.outerMostSquareContourObjList
+
+class RegionOfInterestDetector:
+	''' - detect outer most contour only in region of interest around previous detection
+
+		- after a full frame scan, threshold, findContours and shape classification run only in padded
+		  bounding box of outer most contour found in previous frame, so cost depends on number and size
+		  of marker instead of image size
+
+		- contour cut by border of region of interest is ignored, overlapping region is merged first,
+		  contour of every region is classified together in one contour storage
+
+		- whole frame is scanned again every scanIntervalInt frame, or right away when a previous detection
+		  is not found again in its region, e.g. shape moved too fast or was covered. New shape outside every
+		  region is only found by the next full frame scan
+	'''
+
+	def __init__( self, scanIntervalInt=DefaultScanIntervalInt, paddingRatioFloat=DefaultPaddingRatioFloat, minPaddingInt=DefaultMinPaddingInt,
+				  minArea=MinContourAreaInt, maxArea=MaxContourAreaInt ):
+
+		# number of frame between full frame scan
+		self.scanIntervalInt = scanIntervalInt
+
+		# padding around previous detection
+		self.paddingRatioFloat = paddingRatioFloat
+		self.minPaddingInt = minPaddingInt
+
+		# area range of contour of interest
+		self.minArea = minArea
+		self.maxArea = maxArea
+
+		# size of current frame ( width, height )
+		self.imageSizeTuple = None
+
+		# outer most contour object of current frame, all shape
+		self.outerMostContourObjList = list()
+
+		# number of frame since latest full frame scan
+		self.numberOfFrameSinceScanInt = 0
+
+		# statistic
+		self.numberOfFrameInt = 0
+		self.numberOfFullScanInt = 0
+		self.numberOfLostScanInt = 0
+		self.latestRegionOfInterestList = list()
+		self.isLatestFrameFull = False
+
+	def _processFullFrame( self, image ):
+		''' - detect outer most contour on the whole frame
+		'''
+
+		# full detection
+		contourStorageObj = detectOuterMostContour( createContourStorage( convertToBinaryImage( image ) ), self.minArea, self.maxArea )
+
+		# replace state
+		self.outerMostContourObjList = contourStorageObj.outerMostCircleContourObjList + \
+									   contourStorageObj.outerMostTriangleContourObjList + \
+									   contourStorageObj.outerMostSquareContourObjList
+		self.numberOfFrameSinceScanInt = 0
+		self.numberOfFullScanInt += 1
+		self.latestRegionOfInterestList = [ ( 0, 0, self.imageSizeTuple[ 0 ], self.imageSizeTuple[ 1 ] ) ]
+		self.isLatestFrameFull = True
+
+	def _findRegionOfInterestList( self ):
+		''' - padded bounding box of every previous detection, overlapping box is merged
+
+			RETURN:
+				- ( regionOfInterestList, paddedBoundingBoxList ) ( tuple ) --> padded bounding box is in the same order as previous detection
+		'''
+
+		# padded bounding box of each previous detection
+		paddedBoundingBoxList = [ padBoundingBox( cv2.boundingRect( contourObj.contour ), self.imageSizeTuple, self.paddingRatioFloat, self.minPaddingInt )
+								  for contourObj in self.outerMostContourObjList ]
+
+		return mergeOverlappingRegion( paddedBoundingBoxList ), paddedBoundingBoxList
+
+	def _isEveryDetectionFound( self, paddedBoundingBoxList, outerMostContourObjList ):
+		''' - check if every previous detection has a detection of the same shape whose center is in its padded bounding box
+		'''
+
+		# loop through each previous detection
+		for previousContourObj, ( xPosition, yPosition, boxWidth, boxHeight ) in zip( self.outerMostContourObjList, paddedBoundingBoxList ):
+
+			# find detection of the same shape in padded bounding box
+			if not any( contourObj.shapeTypeStr == previousContourObj.shapeTypeStr and
+						xPosition <= contourObj.centerPointTuple[ 0 ] < xPosition + boxWidth and
+						yPosition <= contourObj.centerPointTuple[ 1 ] < yPosition + boxHeight
+						for contourObj in outerMostContourObjList ):
+				return False
+
+		return True
+
+	def processFrame( self, image ):
+		''' - detect outer most contour of this frame, only in region around previous detection unless full scan is due
+
+			RETURN:
+				- outerMostContourObjList ( list )
+		'''
+
+		# size of this frame
+		imageSizeTuple = ( image.shape[ 1 ], image.shape[ 0 ] )
+		self.numberOfFrameInt += 1
+		self.numberOfFrameSinceScanInt += 1
+
+		# first frame, frame size changed or full scan is due
+		if self.imageSizeTuple != imageSizeTuple or self.numberOfFrameSinceScanInt >= self.scanIntervalInt:
+			self.imageSizeTuple = imageSizeTuple
+			self._processFullFrame( image )
+			return self.outerMostContourObjList
+
+		# region around previous detection
+		with profiler.measureStage( 'findRegionOfInterest' ):
+			regionOfInterestList, paddedBoundingBoxList = self._findRegionOfInterestList()
+		profiler.addCount( 'regionOfInterest', len( regionOfInterestList ) )
+
+		# detect in every region
+		outerMostContourObjList = detectOuterMostContourInRegionOfInterest( image, regionOfInterestList, self.minArea, self.maxArea )
+
+		# previous detection is lost, scan whole frame right away
+		if not self._isEveryDetectionFound( paddedBoundingBoxList, outerMostContourObjList ):
+			profiler.addCount( 'lostDetectionScan' )
+			self.numberOfLostScanInt += 1
+			self._processFullFrame( image )
+			return self.outerMostContourObjList
+
+		# replace state
+		self.outerMostContourObjList = outerMostContourObjList
+		self.latestRegionOfInterestList = regionOfInterestList
+		self.isLatestFrameFull = False
+
+		return self.outerMostContourObjList
+
+	def getStatistic( self ):
+		''' - number of full frame scan and region of interest of latest frame
+
+			RETURN:
+				- statisticDict ( dict )
+		'''
+
+		# ratio of image area processed in latest frame
+		regionOfInterestAreaInt = sum( regionWidth * regionHeight for _, _, regionWidth, regionHeight in self.latestRegionOfInterestList )
+		imageAreaInt = self.imageSizeTuple[ 0 ] * self.imageSizeTuple[ 1 ] if self.imageSizeTuple is not None else 0
+
+		return { 'numberOfFrame' : self.numberOfFrameInt,
+				 'numberOfFullScan' : self.numberOfFullScanInt,
+				 'numberOfLostScan' : self.numberOfLostScanInt,
+				 'regionOfInterestList' : self.latestRegionOfInterestList,
+				 'regionOfInterestAreaRatioFloat' : regionOfInterestAreaInt / imageAreaInt if imageAreaInt > 0 else 0.0,
+				 'isFullFrame' : self.isLatestFrameFull,
+				 'numberOfOuterMostContour' : len( self.outerMostContourObjList ) }
+
+def streamPoseFromFrameRegionOfInterest( frameIterator, regionOfInterestDetectorObj=None ):
+	''' - generator pipeline like streamPoseFromFrame, but after a full frame scan only region around
+		  previous detection is processed
+
+		ARGS:
+			- frameIterator ( iterator ) --> yield ( frameIndex, frame )
+			- regionOfInterestDetectorObj ( RegionOfInterestDetector ) --> new detector with default setting if not given
+
+		YIELD:
+			- ( frameIndex, poseList ) ( tuple )
+	'''
+
+	# detector which keeps state between frame
+	if regionOfInterestDetectorObj is None:
+		regionOfInterestDetectorObj = RegionOfInterestDetector()
+
+	# loop through each frame
+	for frameIndex, frame in frameIterator:
+
+		# detect pose in this frame
+		profiler.beginFrame( frameIndex )
+		poseList = extractPoseListFromContourObj( regionOfInterestDetectorObj.processFrame( frame ) )
+		profiler.endFrame()
+
+		yield frameIndex, poseList
@@ -0,0 +1,389 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# array operation
+import numpy as np
+
+# mathematical operation
+import math
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import convertToBinaryImage, createContourStorage, detectOuterMostContour, MinContourAreaInt, MaxContourAreaInt
+
+from instrumentation import profiler
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# shape type to angle ( in degree ) after which coordinate frame looks the same, used to smooth axis angle
+# circle axis is always aligned with camera axis
+ShapeTypeToSymmetryAngleDegreeDict = { 'circle' : 360.0, 'triangle' : 120.0, 'square' : 90.0 }
+
+def calculateCircularity( contour, area ):
+	''' - circularity of contour, 4 * pi * area / perimeter ^ 2, invariant to position, scale and rotation
+
+		- cheap shape signature, triangle is about 0.6, square is about 0.78, circle is close to 1
+	'''
+	return 4 * math.pi * area / max( cv2.arcLength( contour, True ), 1e-9 ) ** 2
+
+def calculateBoundingBoxCenter( contour ):
+	''' - center of bounding box of contour, much cheaper than center from moment
+	'''
+
+	# bounding box of contour
+	( xPosition, yPosition, boundingBoxWidth, boundingBoxHeight ) = cv2.boundingRect( contour )
+
+	return ( xPosition + boundingBoxWidth / 2, yPosition + boundingBoxHeight / 2 )
+
+class ShapeTrack:
+	''' - one shape followed across frame with stable id and smoothed pose
+	'''
+
+	def __init__( self, trackIdInt, contourObj ):
+
+		# stable id of this track
+		self.trackIdInt = trackIdInt
+
+		# shape type, never changes during track life
+		self.shapeTypeStr = contourObj.shapeTypeStr
+
+		# latest measured center point and bounding box center, used to match contour in next frame
+		self.measuredCenterPointTuple = contourObj.centerPointTuple
+		self.boundingBoxCenterTuple = calculateBoundingBoxCenter( contourObj.contour )
+
+		# area and circularity when shape type was last classified by rule, used to match contour in next frame
+		self.area = contourObj.area
+		self.circularityFloat = calculateCircularity( contourObj.contour, contourObj.area )
+
+		# area of contour matched in latest frame, NaN while track is coasting without detection
+		self.measuredArea = contourObj.area
+
+		# smoothed center point ( float )
+		self.centerXFloat, self.centerYFloat = float( contourObj.centerPointTuple[ 0 ] ), float( contourObj.centerPointTuple[ 1 ] )
+
+		# smoothed angle of x axis ( in degree ) and side of y axis, +1 or -1
+		self.xAxisAngleDegreeFloat, self.yAxisSideInt = self.measureAxis( contourObj )
+
+		# length of vector ( in pixel ) to draw coordinate frame
+		self.vectorLengthInt = contourObj.vectorLengthInt
+
+		# number of frame this track is matched in a row, and missed in a row
+		self.numberOfHit = 1
+		self.numberOfMiss = 0
+
+		# track is matched in enough frame to be trusted
+		self.isConfirmed = False
+
+	@staticmethod
+	def measureAxis( contourObj ):
+		''' - angle of x axis and side of y axis of contour's coordinate frame
+
+			RETURN:
+				- ( xAxisAngleDegreeFloat, yAxisSideInt ) ( tuple )
+		'''
+
+		# axis vector with respect to center point
+		xAxisVectorTuple = ( contourObj.xAxisEndPointTuple[ 0 ] - contourObj.centerPointTuple[ 0 ], contourObj.xAxisEndPointTuple[ 1 ] - contourObj.centerPointTuple[ 1 ] )
+		yAxisVectorTuple = ( contourObj.yAxisEndPointTuple[ 0 ] - contourObj.centerPointTuple[ 0 ], contourObj.yAxisEndPointTuple[ 1 ] - contourObj.centerPointTuple[ 1 ] )
+
+		# y axis is on positive side if cross product is positive
+		crossProduct = xAxisVectorTuple[ 0 ] * yAxisVectorTuple[ 1 ] - xAxisVectorTuple[ 1 ] * yAxisVectorTuple[ 0 ]
+
+		return math.degrees( math.atan2( xAxisVectorTuple[ 1 ], xAxisVectorTuple[ 0 ] ) ), 1 if crossProduct >= 0 else -1
+
+	def update( self, contourObj, smoothingFactorFloat, isShapeTypeClassified=True ):
+		''' - update track with contour object matched in this frame
+
+			ARGS:
+				- contourObj ( Contour ) --> outer most contour object with coordinate frame
+				- smoothingFactorFloat ( float ) --> weight of new measurement, 1 means no smoothing
+				- isShapeTypeClassified ( bool ) --> shape type was found by rule, not taken from this track,
+					then area and circularity are refreshed, otherwise they would slowly drift with a changing blob
+		'''
+
+		# latest measurement
+		self.measuredCenterPointTuple = contourObj.centerPointTuple
+		self.boundingBoxCenterTuple = calculateBoundingBoxCenter( contourObj.contour )
+		self.measuredArea = contourObj.area
+		if isShapeTypeClassified:
+			self.area = contourObj.area
+			self.circularityFloat = calculateCircularity( contourObj.contour, contourObj.area )
+
+		# smooth center point
+		self.centerXFloat += smoothingFactorFloat * ( contourObj.centerPointTuple[ 0 ] - self.centerXFloat )
+		self.centerYFloat += smoothingFactorFloat * ( contourObj.centerPointTuple[ 1 ] - self.centerYFloat )
+
+		# smooth angle of x axis, difference is wrapped by symmetry angle so picking another corner of the same shape is not a jump
+		xAxisAngleDegreeFloat, self.yAxisSideInt = self.measureAxis( contourObj )
+		symmetryAngleDegreeFloat = ShapeTypeToSymmetryAngleDegreeDict[ self.shapeTypeStr ]
+		angleDifferenceDegreeFloat = ( xAxisAngleDegreeFloat - self.xAxisAngleDegreeFloat + symmetryAngleDegreeFloat / 2 ) % symmetryAngleDegreeFloat - symmetryAngleDegreeFloat / 2
+		self.xAxisAngleDegreeFloat += smoothingFactorFloat * angleDifferenceDegreeFloat
+
+		# count hit
+		self.numberOfHit += 1
+		self.numberOfMiss = 0
+
+	@property
+	def centerPointTuple( self ):
+		''' - smoothed center point
+		'''
+		return ( int( round( self.centerXFloat ) ), int( round( self.centerYFloat ) ) )
+
+	@property
+	def xAxisEndPointTuple( self ):
+		''' - end point of smoothed x axis
+		'''
+		xAxisAngleRadianFloat = math.radians( self.xAxisAngleDegreeFloat )
+		return ( int( round( self.centerXFloat + self.vectorLengthInt * math.cos( xAxisAngleRadianFloat ) ) ),
+				 int( round( self.centerYFloat + self.vectorLengthInt * math.sin( xAxisAngleRadianFloat ) ) ) )
+
+	@property
+	def yAxisEndPointTuple( self ):
+		''' - end point of smoothed y axis, perpendicular to x axis
+		'''
+		yAxisAngleRadianFloat = math.radians( self.xAxisAngleDegreeFloat + self.yAxisSideInt * 90 )
+		return ( int( round( self.centerXFloat + self.vectorLengthInt * math.cos( yAxisAngleRadianFloat ) ) ),
+				 int( round( self.centerYFloat + self.vectorLengthInt * math.sin( yAxisAngleRadianFloat ) ) ) )
+
+class ShapeTracker:
+	''' - link outer most detection between frame by shape type and center distance, give stable id and smoothed pose
+
+		- detection is assigned to track greedily, closest pair first, on a track x detection distance matrix
+
+		- track is confirmed after a few hit in a row and dropped after a few miss in a row
+
+		- contour in area range which sits where a confirmed track is expected, with similar area
+		  and circularity, takes shape type of the track and skips shape classification rule,
+		  every few frame all contour is classified again to catch track which changed
+	'''
+
+	def __init__( self, maxDistanceFloat=30.0, maxAreaChangeFloat=0.1, maxCircularityChangeFloat=0.05, smoothingFactorFloat=0.5,
+				  numberOfHitToConfirmInt=3, maxNumberOfMissInt=5, verifyEveryFrameInt=30 ):
+
+		# largest center distance ( in pixel ) between track and detection to be matched
+		self.maxDistanceFloat = maxDistanceFloat
+
+		# largest relative area change of contour which takes shape type of confirmed track
+		self.maxAreaChangeFloat = maxAreaChangeFloat
+
+		# largest relative change of circularity of contour which takes shape type of confirmed track
+		self.maxCircularityChangeFloat = maxCircularityChangeFloat
+
+		# weight of new measurement in smoothed pose, 1 means no smoothing
+		self.smoothingFactorFloat = smoothingFactorFloat
+
+		# number of hit in a row to confirm track and number of miss in a row to drop it
+		self.numberOfHitToConfirmInt = numberOfHitToConfirmInt
+		self.maxNumberOfMissInt = maxNumberOfMissInt
+
+		# classify every contour again every this many frame, 0 means never skip classification
+		self.verifyEveryFrameInt = verifyEveryFrameInt
+
+		# alive track storage
+		self.trackList = list()
+
+		# id for next new track
+		self.nextTrackIdInt = 0
+
+		# number of processed frame
+		self.numberOfFrame = 0
+
+	def findKnownShapeType( self, contourStorageObj, minArea=MinContourAreaInt, maxArea=MaxContourAreaInt ):
+		''' - match contour in area range to confirmed track, one contour per track
+
+			RETURN:
+				- contourIndexToKnownShapeTypeDict ( dict ) --> contour index to shape type of matched track
+		'''
+
+		# contour index to known shape type storage
+		contourIndexToKnownShapeTypeDict = dict()
+
+		# confirmed track
+		confirmedTrackList = [ track for track in self.trackList if track.isConfirmed ]
+
+		# nothing to match, or this frame is verification frame
+		if len( confirmedTrackList ) == 0 or self.verifyEveryFrameInt == 0 or self.numberOfFrame % self.verifyEveryFrameInt == 0:
+			return contourIndexToKnownShapeTypeDict
+
+		# index and area of contour in area range
+		contourIndexArray = np.flatnonzero( ( minArea <= contourStorageObj.contourAreaArray ) & ( contourStorageObj.contourAreaArray <= maxArea ) )
+		if len( contourIndexArray ) == 0:
+			return contourIndexToKnownShapeTypeDict
+		contourAreaArray = contourStorageObj.contourAreaArray[ contourIndexArray ]
+
+		# bounding box center of contour in area range, shape is ( N, 2 )
+		boundingBoxCenterArray = np.array( [ calculateBoundingBoxCenter( contourStorageObj.allContourList[ contourIndex ] ) for contourIndex in contourIndexArray ] )
+
+		# area and bounding box center of confirmed track
+		trackAreaArray = np.array( [ track.area for track in confirmedTrackList ] )
+		trackBoundingBoxCenterArray = np.array( [ track.boundingBoxCenterTuple for track in confirmedTrackList ] )
+
+		# relative area change and center distance of every contour to every track, shape is ( number of track, N )
+		areaChangeArray = np.abs( contourAreaArray[ None, : ] / trackAreaArray[ :, None ] - 1 )
+		distanceArray = np.hypot( boundingBoxCenterArray[ None, :, 0 ] - trackBoundingBoxCenterArray[ :, None, 0 ], boundingBoxCenterArray[ None, :, 1 ] - trackBoundingBoxCenterArray[ :, None, 1 ] )
+
+		# contour close to track with the most similar area is candidate of the track
+		areaChangeArray[ ( distanceArray > self.maxDistanceFloat ) | ( areaChangeArray > self.maxAreaChangeFloat ) ] = np.inf
+		candidatePositionArray = np.argmin( areaChangeArray, axis=1 )
+
+		# loop through each confirmed track which has candidate
+		for trackPosition in np.flatnonzero( np.isfinite( areaChangeArray[ np.arange( len( confirmedTrackList ) ), candidatePositionArray ] ) ):
+			track = confirmedTrackList[ trackPosition ]
+			contourPosition = candidatePositionArray[ trackPosition ]
+			contourIndex = int( contourIndexArray[ contourPosition ] )
+
+			# shape signature is similar, contour takes shape type of track
+			if abs( calculateCircularity( contourStorageObj.allContourList[ contourIndex ], contourAreaArray[ contourPosition ] ) / track.circularityFloat - 1 ) <= self.maxCircularityChangeFloat:
+				contourIndexToKnownShapeTypeDict.setdefault( contourIndex, track.shapeTypeStr )
+
+		return contourIndexToKnownShapeTypeDict
+
+	def update( self, outerMostContourObjList, contourIndexToKnownShapeTypeDict=None ):
+		''' - link outer most contour object of this frame to track
+
+			ARGS:
+				- outerMostContourObjList ( list )
+				- contourIndexToKnownShapeTypeDict ( dict ) --> shape hint used in this frame, see findKnownShapeType
+
+			RETURN:
+				- matchedTrackList ( list ) --> track matched in this frame
+		'''
+
+		# count frame
+		self.numberOfFrame += 1
+
+		# center distance between every track and every detection, shape is ( number of track, number of detection )
+		trackCenterArray = np.array( [ track.measuredCenterPointTuple for track in self.trackList ], dtype=np.float64 ).reshape( -1, 2 )
+		detectionCenterArray = np.array( [ contourObj.centerPointTuple for contourObj in outerMostContourObjList ], dtype=np.float64 ).reshape( -1, 2 )
+		distanceArray = np.hypot( trackCenterArray[ :, None, 0 ] - detectionCenterArray[ None, :, 0 ], trackCenterArray[ :, None, 1 ] - detectionCenterArray[ None, :, 1 ] )
+
+		# pair of different shape type or too far apart can not be matched
+		isShapeTypeSameArray = np.array( [ track.shapeTypeStr for track in self.trackList ], dtype=object )[ :, None ] == np.array( [ contourObj.shapeTypeStr for contourObj in outerMostContourObjList ], dtype=object )[ None, : ]
+		distanceArray[ ~isShapeTypeSameArray | ( distanceArray > self.maxDistanceFloat ) ] = np.inf
+
+		# match closest pair first, only pair close enough is looked at
+		matchedTrackPositionSet = set()
+		matchedDetectionPositionSet = set()
+		matchedTrackList = list()
+		finiteFlatPositionArray = np.flatnonzero( np.isfinite( distanceArray ) )
+		for flatPosition in finiteFlatPositionArray[ np.argsort( distanceArray.ravel()[ finiteFlatPositionArray ], kind='stable' ) ]:
+
+			# track or detection is already matched
+			trackPosition, detectionPosition = divmod( int( flatPosition ), distanceArray.shape[ 1 ] )
+			if trackPosition in matchedTrackPositionSet or detectionPosition in matchedDetectionPositionSet:
+				continue
+
+			# update track
+			track = self.trackList[ trackPosition ]
+			contourObj = outerMostContourObjList[ detectionPosition ]
+			track.update( contourObj, self.smoothingFactorFloat, contourIndexToKnownShapeTypeDict is None or contourObj.contourIndex not in contourIndexToKnownShapeTypeDict )
+			track.isConfirmed = track.isConfirmed or track.numberOfHit >= self.numberOfHitToConfirmInt
+			matchedTrackPositionSet.add( trackPosition )
+			matchedDetectionPositionSet.add( detectionPosition )
+			matchedTrackList.append( track )
+
+		# count miss of track which is not matched, drop track missed too many time
+		aliveTrackList = list()
+		for trackPosition, track in enumerate( self.trackList ):
+			if trackPosition not in matchedTrackPositionSet:
+				track.numberOfMiss += 1
+				track.numberOfHit = 0
+				track.measuredArea = math.nan
+			if track.numberOfMiss <= self.maxNumberOfMissInt:
+				aliveTrackList.append( track )
+		self.trackList = aliveTrackList
+
+		# start new track for detection which is not matched
+		for detectionPosition, contourObj in enumerate( outerMostContourObjList ):
+			if detectionPosition not in matchedDetectionPositionSet:
+				track = ShapeTrack( self.nextTrackIdInt, contourObj )
+				track.isConfirmed = self.numberOfHitToConfirmInt <= 1
+				self.nextTrackIdInt += 1
+				self.trackList.append( track )
+				matchedTrackList.append( track )
+
+		profiler.addCount( 'aliveTrack', len( self.trackList ) )
+
+		return matchedTrackList
+
+	def processFrame( self, image, minArea=MinContourAreaInt, maxArea=MaxContourAreaInt ):
+		''' - detect outer most contour of this frame using confirmed track as shape hint, then update track
+
+			RETURN:
+				- matchedTrackList ( list )
+		'''
+
+		# find contour
+		contourStorageObj = createContourStorage( convertToBinaryImage( image ) )
+
+		# contour where confirmed track is expected skips shape classification rule
+		with profiler.measureStage( 'findKnownShapeType' ):
+			contourIndexToKnownShapeTypeDict = self.findKnownShapeType( contourStorageObj, minArea, maxArea )
+
+		# detect outer most contour of each shape
+		detectOuterMostContour( contourStorageObj, minArea, maxArea, contourIndexToKnownShapeTypeDict )
+
+		# link detection to track
+		with profiler.measureStage( 'updateTrack' ):
+			return self.update( contourStorageObj.outerMostCircleContourObjList + \
+								contourStorageObj.outerMostTriangleContourObjList + \
+								contourStorageObj.outerMostSquareContourObjList, contourIndexToKnownShapeTypeDict )
+
+def extractTrackPoseList( trackList ):
+	''' - get smoothed pose of each track as plain python value, like extractPoseList with track id
+
+		- area is the one of contour matched in latest frame, NaN for track which is coasting without detection
+
+		RETURN:
+			- poseList ( list )
+	'''
+	return [ { 'trackIdInt' : track.trackIdInt,
+			   'shapeTypeStr' : track.shapeTypeStr,
+			   'centerPointTuple' : track.centerPointTuple,
+			   'xAxisEndPointTuple' : track.xAxisEndPointTuple,
+			   'yAxisEndPointTuple' : track.yAxisEndPointTuple,
+			   'area' : track.measuredArea,
+			   'isConfirmed' : track.isConfirmed } for track in trackList ]
+
+def streamTrackPoseFromFrame( frameIterator, shapeTrackerObj=None ):
+	''' - generator pipeline like streamPoseFromFrame, pose carries stable track id and is smoothed
+
+		- every alive track is yielded, track missed in this frame keeps its latest smoothed pose
+		  and has NaN area until it is matched again or dropped
+
+		ARGS:
+			- frameIterator ( iterator ) --> yield ( frameIndex, frame )
+			- shapeTrackerObj ( ShapeTracker ) --> new tracker with default setting if not given
+
+		YIELD:
+			- ( frameIndex, poseList ) ( tuple )
+	'''
+
+	# tracker which keeps track between frame
+	if shapeTrackerObj is None:
+		shapeTrackerObj = ShapeTracker()
+
+	# loop through each frame
+	for frameIndex, frame in frameIterator:
+
+		# detect and track pose in this frame, pose of every alive track including coasting one
+		profiler.beginFrame( frameIndex )
+		shapeTrackerObj.processFrame( frame )
+		poseList = extractTrackPoseList( shapeTrackerObj.trackList )
+		profiler.endFrame()
+
+		yield frameIndex, poseList
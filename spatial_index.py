@@ -0,0 +1,139 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# mathematical operation
+import math
+
+def isBoundingBoxInside( innerBoundingBoxTuple, outerBoundingBoxTuple ):
+	''' - check if inner bounding box ( x, y, width, height ) is inside outer bounding box
+	'''
+	return innerBoundingBoxTuple[ 0 ] >= outerBoundingBoxTuple[ 0 ] and innerBoundingBoxTuple[ 1 ] >= outerBoundingBoxTuple[ 1 ] and \
+		   innerBoundingBoxTuple[ 0 ] + innerBoundingBoxTuple[ 2 ] <= outerBoundingBoxTuple[ 0 ] + outerBoundingBoxTuple[ 2 ] and \
+		   innerBoundingBoxTuple[ 1 ] + innerBoundingBoxTuple[ 3 ] <= outerBoundingBoxTuple[ 1 ] + outerBoundingBoxTuple[ 3 ]
+
+def isBoundingBoxOverlapping( firstBoundingBoxTuple, secondBoundingBoxTuple ):
+	''' - check if two bounding box ( x, y, width, height ) overlap
+	'''
+	return firstBoundingBoxTuple[ 0 ] < secondBoundingBoxTuple[ 0 ] + secondBoundingBoxTuple[ 2 ] and secondBoundingBoxTuple[ 0 ] < firstBoundingBoxTuple[ 0 ] + firstBoundingBoxTuple[ 2 ] and \
+		   firstBoundingBoxTuple[ 1 ] < secondBoundingBoxTuple[ 1 ] + secondBoundingBoxTuple[ 3 ] and secondBoundingBoxTuple[ 1 ] < firstBoundingBoxTuple[ 1 ] + firstBoundingBoxTuple[ 3 ]
+
+def mergeBoundingBox( firstBoundingBoxTuple, secondBoundingBoxTuple ):
+	''' - smallest bounding box which contains both bounding box
+	'''
+	xPosition = min( firstBoundingBoxTuple[ 0 ], secondBoundingBoxTuple[ 0 ] )
+	yPosition = min( firstBoundingBoxTuple[ 1 ], secondBoundingBoxTuple[ 1 ] )
+	return ( xPosition, yPosition,
+			 max( firstBoundingBoxTuple[ 0 ] + firstBoundingBoxTuple[ 2 ], secondBoundingBoxTuple[ 0 ] + secondBoundingBoxTuple[ 2 ] ) - xPosition,
+			 max( firstBoundingBoxTuple[ 1 ] + firstBoundingBoxTuple[ 3 ], secondBoundingBoxTuple[ 1 ] + secondBoundingBoxTuple[ 3 ] ) - yPosition )
+
+class BoundingBoxGridIndex:
+	''' - uniform grid spatial index over bounding box of contour object
+
+		- each contour object is registered in every grid cell its bounding box covers
+
+		- used to reduce candidate container contour before running any polygon test
+	'''
+
+	def __init__( self, contourObjList, cellSizeInt=64 ):
+
+		# size of one grid cell ( in pixel )
+		self.cellSizeInt = cellSizeInt
+
+		# all contour object stored in this index
+		self.contourObjList = contourObjList
+
+		# bounding box of each contour object, same position as contour object list
+		self.boundingBoxList = list()
+
+		# grid cell tuple to list of contour object position
+		self.gridCellToContourPositionListDict = dict()
+
+		# contour object id to its position in contour object list
+		self.contourObjIdToPositionDict = dict()
+
+		# build index
+		self._buildIndex()
+
+	def _buildIndex( self ):
+		''' - register bounding box of each contour object to grid cell it covers
+		'''
+
+		# loop through each contour object
+		for contourPosition, contourObj in enumerate( self.contourObjList ):
+
+			# calculate bounding box of contour
+			boundingBoxTuple = cv2.boundingRect( contourObj.contour )
+
+			# store bounding box
+			self.boundingBoxList.append( boundingBoxTuple )
+
+			# store position of contour object
+			self.contourObjIdToPositionDict[ id( contourObj ) ] = contourPosition
+
+			# get range of grid cell covered by this bounding box
+			( firstColumn, firstRow, lastColumn, lastRow ) = self._getGridCellRange( boundingBoxTuple )
+
+			# loop through each covered grid cell
+			for row in range( firstRow, lastRow + 1 ):
+				for column in range( firstColumn, lastColumn + 1 ):
+
+					# register contour position to grid cell
+					self.gridCellToContourPositionListDict.setdefault( ( column, row ), list() ).append( contourPosition )
+
+	def _getGridCellRange( self, boundingBoxTuple ):
+		''' - get first and last grid cell covered by bounding box
+
+			RETURN:
+				- ( firstColumn, firstRow, lastColumn, lastRow ) ( tuple )
+		'''
+
+		( xPosition, yPosition, boundingBoxWidth, boundingBoxHeight ) = boundingBoxTuple
+
+		# bounding box always covers at least one pixel
+		lastXPosition = xPosition + max( boundingBoxWidth - 1, 0 )
+		lastYPosition = yPosition + max( boundingBoxHeight - 1, 0 )
+
+		return ( xPosition // self.cellSizeInt, yPosition // self.cellSizeInt,
+				 lastXPosition // self.cellSizeInt, lastYPosition // self.cellSizeInt )
+
+	def hasContourObj( self, contourObj ):
+		''' - check if this contour object is stored in this index
+		'''
+		return id( contourObj ) in self.contourObjIdToPositionDict
+
+	def queryContourObjContainingPoint( self, pointTuple ):
+		''' - get contour object whose bounding box contains the given point
+
+			- this is only a candidate list, polygon test is still needed to confirm containment
+
+			ARGS:
+				- pointTuple ( tuple )
+
+			RETURN:
+				- candidateContourObjList ( list )
+		'''
+
+		# get grid cell of this point
+		gridCellTuple = ( math.floor( pointTuple[ 0 ] / self.cellSizeInt ), math.floor( pointTuple[ 1 ] / self.cellSizeInt ) )
+
+		# candidate contour object storage
+		candidateContourObjList = list()
+
+		# loop through each contour registered in this grid cell
+		for contourPosition in self.gridCellToContourPositionListDict.get( gridCellTuple, list() ):
+
+			( xPosition, yPosition, boundingBoxWidth, boundingBoxHeight ) = self.boundingBoxList[ contourPosition ]
+
+			# point is inside bounding box
+			if xPosition <= pointTuple[ 0 ] < xPosition + boundingBoxWidth and yPosition <= pointTuple[ 1 ] < yPosition + boundingBoxHeight:
+
+				# store it
+				candidateContourObjList.append( self.contourObjList[ contourPosition ] )
+
+		return candidateContourObjList
@@ -0,0 +1,215 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# array operation
+import numpy as np
+
+# mathematical operation
+import math
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# color of field, marker outline and marker fill ( BGR )
+FieldColorTuple = ( 200, 190, 180 )
+OutlineColorTuple = ( 40, 40, 40 )
+FillColorTupleList = [ ( 180, 100, 100 ), ( 0, 190, 0 ), ( 0, 80, 170 ), ( 200, 200, 0 ), ( 150, 150, 150 ), ( 90, 90, 90 ) ]
+
+# thickness of marker outline ( in pixel )
+OutlineThicknessInt = 3
+
+# shape type of synthetic marker
+ShapeTypeTuple = ( 'circle', 'triangle', 'square' )
+
+def calculateMarkerPointArray( shapeTypeStr, centerPointTuple, radiusInt, angleDegreeFloat ):
+	''' - calculate polygon point of triangle or square marker
+
+		RETURN:
+			- pointArray ( numpy array ) --> shape is ( N, 1, 2 ), int32
+	'''
+
+	# number of corner
+	numberOfCorner = 3 if shapeTypeStr == 'triangle' else 4
+
+	# angle of each corner
+	cornerAngleArray = np.deg2rad( angleDegreeFloat + np.arange( numberOfCorner ) * 360 / numberOfCorner )
+
+	# corner point
+	pointArray = np.stack( [ centerPointTuple[ 0 ] + radiusInt * np.cos( cornerAngleArray ),
+							 centerPointTuple[ 1 ] + radiusInt * np.sin( cornerAngleArray ) ], axis=1 )
+
+	return np.round( pointArray ).astype( np.int32 ).reshape( -1, 1, 2 )
+
+def drawMarker( image, shapeTypeStr, centerPointTuple, radiusInt, angleDegreeFloat, fillColorTuple ):
+	''' - draw filled marker with dark outline, like marker in field_image_from_manual.png
+	'''
+
+	# circle marker
+	if shapeTypeStr == 'circle':
+		cv2.circle( image, centerPointTuple, radiusInt, fillColorTuple, -1 )
+		cv2.circle( image, centerPointTuple, radiusInt, OutlineColorTuple, OutlineThicknessInt )
+		return
+
+	# triangle or square marker
+	pointArray = calculateMarkerPointArray( shapeTypeStr, centerPointTuple, radiusInt, angleDegreeFloat )
+	cv2.fillPoly( image, [ pointArray ], fillColorTuple )
+	cv2.polylines( image, [ pointArray ], True, OutlineColorTuple, OutlineThicknessInt )
+
+def generateSyntheticField( widthInt, heightInt, numberOfCircle, numberOfTriangle, numberOfSquare, nestedRatioFloat=0.3, seedInt=0 ):
+	''' - draw synthetic field image with circle, triangle and square marker
+
+		- marker is placed one per grid cell so markers never overlap
+
+		- some marker has a smaller marker of the same shape inside it, like nested marker in field image
+
+		ARGS:
+			- widthInt, heightInt ( int ) --> image size
+			- numberOfCircle, numberOfTriangle, numberOfSquare ( int )
+			- nestedRatioFloat ( float ) --> ratio of marker which has a nested marker
+			- seedInt ( int ) --> random seed, same seed gives the same image
+
+		RETURN:
+			- ( image, markerList ) ( tuple ) --> markerList is list of ( shapeTypeStr, centerPointTuple, radiusInt )
+	'''
+
+	# random generator
+	randomGenerator = np.random.default_rng( seedInt )
+
+	# field image
+	image = np.empty( ( heightInt, widthInt, 3 ), dtype=np.uint8 )
+	image[ : ] = FieldColorTuple
+
+	# shape type of every marker in random order
+	shapeTypeList = [ 'circle' ] * numberOfCircle + [ 'triangle' ] * numberOfTriangle + [ 'square' ] * numberOfSquare
+	randomGenerator.shuffle( shapeTypeList )
+
+	# nothing to draw
+	if len( shapeTypeList ) == 0:
+		return image, list()
+
+	# grid with one cell per marker, keep cell close to square
+	numberOfColumn = math.ceil( math.sqrt( len( shapeTypeList ) * widthInt / heightInt ) )
+	numberOfRow = math.ceil( len( shapeTypeList ) / numberOfColumn )
+	cellWidthInt = widthInt // numberOfColumn
+	cellHeightInt = heightInt // numberOfRow
+
+	# largest marker radius which fits in cell with margin for outline
+	maxRadiusInt = min( cellWidthInt, cellHeightInt ) // 2 - OutlineThicknessInt * 2
+
+	# drawn marker storage
+	markerList = list()
+
+	# loop through each marker
+	for markerPosition, shapeTypeStr in enumerate( shapeTypeList ):
+
+		# marker does not fit in cell
+		if maxRadiusInt < 4:
+			break
+
+		# center of cell
+		rowPosition, columnPosition = divmod( markerPosition, numberOfColumn )
+		centerPointTuple = ( columnPosition * cellWidthInt + cellWidthInt // 2, rowPosition * cellHeightInt + cellHeightInt // 2 )
+
+		# random size, rotation and color
+		radiusInt = int( randomGenerator.integers( max( maxRadiusInt // 2, 4 ), maxRadiusInt + 1 ) )
+		angleDegreeFloat = float( randomGenerator.uniform( 0, 360 ) )
+		fillColorTuple = FillColorTupleList[ int( randomGenerator.integers( len( FillColorTupleList ) ) ) ]
+
+		# draw marker
+		drawMarker( image, shapeTypeStr, centerPointTuple, radiusInt, angleDegreeFloat, fillColorTuple )
+		markerList.append( ( shapeTypeStr, centerPointTuple, radiusInt ) )
+
+		# draw nested marker inside this marker
+		if randomGenerator.uniform() < nestedRatioFloat and radiusInt // 2 >= 4:
+			nestedFillColorTuple = FillColorTupleList[ int( randomGenerator.integers( len( FillColorTupleList ) ) ) ]
+			drawMarker( image, shapeTypeStr, centerPointTuple, radiusInt // 2, angleDegreeFloat, nestedFillColorTuple )
+
+	return image, markerList
+
+def generateSyntheticSequence( widthInt, heightInt, numberOfCircle, numberOfTriangle, numberOfSquare, numberOfFrame, nestedRatioFloat=0.3, seedInt=0 ):
+	''' - draw sequence of synthetic field frame where every marker moves and rotates at its own constant speed
+
+		- marker is placed one per grid cell like generateSyntheticField and never leaves its cell,
+		  so markers never overlap
+
+		ARGS:
+			- widthInt, heightInt ( int ) --> frame size
+			- numberOfCircle, numberOfTriangle, numberOfSquare ( int )
+			- numberOfFrame ( int )
+			- nestedRatioFloat ( float ) --> ratio of marker which has a nested marker
+			- seedInt ( int ) --> random seed, same seed gives the same sequence
+
+		YIELD:
+			- ( frameIndex, frame ) ( tuple ) --> like iterateFrameFromSource
+	'''
+
+	# random generator
+	randomGenerator = np.random.default_rng( seedInt )
+
+	# shape type of every marker in random order
+	shapeTypeList = [ 'circle' ] * numberOfCircle + [ 'triangle' ] * numberOfTriangle + [ 'square' ] * numberOfSquare
+	randomGenerator.shuffle( shapeTypeList )
+
+	# grid with one cell per marker, keep cell close to square
+	numberOfColumn = max( math.ceil( math.sqrt( len( shapeTypeList ) * widthInt / heightInt ) ), 1 )
+	numberOfRow = max( math.ceil( len( shapeTypeList ) / numberOfColumn ), 1 )
+	cellWidthInt = widthInt // numberOfColumn
+	cellHeightInt = heightInt // numberOfRow
+
+	# largest marker radius, half of cell is left for moving
+	maxRadiusInt = min( cellWidthInt, cellHeightInt ) // 4 - OutlineThicknessInt
+
+	# cell center, velocity, radius, angle, angular velocity, fill color and nested fill color of every marker
+	markerStateList = list()
+	for markerPosition, shapeTypeStr in enumerate( shapeTypeList ):
+
+		# marker does not fit in cell
+		if maxRadiusInt < 4:
+			break
+
+		# center of cell
+		rowPosition, columnPosition = divmod( markerPosition, numberOfColumn )
+		cellCenterPointTuple = ( columnPosition * cellWidthInt + cellWidthInt // 2, rowPosition * cellHeightInt + cellHeightInt // 2 )
+
+		# random size, then speed which keeps marker in its cell during the whole sequence
+		radiusInt = int( randomGenerator.integers( max( maxRadiusInt // 2, 4 ), maxRadiusInt + 1 ) )
+		maxSpeedFloat = ( min( cellWidthInt, cellHeightInt ) // 2 - radiusInt - OutlineThicknessInt * 2 ) / max( numberOfFrame, 1 )
+		velocityTuple = ( float( randomGenerator.uniform( -maxSpeedFloat, maxSpeedFloat ) ), float( randomGenerator.uniform( -maxSpeedFloat, maxSpeedFloat ) ) )
+
+		# random rotation, rotation speed and color
+		angleDegreeFloat = float( randomGenerator.uniform( 0, 360 ) )
+		angularVelocityDegreeFloat = float( randomGenerator.uniform( -5, 5 ) )
+		fillColorTuple = FillColorTupleList[ int( randomGenerator.integers( len( FillColorTupleList ) ) ) ]
+
+		# color of nested marker, None if marker has no nested marker
+		nestedFillColorTuple = None
+		if randomGenerator.uniform() < nestedRatioFloat and radiusInt // 2 >= 4:
+			nestedFillColorTuple = FillColorTupleList[ int( randomGenerator.integers( len( FillColorTupleList ) ) ) ]
+
+		markerStateList.append( ( shapeTypeStr, cellCenterPointTuple, velocityTuple, radiusInt, angleDegreeFloat, angularVelocityDegreeFloat, fillColorTuple, nestedFillColorTuple ) )
+
+	# loop through each frame
+	for frameIndex in range( numberOfFrame ):
+
+		# field image
+		image = np.empty( ( heightInt, widthInt, 3 ), dtype=np.uint8 )
+		image[ : ] = FieldColorTuple
+
+		# draw every marker at its position in this frame
+		for shapeTypeStr, cellCenterPointTuple, velocityTuple, radiusInt, angleDegreeFloat, angularVelocityDegreeFloat, fillColorTuple, nestedFillColorTuple in markerStateList:
+			centerPointTuple = ( int( round( cellCenterPointTuple[ 0 ] + velocityTuple[ 0 ] * frameIndex ) ), int( round( cellCenterPointTuple[ 1 ] + velocityTuple[ 1 ] * frameIndex ) ) )
+			frameAngleDegreeFloat = angleDegreeFloat + angularVelocityDegreeFloat * frameIndex
+			drawMarker( image, shapeTypeStr, centerPointTuple, radiusInt, frameAngleDegreeFloat, fillColorTuple )
+			if nestedFillColorTuple is not None:
+				drawMarker( image, shapeTypeStr, centerPointTuple, radiusInt // 2, frameAngleDegreeFloat, nestedFillColorTuple )
+
+		yield frameIndex, image
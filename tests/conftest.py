@@ -0,0 +1,11 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import os
+import sys
+
+# module of repository is at its root, test can import it without installing anything
+sys.path.insert( 0, os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
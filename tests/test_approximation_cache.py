@@ -0,0 +1,90 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import numpy as np
+
+import threading
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from approximation_cache import ApproximatedPolygonCache
+
+def createCircleContour( radiusInt ):
+	''' - contour of filled circle drawn on blank image
+	'''
+	image = np.zeros( ( 4 * radiusInt, 4 * radiusInt ), dtype=np.uint8 )
+	cv2.circle( image, ( 2 * radiusInt, 2 * radiusInt ), radiusInt, 255, -1 )
+	contourList, _ = cv2.findContours( image, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE )
+	return contourList[ 0 ]
+
+def test_cache_gives_same_polygon_as_approxPolyDP():
+
+	# cache on
+	contour = createCircleContour( 50 )
+	approximatedPolygonCacheObj = ApproximatedPolygonCache()
+	approximatedPolygonCacheObj.enable()
+
+	expectedPointList = cv2.approxPolyDP( contour, 4 / 100 * cv2.arcLength( contour, True ), True )
+	for _ in range( 2 ):
+		assert np.array_equal( approximatedPolygonCacheObj.approximatePolygon( contour, 4 ), expectedPointList )
+
+	statisticDict = approximatedPolygonCacheObj.getStatistic()
+	assert ( statisticDict[ 'numberOfHit' ], statisticDict[ 'numberOfMiss' ], statisticDict[ 'numberOfEntry' ] ) == ( 1, 1, 1 )
+
+def test_disabled_cache_stores_nothing():
+
+	# cache is off by default
+	approximatedPolygonCacheObj = ApproximatedPolygonCache()
+	approximatedPolygonCacheObj.approximatePolygon( createCircleContour( 50 ), 4 )
+
+	assert approximatedPolygonCacheObj.getStatistic()[ 'numberOfEntry' ] == 0
+
+def test_cache_evicts_least_recently_used_entry():
+
+	# budget holds about one entry
+	approximatedPolygonCacheObj = ApproximatedPolygonCache()
+	approximatedPolygonCacheObj.enable( memoryBudgetByteInt=300 )
+	for radiusInt in [ 30, 40, 50 ]:
+		approximatedPolygonCacheObj.approximatePolygon( createCircleContour( radiusInt ), 4 )
+
+	statisticDict = approximatedPolygonCacheObj.getStatistic()
+	assert statisticDict[ 'usedByteInt' ] <= 300
+	assert statisticDict[ 'numberOfEviction' ] >= 2
+
+def test_enable_from_another_thread_while_approximating():
+
+	# switch cache on and off while worker thread approximate
+	contourList = [ createCircleContour( radiusInt ) for radiusInt in range( 20, 60 ) ]
+	approximatedPolygonCacheObj = ApproximatedPolygonCache()
+	errorList = []
+
+	def approximateEveryContour():
+		try:
+			for _ in range( 20 ):
+				for contour in contourList:
+					approximatedPolygonCacheObj.approximatePolygon( contour, 4 )
+		except Exception as error:
+			errorList.append( error )
+
+	threadList = [ threading.Thread( target=approximateEveryContour ) for _ in range( 4 ) ]
+	for thread in threadList:
+		thread.start()
+	for index in range( 200 ):
+		if index % 2:
+			approximatedPolygonCacheObj.disable()
+		else:
+			approximatedPolygonCacheObj.enable()
+	for thread in threadList:
+		thread.join()
+
+	assert errorList == []
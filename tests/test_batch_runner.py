@@ -0,0 +1,54 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# read result
+import json
+
+import os
+
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from batch_runner import runBatch
+from detection_pipeline import processFrame
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# field image of repository
+FieldImagePathStr = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'field_image_from_manual.png' )
+
+def test_result_is_written_in_input_order( tmp_path ):
+
+	# two image and a file which can not be decoded
+	imagePathList = list()
+	expectedPoseListList = list()
+	for imageIndex in range( 2 ):
+		image = np.roll( cv2.imread( FieldImagePathStr ), 40 * imageIndex, axis=0 )
+		imagePathList.append( str( tmp_path / 'image_{}.png'.format( imageIndex ) ) )
+		cv2.imwrite( imagePathList[ -1 ], image )
+		expectedPoseListList.append( json.loads( json.dumps( processFrame( image ) ) ) )
+	imagePathList.insert( 1, str( tmp_path / 'broken.png' ) )
+	( tmp_path / 'broken.png' ).write_bytes( b'not an image' )
+
+	outputPathStr = str( tmp_path / 'result.jsonl' )
+	assert runBatch( imagePathList, outputPathStr, numberOfWorker=2, chunkSizeInt=1 ) == 3
+
+	with open( outputPathStr ) as outputFile:
+		resultDictList = [ json.loads( lineStr ) for lineStr in outputFile ]
+	assert [ resultDict[ 'imagePathStr' ] for resultDict in resultDictList ] == imagePathList
+	assert [ resultDict[ 'poseList' ] for resultDict in resultDictList ] == [ expectedPoseListList[ 0 ], None, expectedPoseListList[ 1 ] ]
@@ -0,0 +1,92 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# every pair of threshold
+import itertools
+
+import numpy as np
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from binarization import Binarizer, calculateMultiLevelThresholdList, processFrameWithBinarizer
+from detection_pipeline import processFrame
+from synthetic_field import generateSyntheticField
+
+def createGrayScaleImage( seedInt=0 ):
+	''' - grayscale synthetic scene with noise, so every gray level is used
+	'''
+	image, _ = generateSyntheticField( 640, 480, 3, 3, 3, seedInt=seedInt )
+	noiseArray = np.random.default_rng( seedInt ).integers( -20, 21, size=image.shape[ : 2 ] )
+	return np.clip( cv2.cvtColor( image, cv2.COLOR_BGR2GRAY ).astype( np.int16 ) + noiseArray, 0, 255 ).astype( np.uint8 )
+
+def calculateBetweenClassScore( histogramArray, thresholdList ):
+	''' - sum of weight * mean ** 2 of each class, pixel above threshold belongs to next class
+	'''
+	grayLevelArray = np.arange( 256 )
+	scoreFloat = 0.0
+	for startInt, endInt in zip( [ 0 ] + [ thresholdInt + 1 for thresholdInt in thresholdList ], [ thresholdInt + 1 for thresholdInt in thresholdList ] + [ 256 ] ):
+		weightFloat = histogramArray[ startInt : endInt ].sum()
+		if weightFloat > 0:
+			scoreFloat += ( histogramArray[ startInt : endInt ] * grayLevelArray[ startInt : endInt ] ).sum() ** 2 / weightFloat
+	return scoreFloat
+
+@pytest.mark.parametrize( 'seedInt', range( 3 ) )
+def test_otsu_matches_cv2( seedInt ):
+
+	# one histogram threshold is cv2 otsu
+	grayScaleImage = createGrayScaleImage( seedInt )
+	otsuThresholdFloat, otsuBinaryImage = cv2.threshold( grayScaleImage, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU )
+	binarizerObj = Binarizer( 'otsu' )
+
+	assert np.array_equal( binarizerObj.binarize( grayScaleImage )[ 0 ], otsuBinaryImage )
+	assert binarizerObj.getStatistic()[ 'levelList' ] == [ int( otsuThresholdFloat ) ]
+
+@pytest.mark.parametrize( 'methodStr, adaptiveMethod', [ ( 'adaptiveMean', cv2.ADAPTIVE_THRESH_MEAN_C ), ( 'adaptiveGaussian', cv2.ADAPTIVE_THRESH_GAUSSIAN_C ) ] )
+def test_adaptive_matches_cv2( methodStr, adaptiveMethod ):
+
+	# every offset shares one local mean
+	grayScaleImage = createGrayScaleImage()
+	binaryImageList = Binarizer( methodStr, blockSizeInt=31, offsetList=[ -3, 0, 5 ] ).binarize( grayScaleImage )
+
+	for offsetInt, binaryImage in zip( [ -3, 0, 5 ], binaryImageList ):
+		assert np.array_equal( binaryImage, cv2.adaptiveThreshold( grayScaleImage, 255, adaptiveMethod, cv2.THRESH_BINARY, 31, offsetInt ) )
+
+def test_multi_level_threshold_is_best_split():
+
+	# best two threshold by exhaustive search
+	grayScaleImage = createGrayScaleImage()
+	histogramArray = np.bincount( grayScaleImage.ravel(), minlength=256 ).astype( np.float64 )
+	bestScoreFloat = max( calculateBetweenClassScore( histogramArray, list( thresholdTuple ) ) for thresholdTuple in itertools.combinations( range( 255 ), 2 ) )
+
+	thresholdList = calculateMultiLevelThresholdList( grayScaleImage, 2 )
+	assert len( thresholdList ) == 2 and thresholdList[ 0 ] < thresholdList[ 1 ]
+	assert calculateBetweenClassScore( histogramArray, thresholdList ) == pytest.approx( bestScoreFloat, rel=1e-12 )
+
+def test_global_binarizer_matches_processFrame():
+
+	# default global threshold is the one of single pipeline
+	image, _ = generateSyntheticField( 1280, 720, 6, 6, 6, seedInt=0 )
+
+	assert processFrameWithBinarizer( image, Binarizer() ) == processFrame( image )
+
+def test_multi_level_keeps_marker_once():
+
+	# marker is found in every level, it is kept once
+	image, markerList = generateSyntheticField( 1280, 720, 6, 6, 6, nestedRatioFloat=0.0, seedInt=0 )
+	binarizerObj = Binarizer( 'multiLevel', thresholdList=[ 100, 127, 150 ] )
+	poseList = processFrameWithBinarizer( image, binarizerObj )
+	binarizerObj.close()
+
+	assert sorted( poseDict[ 'shapeTypeStr' ] for poseDict in poseList ) == sorted( shapeTypeStr for shapeTypeStr, _, _ in markerList )
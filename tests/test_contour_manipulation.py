@@ -0,0 +1,63 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from contour_manipulation import Contour, calculateCenterPointArray
+from detection_pipeline import convertToBinaryImage, createContourStorage, detectOuterMostContour
+from synthetic_field import generateSyntheticField
+
+def test_center_point_array_matches_cv2_moments():
+
+	# every contour of a synthetic scene, including tiny and nested one
+	image, _ = generateSyntheticField( 1280, 720, 6, 6, 6, seedInt=1 )
+	contourList, _ = cv2.findContours( convertToBinaryImage( image ), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE )
+	contourList = [ contour for contour in contourList if cv2.moments( contour )[ 'm00' ] != 0 ]
+
+	expectedCenterPointList = list()
+	for contour in contourList:
+		moment = cv2.moments( contour )
+		expectedCenterPointList.append( [ int( moment[ 'm10' ] / moment[ 'm00' ] ), int( moment[ 'm01' ] / moment[ 'm00' ] ) ] )
+
+	assert len( contourList ) > 18
+	assert calculateCenterPointArray( contourList ).tolist() == expectedCenterPointList
+
+def test_contour_without_area_falls_back_to_bounding_box_center():
+
+	# horizontal line, single point and contour with area
+	lineContour = np.array( [ [ [ 10, 20 ] ], [ [ 41, 20 ] ] ], dtype=np.int32 )
+	pointContour = np.array( [ [ [ 5, 7 ] ] ], dtype=np.int32 )
+	squareContour = np.array( [ [ [ 0, 0 ] ], [ [ 0, 10 ] ], [ [ 10, 10 ] ], [ [ 10, 0 ] ] ], dtype=np.int32 )
+
+	expectedCenterPointList = list()
+	for contour in [ lineContour, pointContour, squareContour ]:
+		contourObj = Contour( contour )
+		contourObj.calculateCenterPoint()
+		expectedCenterPointList.append( list( contourObj.centerPointTuple ) )
+
+	assert calculateCenterPointArray( [ lineContour, pointContour, squareContour ] ).tolist() == expectedCenterPointList
+	assert expectedCenterPointList[ : 2 ] == [ [ 26, 20 ], [ 5, 7 ] ]
+
+def test_coordinate_frame_array_matches_stored_coordinate_frame():
+
+	# outer most contour has coordinate frame stored by detection
+	image, _ = generateSyntheticField( 1280, 720, 6, 6, 6, seedInt=2 )
+	contourStorageObj = detectOuterMostContour( createContourStorage( convertToBinaryImage( image ) ) )
+	contourObjList = contourStorageObj.outerMostCircleContourObjList + contourStorageObj.outerMostTriangleContourObjList + contourStorageObj.outerMostSquareContourObjList
+	centerPointArray, xAxisEndPointArray, yAxisEndPointArray = contourStorageObj.calculateCoordinateFrameArray( contourObjList )
+
+	assert centerPointArray.tolist() == [ list( contourObj.centerPointTuple ) for contourObj in contourObjList ]
+	assert xAxisEndPointArray.tolist() == [ list( contourObj.xAxisEndPointTuple ) for contourObj in contourObjList ]
+	assert yAxisEndPointArray.tolist() == [ list( contourObj.yAxisEndPointTuple ) for contourObj in contourObjList ]
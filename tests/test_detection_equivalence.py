@@ -0,0 +1,68 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+# read expected pose
+import json
+
+import os
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame
+from synthetic_field import generateSyntheticField
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# repository root
+RepositoryDirectoryPathStr = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+# pose of each image found by the original single image pipeline, threshold 127, RETR_LIST, area 1000 to 300000,
+# shape rule and outer most filter with epsilon 4 / 5 / 4
+BaselinePosePathStr = os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), 'detection_baseline_pose.json' )
+
+# seed of synthetic scene, each scene is 1280 x 720 with 6 circle, 6 triangle and 6 square
+SyntheticSeedIntList = [ 0, 1, 2, 3 ]
+
+def loadBaselinePose():
+	''' - image name to pose list of original pipeline
+	'''
+	with open( BaselinePosePathStr ) as baselinePoseFile:
+		return json.load( baselinePoseFile )
+
+def convertToSortedPoseTupleList( poseList ):
+	''' - pose as sorted tuple, so pose order inside a shape type does not matter, area is rounded
+	'''
+	return sorted( ( poseDict[ 'shapeTypeStr' ], tuple( poseDict[ 'centerPointTuple' ] ), tuple( poseDict[ 'xAxisEndPointTuple' ] ),
+					 tuple( poseDict[ 'yAxisEndPointTuple' ] ), round( poseDict[ 'area' ], 3 ) ) for poseDict in poseList )
+
+def test_processFrame_matches_baseline_on_field_image():
+
+	# field image of repository
+	image = cv2.imread( os.path.join( RepositoryDirectoryPathStr, 'field_image_from_manual.png' ) )
+	assert image is not None
+
+	assert convertToSortedPoseTupleList( processFrame( image ) ) == convertToSortedPoseTupleList( loadBaselinePose()[ 'field_image_from_manual.png' ] )
+
+@pytest.mark.parametrize( 'seedInt', SyntheticSeedIntList )
+def test_processFrame_matches_baseline_on_synthetic_field( seedInt ):
+
+	# same seed gives the same scene
+	image, _ = generateSyntheticField( 1280, 720, 6, 6, 6, seedInt=seedInt )
+
+	assert convertToSortedPoseTupleList( processFrame( image ) ) == convertToSortedPoseTupleList( loadBaselinePose()[ 'synthetic_{}'.format( seedInt ) ] )
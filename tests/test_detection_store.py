@@ -0,0 +1,104 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import os
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame
+from detection_store import DetectionStoreWriter, DetectionStore, getColumnPathStr
+from synthetic_field import generateSyntheticSequence
+
+def createPoseListList( numberOfFrame, seedInt=0 ):
+	''' - pose of each frame of a small synthetic sequence
+	'''
+	return [ processFrame( frame ) for _, frame in generateSyntheticSequence( 640, 480, 2, 2, 2, numberOfFrame, seedInt=seedInt ) ]
+
+def convertToPoseTupleList( poseList ):
+	''' - pose as tuple, stored pose is read back with the same value
+	'''
+	return [ ( poseDict[ 'shapeTypeStr' ], tuple( poseDict[ 'centerPointTuple' ] ), tuple( poseDict[ 'xAxisEndPointTuple' ] ),
+			   tuple( poseDict[ 'yAxisEndPointTuple' ] ), poseDict[ 'area' ] ) for poseDict in poseList ]
+
+def test_stored_pose_is_read_back( tmp_path ):
+
+	# small flush size so several chunk is appended
+	poseListList = createPoseListList( 4 )
+	with DetectionStoreWriter( str( tmp_path ), flushEveryRowInt=5 ) as detectionStoreWriterObj:
+		for frameIdInt, poseList in enumerate( poseListList ):
+			detectionStoreWriterObj.appendPoseList( frameIdInt, poseList )
+
+	detectionStoreObj = DetectionStore( str( tmp_path ) )
+	assert len( detectionStoreObj ) == sum( len( poseList ) for poseList in poseListList )
+	assert detectionStoreObj.getFrameIdArray().tolist() == [ 0, 1, 2, 3 ]
+	for frameIdInt, poseList in enumerate( poseListList ):
+		assert convertToPoseTupleList( detectionStoreObj.getPoseList( frameIdInt ) ) == convertToPoseTupleList( poseList )
+
+def test_reopened_store_appends_after_stored_frame( tmp_path ):
+
+	# two run on the same store
+	poseListList = createPoseListList( 3 )
+	for _ in range( 2 ):
+		with DetectionStoreWriter( str( tmp_path ) ) as detectionStoreWriterObj:
+			frameIdOffsetInt = detectionStoreWriterObj.nextFrameIdInt
+			for frameIndex, poseList in enumerate( poseListList ):
+				detectionStoreWriterObj.appendPoseList( frameIdOffsetInt + frameIndex, poseList )
+
+	detectionStoreObj = DetectionStore( str( tmp_path ) )
+	assert detectionStoreObj.getFrameIdArray().tolist() == list( range( 6 ) )
+	assert convertToPoseTupleList( detectionStoreObj.getPoseList( 4 ) ) == convertToPoseTupleList( poseListList[ 1 ] )
+
+def test_frame_id_must_not_decrease( tmp_path ):
+
+	# frame 3 then frame 2
+	with DetectionStoreWriter( str( tmp_path ) ) as detectionStoreWriterObj:
+		detectionStoreWriterObj.appendPoseList( 3, list() )
+		with pytest.raises( AssertionError ):
+			detectionStoreWriterObj.appendPoseList( 2, list() )
+
+def test_half_written_row_is_cut_off_on_reopen( tmp_path ):
+
+	# store with complete row
+	poseListList = createPoseListList( 2 )
+	with DetectionStoreWriter( str( tmp_path ) ) as detectionStoreWriterObj:
+		detectionStoreWriterObj.appendPoseList( 0, poseListList[ 0 ] )
+	numberOfRowInt = len( poseListList[ 0 ] )
+
+	# interrupted flush wrote one more row to frame id column and part of a row to area column
+	with open( getColumnPathStr( str( tmp_path ), 'frameId' ), 'ab' ) as columnFile:
+		columnFile.write( bytes( 8 ) )
+	with open( getColumnPathStr( str( tmp_path ), 'area' ), 'ab' ) as columnFile:
+		columnFile.write( bytes( 3 ) )
+
+	# reader skips torn row
+	assert len( DetectionStore( str( tmp_path ) ) ) == numberOfRowInt
+
+	# writer cuts it off, appended row lines up across column
+	with DetectionStoreWriter( str( tmp_path ) ) as detectionStoreWriterObj:
+		assert os.path.getsize( getColumnPathStr( str( tmp_path ), 'frameId' ) ) == numberOfRowInt * 8
+		detectionStoreWriterObj.appendPoseList( detectionStoreWriterObj.nextFrameIdInt, poseListList[ 1 ] )
+
+	detectionStoreObj = DetectionStore( str( tmp_path ) )
+	assert len( detectionStoreObj ) == numberOfRowInt + len( poseListList[ 1 ] )
+	assert convertToPoseTupleList( detectionStoreObj.getPoseList( 1 ) ) == convertToPoseTupleList( poseListList[ 1 ] )
+
+def test_trailing_frame_without_detection_keeps_high_water_mark( tmp_path ):
+
+	# last two frame has no detection
+	poseListList = createPoseListList( 3 ) + [ list(), list() ]
+	with DetectionStoreWriter( str( tmp_path ) ) as detectionStoreWriterObj:
+		for frameIdInt, poseList in enumerate( poseListList ):
+			detectionStoreWriterObj.appendPoseList( frameIdInt, poseList )
+
+	# next run starts after every frame, not after the last frame with detection
+	with DetectionStoreWriter( str( tmp_path ) ) as detectionStoreWriterObj:
+		assert detectionStoreWriterObj.nextFrameIdInt == 5
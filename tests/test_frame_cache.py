@@ -0,0 +1,77 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import os
+
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame, convertToBinaryImage
+from frame_cache import buildFrameCache, FrameCache, FrameCacheIndexFileNameStr
+from frame_source import iterateFrameFromSource
+from synthetic_field import generateSyntheticSequence
+
+def createFrameList( numberOfFrame ):
+	''' - BGR frame of a small synthetic sequence
+	'''
+	return [ frame for _, frame in generateSyntheticSequence( 640, 480, 2, 2, 2, numberOfFrame, seedInt=0 ) ]
+
+def test_cached_frame_gives_the_same_pose( tmp_path ):
+
+	# gray cache read back as stream source
+	frameList = createFrameList( 3 )
+	assert buildFrameCache( enumerate( frameList ), str( tmp_path ) ) == 3
+
+	cachedFrameList = list( iterateFrameFromSource( str( tmp_path ) ) )
+	assert [ frameIndex for frameIndex, _ in cachedFrameList ] == [ 0, 1, 2 ]
+	for frame, ( _, cachedFrame ) in zip( frameList, cachedFrameList ):
+		assert np.array_equal( cachedFrame, cv2.cvtColor( frame, cv2.COLOR_BGR2GRAY ) )
+		assert processFrame( cachedFrame ) == processFrame( frame )
+
+def test_binary_cache_stores_thresholded_frame( tmp_path ):
+
+	# binary frame after thresholding
+	frameList = createFrameList( 2 )
+	buildFrameCache( enumerate( frameList ), str( tmp_path ), 'binary', 100 )
+
+	frameCacheObj = FrameCache( str( tmp_path ) )
+	assert frameCacheObj.frameTypeStr == 'binary' and frameCacheObj.thresholdInt == 100
+	assert np.array_equal( frameCacheObj.getFrame( 1 )[ 1 ], convertToBinaryImage( frameList[ 1 ], 100 ) )
+
+def test_appended_frame_index_continues_after_cached_frame( tmp_path ):
+
+	# the same source appended twice
+	frameList = createFrameList( 2 )
+	for _ in range( 2 ):
+		buildFrameCache( enumerate( frameList ), str( tmp_path ) )
+
+	frameCacheObj = FrameCache( str( tmp_path ) )
+	assert [ frameIndex for frameIndex, _ in frameCacheObj.iterateFrame() ] == [ 0, 1, 2, 3 ]
+	assert np.array_equal( frameCacheObj.getFrame( 3 )[ 1 ], frameCacheObj.getFrame( 1 )[ 1 ] )
+
+def test_half_written_index_row_is_cut_off_on_append( tmp_path ):
+
+	# interrupted append left part of an index row
+	frameList = createFrameList( 2 )
+	buildFrameCache( enumerate( frameList[ : 1 ] ), str( tmp_path ) )
+	with open( os.path.join( str( tmp_path ), FrameCacheIndexFileNameStr ), 'ab' ) as indexFile:
+		indexFile.write( bytes( 5 ) )
+
+	# reader skips it, writer cuts it off so the next row lines up
+	assert len( FrameCache( str( tmp_path ) ) ) == 1
+	buildFrameCache( enumerate( frameList[ 1 : ] ), str( tmp_path ) )
+
+	frameCacheObj = FrameCache( str( tmp_path ) )
+	assert [ frameIndex for frameIndex, _ in frameCacheObj.iterateFrame() ] == [ 0, 1 ]
+	assert np.array_equal( frameCacheObj.getFrame( 1 )[ 1 ], cv2.cvtColor( frameList[ 1 ], cv2.COLOR_BGR2GRAY ) )
@@ -0,0 +1,67 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import os
+
+import numpy as np
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame, streamPoseFromFrame
+from frame_source import iterateFrameFromSource, listImagePathInDir
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# field image of repository
+FieldImagePathStr = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'field_image_from_manual.png' )
+
+def createFrameList( numberOfFrame ):
+	''' - field image shifted a little more in each frame
+	'''
+	image = cv2.imread( FieldImagePathStr )
+	return [ np.roll( image, 9 * frameIndex, axis=1 ) for frameIndex in range( numberOfFrame ) ]
+
+def test_image_directory_is_read_in_file_name_order( tmp_path ):
+
+	# image file, file which is not an image and image which can not be decoded
+	frameList = [ cv2.resize( frame, ( 320, 240 ) ) for frame in createFrameList( 3 ) ]
+	for frameIndex, frame in enumerate( frameList ):
+		cv2.imwrite( str( tmp_path / 'frame_{}.png'.format( frameIndex ) ), frame )
+	( tmp_path / 'frame_1_broken.png' ).write_bytes( b'not an image' )
+	( tmp_path / 'note.txt' ).write_text( 'not an image' )
+
+	assert [ path.rsplit( '/', 1 )[ -1 ] for path in listImagePathInDir( str( tmp_path ) ) ] == [ 'frame_0.png', 'frame_1.png', 'frame_1_broken.png', 'frame_2.png' ]
+
+	# broken image is skipped, frame index still follows file position
+	framePairList = list( iterateFrameFromSource( str( tmp_path ) ) )
+	assert [ frameIndex for frameIndex, _ in framePairList ] == [ 0, 1, 3 ]
+	assert all( np.array_equal( frame, expectedFrame ) for ( _, frame ), expectedFrame in zip( framePairList, frameList ) )
+
+def test_video_file_which_can_not_be_opened_raises( tmp_path ):
+
+	# missing video
+	with pytest.raises( IOError ):
+		next( iterateFrameFromSource( str( tmp_path / 'missing.avi' ) ) )
+
+def test_stream_gives_the_same_pose_as_processFrame():
+
+	# frame index is passed through
+	frameList = createFrameList( 3 )
+
+	assert list( streamPoseFromFrame( enumerate( frameList ) ) ) == [ ( frameIndex, processFrame( frame ) ) for frameIndex, frame in enumerate( frameList ) ]
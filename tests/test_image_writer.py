@@ -0,0 +1,68 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import numpy as np
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from image_writer import AsyncImageWriter
+
+def test_image_is_written_with_selected_format( tmp_path ):
+
+	# extension is replaced by the one of selected format
+	image = np.full( ( 40, 60, 3 ), 128, dtype=np.uint8 )
+	with AsyncImageWriter( 'png' ) as imageWriter:
+		pathToSaveImageStr = imageWriter.write( str( tmp_path / 'image.jpg' ), image )
+
+	assert pathToSaveImageStr.endswith( '.png' )
+	assert np.array_equal( cv2.imread( pathToSaveImageStr ), image )
+	assert imageWriter.numberOfWrittenImage == 1
+
+def test_copied_image_is_not_changed_by_caller( tmp_path ):
+
+	# caller reuses buffer right after write
+	image = np.zeros( ( 40, 60, 3 ), dtype=np.uint8 )
+	with AsyncImageWriter( 'png', numberOfWorker=1 ) as imageWriter:
+		pathToSaveImageStr = imageWriter.write( str( tmp_path / 'image.png' ), image, isCopyNeeded=True )
+		image[ : ] = 255
+
+	assert cv2.imread( pathToSaveImageStr ).max() == 0
+
+def test_close_raises_for_image_which_can_not_be_written( tmp_path ):
+
+	# directory does not exist
+	imageWriter = AsyncImageWriter( 'png' )
+	imageWriter.write( str( tmp_path / 'missing' / 'image.png' ), np.zeros( ( 4, 4, 3 ), dtype=np.uint8 ) )
+
+	with pytest.raises( IOError ):
+		imageWriter.close()
+	assert len( imageWriter.failedPathList ) == 1
+
+def test_close_without_raise_keeps_failed_path( tmp_path ):
+
+	# failed path is kept either way
+	imageWriter = AsyncImageWriter( 'png' )
+	imageWriter.write( str( tmp_path / 'missing' / 'image.png' ), np.zeros( ( 4, 4, 3 ), dtype=np.uint8 ) )
+	imageWriter.close( isErrorRaised=False )
+
+	assert len( imageWriter.failedPathList ) == 1
+
+def test_body_exception_is_not_hidden_by_write_error( tmp_path ):
+
+	# body fails and an image can not be written
+	with pytest.raises( KeyError ):
+		with AsyncImageWriter( 'png' ) as imageWriter:
+			imageWriter.write( str( tmp_path / 'missing' / 'image.png' ), np.zeros( ( 4, 4, 3 ), dtype=np.uint8 ) )
+			raise KeyError( 'body' )
@@ -0,0 +1,47 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame, extractPoseListFromContourObj
+from incremental_pipeline import IncrementalDetector
+from synthetic_field import generateSyntheticSequence
+
+def convertToSortedPoseTupleList( poseList ):
+	''' - pose as sorted tuple, so pose order does not matter
+	'''
+	return sorted( ( poseDict[ 'shapeTypeStr' ], poseDict[ 'centerPointTuple' ], poseDict[ 'xAxisEndPointTuple' ], poseDict[ 'yAxisEndPointTuple' ] ) for poseDict in poseList )
+
+@pytest.mark.parametrize( 'seedInt', range( 4 ) )
+def test_incremental_matches_processFrame_on_sequence( seedInt ):
+
+	# every marker moves in every frame
+	incrementalDetectorObj = IncrementalDetector()
+	numberOfPartialFrameInt = 0
+	for frameIndex, frame in generateSyntheticSequence( 1280, 720, 8, 8, 8, 20, seedInt=seedInt ):
+		assert convertToSortedPoseTupleList( extractPoseListFromContourObj( incrementalDetectorObj.processFrame( frame ) ) ) == \
+			   convertToSortedPoseTupleList( processFrame( frame ) ), 'frame {}'.format( frameIndex )
+		numberOfPartialFrameInt += not incrementalDetectorObj.isLatestFrameFull
+
+	# region of interest path is used, not only full frame
+	assert numberOfPartialFrameInt > 0
+
+def test_unchanged_frame_is_carried_forward():
+
+	# the same frame twice
+	_, frame = next( generateSyntheticSequence( 640, 480, 2, 2, 2, 1, seedInt=0 ) )
+	incrementalDetectorObj = IncrementalDetector()
+	firstPoseList = extractPoseListFromContourObj( incrementalDetectorObj.processFrame( frame ) )
+	secondPoseList = extractPoseListFromContourObj( incrementalDetectorObj.processFrame( frame.copy() ) )
+
+	assert secondPoseList == firstPoseList
+	assert incrementalDetectorObj.getStatistic()[ 'regionOfInterestList' ] == []
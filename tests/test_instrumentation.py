@@ -0,0 +1,65 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import io
+
+import json
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from instrumentation import StageProfiler
+
+def test_disabled_profiler_records_nothing():
+
+	# profiler is off by default
+	stageProfilerObj = StageProfiler()
+	stageProfilerObj.beginFrame( 0 )
+	with stageProfilerObj.measureStage( 'findContours' ):
+		pass
+	stageProfilerObj.addCount( 'contour', 5 )
+
+	assert stageProfilerObj.endFrame() is None
+	assert stageProfilerObj.stageNameToTotalCallDict == dict() and stageProfilerObj.counterNameToTotalValueDict == dict()
+
+def test_frame_record_is_written_as_json_line():
+
+	# two call of the same stage in one frame is summed
+	jsonLineFile = io.StringIO()
+	stageProfilerObj = StageProfiler()
+	stageProfilerObj.enable( jsonLineFile )
+	for frameId in range( 2 ):
+		stageProfilerObj.beginFrame( frameId )
+		for _ in range( 2 ):
+			with stageProfilerObj.measureStage( 'findContours' ):
+				pass
+		stageProfilerObj.addCount( 'contour', 3 )
+		stageProfilerObj.endFrame()
+
+	frameRecordDictList = [ json.loads( lineStr ) for lineStr in jsonLineFile.getvalue().splitlines() ]
+	assert [ frameRecordDict[ 'frameId' ] for frameRecordDict in frameRecordDictList ] == [ 0, 1 ]
+	assert all( frameRecordDict[ 'counterDict' ] == { 'contour' : 3 } for frameRecordDict in frameRecordDictList )
+	assert all( list( frameRecordDict[ 'stageLatencyMsDict' ] ) == [ 'findContours' ] for frameRecordDict in frameRecordDictList )
+	assert stageProfilerObj.stageNameToTotalCallDict == { 'findContours' : 4 }
+
+def test_prometheus_text_has_total_since_start():
+
+	# cache hit and miss counter
+	stageProfilerObj = StageProfiler()
+	stageProfilerObj.enable()
+	stageProfilerObj.beginFrame( 0 )
+	stageProfilerObj.addCount( 'approximationCache_hit', 3 )
+	stageProfilerObj.addCount( 'approximationCache_miss', 1 )
+	stageProfilerObj.endFrame()
+
+	prometheusTextStr = stageProfilerObj.formatPrometheusText( 'test' )
+	assert 'test_frames_total 1\n' in prometheusTextStr
+	assert 'test_count_total{name="approximationCache_hit"} 3\n' in prometheusTextStr
+	assert stageProfilerObj.getCacheHitRate( 'approximationCache' ) == 0.75
+	assert stageProfilerObj.getCacheHitRate( 'unusedCache' ) is None
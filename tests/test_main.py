@@ -0,0 +1,43 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import os
+
+import subprocess
+
+import sys
+
+import pytest
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# main script of repository
+MainPathStr = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'main.py' )
+
+def runMain( argumentList ):
+	''' - run main.py with argument, return exit code and standard error
+	'''
+	completedProcess = subprocess.run( [ sys.executable, MainPathStr ] + argumentList, capture_output=True, text=True, timeout=120 )
+	return completedProcess.returncode, completedProcess.stderr
+
+@pytest.mark.parametrize( 'argumentList', [ [ '--stream', 'missing.avi', '--threaded', '--profile', 'profile.jsonl' ],
+										   [ '--stream', 'missing.avi', '--threaded', '--incremental' ],
+										   [ '--stream', 'missing.avi', '--incremental', '--track' ],
+										   [ '--stream', 'missing.avi', '--track', '--roi' ],
+										   [ '--stream', 'missing.avi', '--roi', '--pyramid' ],
+										   [ '--build-frame-cache', 'frame_cache' ],
+										   [ '--stream', 'missing.avi', '--binarization', 'otsu', '--incremental' ] ] )
+def test_conflicting_option_is_rejected( argumentList ):
+
+	# argparse exits with code 2 before any frame is read
+	returnCodeInt, stderrStr = runMain( argumentList )
+
+	assert returnCodeInt == 2
+	assert 'error:' in stderrStr
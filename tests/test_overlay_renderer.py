@@ -0,0 +1,71 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import os
+
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import convertToBinaryImage, createContourStorage, detectOuterMostContour
+from overlay_renderer import OverlayRenderer, LayerNameTuple
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# field image of repository
+FieldImagePathStr = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'field_image_from_manual.png' )
+
+def createRendererInput():
+	''' - field image and its contour storage after outer most filter
+	'''
+	image = cv2.imread( FieldImagePathStr )
+	return image, detectOuterMostContour( createContourStorage( convertToBinaryImage( image ) ) )
+
+def test_layer_is_drawn_on_copy_of_original_image():
+
+	# square contour layer drawn by hand on a copy
+	image, contourStorageObj = createRendererInput()
+	originalImage = image.copy()
+	expectedImage = image.copy()
+	for contourObj in contourStorageObj.squareContourObjList:
+		cv2.drawContours( expectedImage, [ contourObj.contour ], 0, ( 0, 0, 255 ), 3 )
+
+	assert np.array_equal( OverlayRenderer( image, contourStorageObj ).renderLayer( 'square contour' ), expectedImage )
+	assert np.array_equal( image, originalImage )
+
+def test_canvas_is_reused_and_reset_between_render():
+
+	# the same buffer for every layer, previous layer does not leak into the next one
+	image, contourStorageObj = createRendererInput()
+	overlayRendererObj = OverlayRenderer( image, contourStorageObj )
+	firstCanvas = overlayRendererObj.renderLayer( 'outer most circle contour' )
+	secondCanvas = overlayRendererObj.renderLayer( 'contour in area range' )
+
+	assert firstCanvas is secondCanvas
+	assert np.array_equal( secondCanvas, OverlayRenderer( image, contourStorageObj ).renderLayer( 'contour in area range' ) )
+
+def test_combined_overlay_draws_only_enabled_layer():
+
+	# nothing enabled gives original image
+	image, contourStorageObj = createRendererInput()
+	overlayRendererObj = OverlayRenderer( image, contourStorageObj, enabledLayerNameList=[] )
+	assert np.array_equal( overlayRendererObj.renderCombined(), image )
+
+	# enabled layer changes image
+	overlayRendererObj.setLayerEnabled( LayerNameTuple[ -1 ], True )
+	assert overlayRendererObj.enabledLayerNameList == [ LayerNameTuple[ -1 ] ]
+	assert not np.array_equal( overlayRendererObj.renderCombined(), image )
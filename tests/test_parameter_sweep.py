@@ -0,0 +1,62 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import csv
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame
+from frame_cache import buildFrameCache
+from parameter_sweep import expandParameterGrid, matchPoseList, runParameterSweep, listFrameCacheSource, DefaultParameterDict, ResultColumnNameList
+from synthetic_field import generateSyntheticSequence
+
+def test_grid_is_ordered_by_threshold_and_keeps_default():
+
+	# two threshold, two min area
+	parameterDictList = expandParameterGrid( { 'minArea' : [ 500, 1000 ], 'thresholdInt' : [ 100, 127 ] } )
+
+	assert [ ( parameterDict[ 'thresholdInt' ], parameterDict[ 'minArea' ] ) for parameterDict in parameterDictList ] == [ ( 100, 500 ), ( 100, 1000 ), ( 127, 500 ), ( 127, 1000 ) ]
+	assert all( parameterDict[ 'maxArea' ] == DefaultParameterDict[ 'maxArea' ] for parameterDict in parameterDictList )
+
+def test_match_pose_list_counts_only_same_shape_close_enough():
+
+	# one match, one wrong shape, one too far
+	poseList = [ { 'shapeTypeStr' : 'circle', 'centerPointTuple' : ( 10, 10 ) },
+				 { 'shapeTypeStr' : 'square', 'centerPointTuple' : ( 100, 100 ) },
+				 { 'shapeTypeStr' : 'triangle', 'centerPointTuple' : ( 300, 300 ) } ]
+	groundTruthMarkerList = [ ( 'circle', ( 12, 11 ) ), ( 'triangle', ( 100, 100 ) ), ( 'triangle', ( 200, 200 ) ) ]
+
+	assert matchPoseList( poseList, groundTruthMarkerList ) == ( 1, 2, 2 )
+
+def test_sweep_on_synthetic_scene_scores_every_image( tmp_path ):
+
+	# synthetic scene has ground truth
+	outputPathStr = str( tmp_path / 'sweep.csv' )
+	resultRowList = runParameterSweep( [ 0, 1 ], { 'thresholdInt' : [ 127 ] }, outputPathStr, numberOfWorker=1 )
+
+	assert resultRowList[ 0 ][ 'scoredImageCount' ] == 2
+	assert resultRowList[ 0 ][ 'recall' ] > 0.9
+	with open( outputPathStr ) as outputFile:
+		assert csv.DictReader( outputFile ).fieldnames == list( DefaultParameterDict ) + ResultColumnNameList
+
+def test_sweep_on_frame_cache_matches_processFrame( tmp_path ):
+
+	# gray frame cache of synthetic sequence
+	frameList = [ frame for _, frame in generateSyntheticSequence( 640, 480, 2, 2, 2, 3, seedInt=0 ) ]
+	buildFrameCache( enumerate( frameList ), str( tmp_path ) )
+	resultRowList = runParameterSweep( listFrameCacheSource( str( tmp_path ) ), dict(), numberOfWorker=1 )
+
+	# default grid point counts the same shape as single frame pipeline, frame cache has no ground truth
+	poseList = [ poseDict for frame in frameList for poseDict in processFrame( frame ) ]
+	assert len( resultRowList ) == 1
+	assert resultRowList[ 0 ][ 'circleCount' ] == sum( poseDict[ 'shapeTypeStr' ] == 'circle' for poseDict in poseList )
+	assert resultRowList[ 0 ][ 'triangleCount' ] == sum( poseDict[ 'shapeTypeStr' ] == 'triangle' for poseDict in poseList )
+	assert resultRowList[ 0 ][ 'squareCount' ] == sum( poseDict[ 'shapeTypeStr' ] == 'square' for poseDict in poseList )
+	assert resultRowList[ 0 ][ 'scoredImageCount' ] == 0 and resultRowList[ 0 ][ 'f1' ] is None
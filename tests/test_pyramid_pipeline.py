@@ -0,0 +1,58 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame, extractPoseListFromContourObj
+from pyramid_pipeline import PyramidDetector, streamPoseFromFramePyramid
+from synthetic_field import generateSyntheticField, generateSyntheticSequence
+
+def convertToSortedPoseTupleList( poseList ):
+	''' - pose as sorted tuple, so pose order does not matter
+	'''
+	return sorted( ( poseDict[ 'shapeTypeStr' ], poseDict[ 'centerPointTuple' ], poseDict[ 'xAxisEndPointTuple' ], poseDict[ 'yAxisEndPointTuple' ] ) for poseDict in poseList )
+
+@pytest.mark.parametrize( 'seedInt', range( 6 ) )
+def test_pyramid_matches_processFrame_on_sequence( seedInt ):
+
+	# small marker whose polygon can have another number of vertex after downscaling
+	pyramidDetectorObj = PyramidDetector()
+	for frameIndex, frame in generateSyntheticSequence( 1280, 720, 8, 8, 8, 20, seedInt=seedInt ):
+		assert convertToSortedPoseTupleList( extractPoseListFromContourObj( pyramidDetectorObj.processFrame( frame ) ) ) == \
+			   convertToSortedPoseTupleList( processFrame( frame ) ), 'frame {}'.format( frameIndex )
+
+@pytest.mark.parametrize( 'pyramidLevelInt', [ 0, 1, 2 ] )
+def test_pyramid_level_matches_processFrame( pyramidLevelInt ):
+
+	# dense scene with nested marker
+	image, _ = generateSyntheticField( 1920, 1080, 10, 10, 10, seedInt=3 )
+
+	assert convertToSortedPoseTupleList( extractPoseListFromContourObj( PyramidDetector( pyramidLevelInt ).processFrame( image ) ) ) == \
+		   convertToSortedPoseTupleList( processFrame( image ) )
+
+def test_pyramid_refines_only_region_around_marker():
+
+	# few marker in large frame
+	frameIndex, frame = next( generateSyntheticSequence( 1920, 1080, 1, 1, 1, 1, seedInt=0 ) )
+	pyramidDetectorObj = PyramidDetector()
+	pyramidDetectorObj.processFrame( frame )
+	statisticDict = pyramidDetectorObj.getStatistic()
+
+	assert statisticDict[ 'numberOfCoarseContour' ] == 3
+	assert 0 < statisticDict[ 'regionOfInterestAreaRatioFloat' ] < 0.5
+
+def test_streamPoseFromFramePyramid_keeps_frame_index():
+
+	# frame index is passed through
+	frameIndexList = [ frameIndex for frameIndex, _ in streamPoseFromFramePyramid( generateSyntheticSequence( 640, 480, 2, 2, 2, 3, seedInt=1 ) ) ]
+
+	assert frameIndexList == [ 0, 1, 2 ]
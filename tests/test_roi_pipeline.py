@@ -0,0 +1,57 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame, extractPoseListFromContourObj, convertToBinaryImage
+from roi_pipeline import RegionOfInterestDetector, createContourStorageInRegionOfInterest, mergeOverlappingRegion, padBoundingBox
+from synthetic_field import generateSyntheticSequence
+
+def convertToSortedPoseTupleList( poseList ):
+	''' - pose as sorted tuple, so pose order does not matter
+	'''
+	return sorted( ( poseDict[ 'shapeTypeStr' ], poseDict[ 'centerPointTuple' ], poseDict[ 'xAxisEndPointTuple' ], poseDict[ 'yAxisEndPointTuple' ] ) for poseDict in poseList )
+
+@pytest.mark.parametrize( 'seedInt', range( 4 ) )
+def test_region_of_interest_matches_processFrame_on_sequence( seedInt ):
+
+	# marker never leaves its padded region, so only region is processed after first frame
+	regionOfInterestDetectorObj = RegionOfInterestDetector()
+	for frameIndex, frame in generateSyntheticSequence( 1280, 720, 4, 4, 4, 20, seedInt=seedInt ):
+		assert convertToSortedPoseTupleList( extractPoseListFromContourObj( regionOfInterestDetectorObj.processFrame( frame ) ) ) == \
+			   convertToSortedPoseTupleList( processFrame( frame ) ), 'frame {}'.format( frameIndex )
+		assert frameIndex == 0 or not regionOfInterestDetectorObj.isLatestFrameFull
+
+@pytest.mark.parametrize( 'seedInt', range( 4 ) )
+def test_region_of_interest_finds_no_extra_marker( seedInt ):
+
+	# new marker outside every region is only found by next full frame scan, nothing is found which is not there
+	regionOfInterestDetectorObj = RegionOfInterestDetector()
+	for frameIndex, frame in generateSyntheticSequence( 1280, 720, 8, 8, 8, 20, seedInt=seedInt ):
+		assert set( convertToSortedPoseTupleList( extractPoseListFromContourObj( regionOfInterestDetectorObj.processFrame( frame ) ) ) ) <= \
+			   set( convertToSortedPoseTupleList( processFrame( frame ) ) ), 'frame {}'.format( frameIndex )
+
+def test_binary_and_color_region_give_the_same_contour():
+
+	# region of the same frame, thresholded by caller or by region function
+	_, frame = next( generateSyntheticSequence( 640, 480, 2, 2, 2, 1, seedInt=2 ) )
+	regionOfInterestList = mergeOverlappingRegion( [ padBoundingBox( ( 100, 100, 150, 150 ), ( 640, 480 ) ), padBoundingBox( ( 300, 200, 200, 200 ), ( 640, 480 ) ) ] )
+	contourStorageObj, cutContourIndexList = createContourStorageInRegionOfInterest( frame, regionOfInterestList )
+	binaryContourStorageObj, binaryCutContourIndexList = createContourStorageInRegionOfInterest( convertToBinaryImage( frame ), regionOfInterestList, isBinaryImage=True )
+
+	assert cutContourIndexList == binaryCutContourIndexList
+	assert [ contour.tolist() for contour in contourStorageObj.allContourList ] == [ contour.tolist() for contour in binaryContourStorageObj.allContourList ]
+
+def test_merged_region_does_not_overlap():
+
+	# chain of overlapping box becomes one region
+	assert mergeOverlappingRegion( [ ( 0, 0, 10, 10 ), ( 20, 0, 10, 10 ), ( 5, 0, 20, 10 ), ( 50, 50, 5, 5 ) ] ) == [ ( 0, 0, 30, 10 ), ( 50, 50, 5, 5 ) ]
@@ -0,0 +1,74 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# mathematical operation
+import math
+
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from shape_tracker import ShapeTracker, streamTrackPoseFromFrame
+from synthetic_field import drawMarker, FieldColorTuple
+
+def createFrame( xOffsetInt, isMarkerDrawn=True ):
+	''' - frame with one circle and one square shifted to the right by offset, or empty field
+	'''
+	image = np.empty( ( 400, 600, 3 ), dtype=np.uint8 )
+	image[ : ] = FieldColorTuple
+	if isMarkerDrawn:
+		drawMarker( image, 'circle', ( 120 + xOffsetInt, 200 ), 60, 0.0, ( 0, 190, 0 ) )
+		drawMarker( image, 'square', ( 380 + xOffsetInt, 200 ), 70, 20.0, ( 0, 80, 170 ) )
+	return image
+
+def test_track_id_is_stable_while_marker_moves():
+
+	# marker moves 5 pixel per frame
+	shapeTrackerObj = ShapeTracker()
+	trackIdSetList = list()
+	for frameIndex in range( 10 ):
+		matchedTrackList = shapeTrackerObj.processFrame( createFrame( 5 * frameIndex ) )
+		trackIdSetList.append( { ( track.shapeTypeStr, track.trackIdInt ) for track in matchedTrackList } )
+
+	assert all( trackIdSet == trackIdSetList[ 0 ] for trackIdSet in trackIdSetList )
+	assert len( trackIdSetList[ 0 ] ) == 2
+	assert all( track.isConfirmed for track in shapeTrackerObj.trackList )
+
+def test_missed_track_is_coasting_with_nan_area():
+
+	# marker disappears for two frame, then comes back
+	frameList = [ createFrame( 0 ), createFrame( 0 ), createFrame( 0 ), createFrame( 0, False ), createFrame( 0, False ), createFrame( 0 ) ]
+	poseListList = [ poseList for _, poseList in streamTrackPoseFromFrame( enumerate( frameList ) ) ]
+
+	# coasting track is still yielded with its latest pose
+	for poseList in poseListList[ 3 : 5 ]:
+		assert sorted( poseDict[ 'trackIdInt' ] for poseDict in poseList ) == [ 0, 1 ]
+		assert all( math.isnan( poseDict[ 'area' ] ) for poseDict in poseList )
+		assert { poseDict[ 'centerPointTuple' ] for poseDict in poseList } == { poseDict[ 'centerPointTuple' ] for poseDict in poseListList[ 2 ] }
+
+	# the same track is matched again
+	assert sorted( poseDict[ 'trackIdInt' ] for poseDict in poseListList[ 5 ] ) == [ 0, 1 ]
+	assert not any( math.isnan( poseDict[ 'area' ] ) for poseDict in poseListList[ 5 ] )
+
+def test_track_is_dropped_after_too_many_miss():
+
+	# track survives maxNumberOfMissInt miss in a row
+	shapeTrackerObj = ShapeTracker( maxNumberOfMissInt=2 )
+	shapeTrackerObj.processFrame( createFrame( 0 ) )
+	for _ in range( 2 ):
+		shapeTrackerObj.processFrame( createFrame( 0, False ) )
+		assert len( shapeTrackerObj.trackList ) == 2
+
+	# one more miss drops it
+	shapeTrackerObj.processFrame( createFrame( 0, False ) )
+	assert shapeTrackerObj.trackList == []
+
+	# marker found again starts new track
+	assert sorted( track.trackIdInt for track in shapeTrackerObj.processFrame( createFrame( 0 ) ) ) == [ 2, 3 ]
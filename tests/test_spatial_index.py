@@ -0,0 +1,63 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import numpy as np
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from contour_manipulation import Contour
+from spatial_index import BoundingBoxGridIndex, isBoundingBoxInside, isBoundingBoxOverlapping, mergeBoundingBox
+
+def createRectangleContourObjList( numberOfContourInt, seedInt=0 ):
+	''' - contour object of random rectangle, some of them larger than one grid cell
+	'''
+	randomGenerator = np.random.default_rng( seedInt )
+	contourObjList = list()
+	for _ in range( numberOfContourInt ):
+		xPosition, yPosition = randomGenerator.integers( 0, 500, size=2 )
+		rectangleWidth, rectangleHeight = randomGenerator.integers( 1, 200, size=2 )
+		contourObjList.append( Contour( np.array( [ [ [ xPosition, yPosition ] ], [ [ xPosition, yPosition + rectangleHeight - 1 ] ],
+												   [ [ xPosition + rectangleWidth - 1, yPosition + rectangleHeight - 1 ] ], [ [ xPosition + rectangleWidth - 1, yPosition ] ] ], dtype=np.int32 ) ) )
+	return contourObjList
+
+def test_query_gives_every_bounding_box_containing_point():
+
+	# candidate of grid index is the same as brute force over every bounding box
+	contourObjList = createRectangleContourObjList( 60 )
+	boundingBoxGridIndexObj = BoundingBoxGridIndex( contourObjList, cellSizeInt=32 )
+
+	for pointTuple in np.random.default_rng( 1 ).integers( -10, 720, size=( 300, 2 ) ).tolist():
+		expectedIdSet = set()
+		for contourObj in contourObjList:
+			xPosition, yPosition, boundingBoxWidth, boundingBoxHeight = cv2.boundingRect( contourObj.contour )
+			if xPosition <= pointTuple[ 0 ] < xPosition + boundingBoxWidth and yPosition <= pointTuple[ 1 ] < yPosition + boundingBoxHeight:
+				expectedIdSet.add( id( contourObj ) )
+		assert { id( contourObj ) for contourObj in boundingBoxGridIndexObj.queryContourObjContainingPoint( tuple( pointTuple ) ) } == expectedIdSet
+
+def test_index_knows_only_stored_contour_obj():
+
+	# contour object outside index
+	contourObjList = createRectangleContourObjList( 3 )
+	boundingBoxGridIndexObj = BoundingBoxGridIndex( contourObjList[ : 2 ] )
+
+	assert boundingBoxGridIndexObj.hasContourObj( contourObjList[ 0 ] )
+	assert not boundingBoxGridIndexObj.hasContourObj( contourObjList[ 2 ] )
+
+def test_bounding_box_helper():
+
+	# touching box does not overlap
+	assert isBoundingBoxOverlapping( ( 0, 0, 10, 10 ), ( 9, 9, 5, 5 ) )
+	assert not isBoundingBoxOverlapping( ( 0, 0, 10, 10 ), ( 10, 0, 5, 5 ) )
+	assert isBoundingBoxInside( ( 2, 2, 8, 8 ), ( 0, 0, 10, 10 ) )
+	assert not isBoundingBoxInside( ( 2, 2, 9, 8 ), ( 0, 0, 10, 10 ) )
+	assert mergeBoundingBox( ( 0, 5, 10, 10 ), ( 20, 0, 5, 5 ) ) == ( 0, 0, 25, 15 )
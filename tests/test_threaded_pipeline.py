@@ -0,0 +1,93 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# image processing
+import cv2
+
+import os
+
+import numpy as np
+
+import pytest
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import processFrame
+from threaded_pipeline import ThreadedPipeline
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# field image of repository
+FieldImagePathStr = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'field_image_from_manual.png' )
+
+def createFrameList( numberOfFrame ):
+	''' - field image shifted a little more in each frame
+	'''
+	image = cv2.imread( FieldImagePathStr )
+	return [ np.roll( image, 9 * frameIndex, axis=1 ) for frameIndex in range( numberOfFrame ) ]
+
+def iterateFrameThenFail( frameList, exception ):
+	''' - yield every frame, then raise exception like a broken video source
+	'''
+	for frameIndex, frame in enumerate( frameList ):
+		yield frameIndex, frame
+	raise exception
+
+def test_pose_is_yielded_in_frame_order():
+
+	# more than one worker can reorder frame inside a stage
+	frameList = createFrameList( 12 )
+	threadedPipeline = ThreadedPipeline( ( ( 10 + frameIndex, frame ) for frameIndex, frame in enumerate( frameList ) ), numberOfWorkerPerStageDict={ 'preprocess' : 3, 'contour' : 3 } )
+	framePoseList = list( threadedPipeline.run() )
+
+	assert [ frameIndex for frameIndex, _ in framePoseList ] == list( range( 10, 22 ) )
+	assert [ poseList for _, poseList in framePoseList ] == [ processFrame( frame ) for frame in frameList ]
+
+def test_stage_failure_is_raised_when_its_frame_is_reached():
+
+	# third frame can not be thresholded
+	frameList = createFrameList( 4 )
+	frameList[ 2 ] = np.zeros( ( 0, 0, 5 ), dtype=np.uint8 )
+	framePoseIterator = ThreadedPipeline( enumerate( frameList ) ).run()
+
+	assert [ next( framePoseIterator )[ 0 ] for _ in range( 2 ) ] == [ 0, 1 ]
+	with pytest.raises( Exception ):
+		next( framePoseIterator )
+
+def test_decoder_failure_is_raised_after_every_decoded_frame():
+
+	# source breaks after three frame
+	frameList = createFrameList( 3 )
+	yieldedFrameIndexList = list()
+	with pytest.raises( IOError ):
+		for frameIndex, _ in ThreadedPipeline( iterateFrameThenFail( frameList, IOError( 'broken source' ) ) ).run():
+			yieldedFrameIndexList.append( frameIndex )
+
+	assert yieldedFrameIndexList == [ 0, 1, 2 ]
+
+def test_every_stage_is_stopped_when_consumer_stops_early():
+
+	# consumer stops after first frame of a long stream
+	frameList = createFrameList( 4 ) * 10
+	threadedPipeline = ThreadedPipeline( enumerate( frameList ), queueSizeInt=2 )
+	framePoseIterator = threadedPipeline.run()
+	next( framePoseIterator )
+	framePoseIterator.close()
+
+	# every worker has left its loop, it only has to return, and the rest of stream is not decoded
+	for stage in threadedPipeline.stageList:
+		for workerThread in stage.workerThreadList:
+			workerThread.join( timeout=5 )
+	assert not any( workerThread.is_alive() for stage in threadedPipeline.stageList for workerThread in stage.workerThreadList )
+	assert threadedPipeline.numberOfDecodedFrame < len( frameList )
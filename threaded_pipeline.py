@@ -0,0 +1,317 @@
+#####################################################################################################
+#
+# Standard Import
+#
+#####################################################################################################
+
+# bounded queue between stage
+import queue
+
+# run stage concurrently
+import threading
+
+# measure stage latency
+import time
+
+#####################################################################################################
+#
+# Local Import
+#
+#####################################################################################################
+
+from detection_pipeline import convertToBinaryImage, findContourTree, detectPoseFromContourTree
+
+#####################################################################################################
+#
+# Constants
+#
+#####################################################################################################
+
+# marker put in queue when there is no more frame
+EndOfStreamMarker = object()
+
+class StageFailure:
+	''' - exception raised while processing one frame, sent down the pipeline in place of its result
+		  so consumer raises it when that frame is reached
+	'''
+
+	def __init__( self, exception ):
+		self.exception = exception
+
+class PipelineStage:
+	''' - one stage of threaded pipeline
+
+		- read ( sequenceIndex, value ) from input queue, apply stage function and put result to output queue
+
+		- cv2 releases GIL while it works, so stage running cv2 function can use more than one worker thread
+	'''
+
+	def __init__( self, stageNameStr, stageFunction, inputQueue, outputQueue, numberOfWorker=1, stopEvent=None ):
+
+		# name of this stage
+		self.stageNameStr = stageNameStr
+
+		# function to apply on each value
+		self.stageFunction = stageFunction
+
+		# input and output queue
+		self.inputQueue = inputQueue
+		self.outputQueue = outputQueue
+
+		# number of worker thread
+		self.numberOfWorker = numberOfWorker
+
+		# set when consumer stopped, value is then dropped instead of processed
+		self.stopEvent = stopEvent if stopEvent is not None else threading.Event()
+
+		# number of worker thread which still running
+		self.numberOfRunningWorker = numberOfWorker
+
+		# number of processed value
+		self.numberOfProcessedValue = 0
+
+		# total time used by stage function ( in second )
+		self.totalLatencyFloat = 0.0
+
+		# lock to update statistic and running worker
+		self.lock = threading.Lock()
+
+		# worker thread storage
+		self.workerThreadList = list()
+
+	def start( self ):
+		''' - start all worker thread
+		'''
+
+		# loop through each worker
+		for workerPosition in range( self.numberOfWorker ):
+
+			# create and start worker thread
+			workerThread = threading.Thread( target=self._runWorker, name='{}-{}'.format( self.stageNameStr, workerPosition ), daemon=True )
+			workerThread.start()
+			self.workerThreadList.append( workerThread )
+
+	def _runWorker( self ):
+		''' - process value from input queue until end of stream
+		'''
+
+		while True:
+
+			# get next value
+			item = self.inputQueue.get()
+
+			# end of stream, let other worker of this stage see it too
+			if item is EndOfStreamMarker:
+				self.inputQueue.put( EndOfStreamMarker )
+				break
+
+			sequenceIndex, value = item
+
+			# consumer stopped, only drain input queue so upstream stage is not blocked
+			if self.stopEvent.is_set():
+				continue
+
+			# this frame failed in a previous stage, pass failure on
+			if isinstance( value, StageFailure ):
+				self.outputQueue.put( ( sequenceIndex, value ) )
+				continue
+
+			try:
+
+				# apply stage function and measure its latency
+				startTimeFloat = time.perf_counter()
+				result = self.stageFunction( value )
+				latencyFloat = time.perf_counter() - startTimeFloat
+
+			except Exception as exception:
+
+				# send exception in place of result, consumer raises it when this frame is reached
+				self.outputQueue.put( ( sequenceIndex, StageFailure( exception ) ) )
+				continue
+
+			# update statistic
+			with self.lock:
+				self.numberOfProcessedValue += 1
+				self.totalLatencyFloat += latencyFloat
+
+			# send result to next stage
+			self.outputQueue.put( ( sequenceIndex, result ) )
+
+		# the last worker tells next stage that there is no more frame
+		with self.lock:
+			self.numberOfRunningWorker -= 1
+			isLastWorker = self.numberOfRunningWorker == 0
+		if isLastWorker:
+			self.outputQueue.put( EndOfStreamMarker )
+
+	@property
+	def averageLatencyMsFloat( self ):
+		''' - average latency of stage function ( in millisecond )
+		'''
+
+		# nothing is processed yet
+		if self.numberOfProcessedValue == 0:
+			return 0.0
+
+		return self.totalLatencyFloat / self.numberOfProcessedValue * 1000
+
+class ThreadedPipeline:
+	''' - staged pipeline with bounded queue between stage so several frame are in flight at the same time
+
+		- stage:
+			- decode --> read frame from frame iterator
+			- preprocess --> grayscale and threshold
+			- contour --> findContours
+			- classify --> ContourStorage, shape classification, outer most filter and pose
+
+		- exception in any stage is raised by run when its frame is reached, not after the whole stream
+	'''
+
+	def __init__( self, frameIterator, queueSizeInt=4, numberOfWorkerPerStageDict=None ):
+
+		# frame iterator yield ( frameIndex, frame )
+		self.frameIterator = frameIterator
+
+		# number of worker of each cv2 stage
+		numberOfWorkerPerStageDict = numberOfWorkerPerStageDict or dict()
+
+		# bounded queue between stage
+		self.decodedQueue = queue.Queue( maxsize=queueSizeInt )
+		self.binaryQueue = queue.Queue( maxsize=queueSizeInt )
+		self.contourQueue = queue.Queue( maxsize=queueSizeInt )
+		self.poseQueue = queue.Queue( maxsize=queueSizeInt )
+
+		# queue name to queue
+		self.queueNameToQueueDict = { 'decoded' : self.decodedQueue,
+									  'binary' : self.binaryQueue,
+									  'contour' : self.contourQueue,
+									  'pose' : self.poseQueue }
+
+		# number of decoded frame, also used as sequence index of next frame
+		self.numberOfDecodedFrame = 0
+
+		# sequence index to frame index given by frame iterator
+		self.sequenceIndexToFrameIndexDict = dict()
+
+		# set when consumer stopped, every stage then stops
+		self.stopEvent = threading.Event()
+
+		# total time used to decode frame ( in second )
+		self.totalDecodeLatencyFloat = 0.0
+
+		# processing stage
+		self.stageList = [ PipelineStage( 'preprocess', convertToBinaryImage, self.decodedQueue, self.binaryQueue, numberOfWorkerPerStageDict.get( 'preprocess', 1 ), self.stopEvent ),
+						   PipelineStage( 'contour', findContourTree, self.binaryQueue, self.contourQueue, numberOfWorkerPerStageDict.get( 'contour', 1 ), self.stopEvent ),
+						   PipelineStage( 'classify', lambda contourTree: detectPoseFromContourTree( *contourTree ), self.contourQueue, self.poseQueue, 1, self.stopEvent ) ]
+
+	def _runDecoder( self ):
+		''' - read frame from frame iterator and put it in decoded queue
+		'''
+
+		try:
+			while True:
+
+				# decode next frame and measure its latency
+				startTimeFloat = time.perf_counter()
+				item = next( self.frameIterator, None )
+				latencyFloat = time.perf_counter() - startTimeFloat
+
+				# no more frame, or consumer stopped
+				if item is None or self.stopEvent.is_set():
+					break
+
+				frameIndex, frame = item
+				sequenceIndex = self.numberOfDecodedFrame
+
+				# update statistic
+				self.sequenceIndexToFrameIndexDict[ sequenceIndex ] = frameIndex
+				self.numberOfDecodedFrame += 1
+				self.totalDecodeLatencyFloat += latencyFloat
+
+				# send frame to next stage
+				self.decodedQueue.put( ( sequenceIndex, frame ) )
+
+		except Exception as exception:
+
+			# send exception as next frame, consumer raises it after every frame decoded before it
+			sequenceIndex = self.numberOfDecodedFrame
+			self.sequenceIndexToFrameIndexDict[ sequenceIndex ] = None
+			self.numberOfDecodedFrame += 1
+			self.decodedQueue.put( ( sequenceIndex, StageFailure( exception ) ) )
+
+		# tell next stage that there is no more frame
+		self.decodedQueue.put( EndOfStreamMarker )
+
+	def run( self ):
+		''' - start all stage and yield pose of each frame in frame order
+
+			YIELD:
+				- ( frameIndex, poseList ) ( tuple )
+		'''
+
+		# start decoder thread
+		threading.Thread( target=self._runDecoder, name='decode', daemon=True ).start()
+
+		# start processing stage
+		for stage in self.stageList:
+			stage.start()
+
+		# result which arrive before its previous frame, stage with more than one worker can reorder frame
+		sequenceIndexToPoseListDict = dict()
+
+		# sequence index expected to yield next
+		nextSequenceIndex = 0
+
+		# latest item from pose queue
+		item = None
+
+		try:
+			while True:
+
+				# get next result
+				item = self.poseQueue.get()
+
+				# no more result
+				if item is EndOfStreamMarker:
+					break
+
+				sequenceIndex, poseList = item
+				sequenceIndexToPoseListDict[ sequenceIndex ] = poseList
+
+				# yield every result which is ready in order
+				while nextSequenceIndex in sequenceIndexToPoseListDict:
+
+					# this frame failed in some stage, raise it right away
+					poseList = sequenceIndexToPoseListDict.pop( nextSequenceIndex )
+					if isinstance( poseList, StageFailure ):
+						raise poseList.exception
+
+					yield self.sequenceIndexToFrameIndexDict.pop( nextSequenceIndex ), poseList
+					nextSequenceIndex += 1
+
+		finally:
+
+			# consumer stopped early or a frame failed, stop every stage and wait until all of them finished
+			# so no worker thread is still running when consumer goes on
+			self.stopEvent.set()
+			while item is not EndOfStreamMarker:
+				item = self.poseQueue.get()
+
+	def getStatistic( self ):
+		''' - get queue depth and per stage latency to tune the pipeline
+
+			RETURN:
+				- statisticDict ( dict )
+		'''
+
+		# queue depth right now
+		statisticDict = { 'queueDepthDict' : { queueNameStr : queueObj.qsize() for queueNameStr, queueObj in self.queueNameToQueueDict.items() } }
+
+		# decode stage latency
+		statisticDict[ 'stageLatencyMsDict' ] = { 'decode' : self.totalDecodeLatencyFloat / self.numberOfDecodedFrame * 1000 if self.numberOfDecodedFrame else 0.0 }
+
+		# processing stage latency
+		for stage in self.stageList:
+			statisticDict[ 'stageLatencyMsDict' ][ stage.stageNameStr ] = stage.averageLatencyMsFloat
+
+		return statisticDict